@@ -23,8 +23,8 @@ from lux import __version__
 from .commands import ConfigError, ConsoleMixin
 from .extension import LuxExtension, Parameter, ALL_EVENTS
 from .wrappers import ERROR_MESSAGES
-from .templates import render_data, template_engine, Template
-from .cms import CMS
+from .templates import render_data, template_engine, template_index, Template
+from .cms import CMS, output_cache
 from .cache import create_cache
 from .exceptions import ShellError
 from .channels import LuxChannels
@@ -124,6 +124,13 @@ class Application(ConsoleMixin, LuxExtension, EventHandler):
                     'content': 'width=device-width, initial-scale=1'}],
                   'List of default ``meta`` elements to add to the html head'
                   'element'),
+        Parameter('HTML_CACHE_TIMEOUT', 0,
+                  'Number of seconds html pages of anonymous users and CMS '
+                  'page fragments are kept in the output cache. '
+                  'Set to 0 to disable the output cache'),
+        Parameter('HTML_CACHE_SIZE', 1000,
+                  'Maximum number of html pages, and of page fragments, in '
+                  'the output cache'),
         Parameter('HTML_FORM_TAG', 'lux-form',
                   'Html tag for lux forms'),
         Parameter('HTML_GRID_TAG', 'lux-grid',
@@ -153,6 +160,15 @@ class Application(ConsoleMixin, LuxExtension, EventHandler):
                   'Default formatting for dates in JavaScript', True),
         Parameter('DEFAULT_TEMPLATE_ENGINE', 'jinja2',
                   'Default template engine'),
+        Parameter('ROUTE_CACHE_SIZE', 1000,
+                  'Maximum number of resolved dynamic paths kept in memory '
+                  'by the route dispatcher. Set to 0 to disable'),
+        Parameter('TEMPLATE_CACHE_SIZE', 500,
+                  'Maximum number of compiled templates kept in memory by '
+                  'the template engine'),
+        Parameter('TEMPLATE_WATCH_INTERVAL', 1,
+                  'Interval in seconds for polling template files for '
+                  'changes when in debug mode. Set to 0 to disable'),
         #
         # Cache
         Parameter('CACHE_SERVER', 'dummy://',
@@ -161,6 +177,24 @@ class Application(ConsoleMixin, LuxExtension, EventHandler):
                    'supporting the cache protocol')),
         Parameter('CACHE_DEFAULT_TIMEOUT', 60,
                   'Default timeout for data stored in cache'),
+        Parameter('CACHE_SERIALIZER', 'json',
+                  'Serializer for cache values: json, msgpack or pickle'),
+        Parameter('CACHE_COMPRESS_THRESHOLD', 0,
+                  'Compress cache values with zlib when their serialized '
+                  'size is at least this number of bytes. 0 to disable'),
+        Parameter('CACHE_MEMORY_MAX_ENTRIES', 10000,
+                  'Maximum number of entries in a memory:// cache'),
+        Parameter('CACHE_MEMORY_MAX_BYTES', 64*1024*1024,
+                  'Approximate maximum size in bytes of a memory:// cache'),
+        Parameter('CACHE_MEMORY_SWEEP_INTERVAL', 60,
+                  'Interval in seconds between sweeps of expired entries '
+                  'in a memory:// cache'),
+        Parameter('CACHE_LOCAL_SIZE', 1000,
+                  'Maximum number of entries in the in-process tier of a '
+                  'tiered cache'),
+        Parameter('CACHE_LOCAL_TIMEOUT', 30,
+                  'Maximum time in seconds entries are kept in the '
+                  'in-process tier of a tiered cache'),
         #
         Parameter('LOCALE', 'en_GB', 'Default locale', True),
         Parameter('DEFAULT_TIMEZONE', 'GMT',
@@ -185,6 +219,8 @@ class Application(ConsoleMixin, LuxExtension, EventHandler):
                   'is used. To skip prefix set to empty string.'),
         Parameter('CHANNEL_SERVER', 'server',
                   'Channel name for the server'),
+        Parameter('CHANNEL_CACHE', 'cache',
+                  'Channel name for cache invalidation events'),
         #
         Parameter('HTTP_CLIENT_PARAMETERS', None,
                   'A dictionary of parameters to pass to the Http Client'),
@@ -259,6 +295,7 @@ class Application(ConsoleMixin, LuxExtension, EventHandler):
             context.setup()
             set_app(self)
             self._handler = _build_handler(self)
+            template_index(self).index()
             self.event('on_loaded').fire()
         return self._handler
 
@@ -321,32 +358,25 @@ class Application(ConsoleMixin, LuxExtension, EventHandler):
     def template_full_path(self, names):
         """Return a template filesystem full path or None
 
-        Loops through all :attr:`extensions` in reversed order and
-        check for ``name`` within the ``templates`` directory
+        Looks up ``names`` in the :class:`.TemplateIndex` built from the
+        ``templates`` directory of all :attr:`extensions`
         """
-        if not isinstance(names, (list, tuple)):
-            names = (names,)
-        for name in names:
-            for ext in reversed(tuple(self.extensions.values())):
-                filename = ext.get_template_full_path(self, name)
-                if filename and os.path.exists(filename):
-                    return filename
+        return template_index(self).full_path(names)
 
     def template(self, name):
         """Load a template from the file system.
 
         The template is must be located in a ``templates`` directory
         of at least one of the extensions included in the :setting:EXTENSIONS`
-        list. The location of the template file is obtained via
-        the :meth:`template_full_path` method.
+        list. Templates are loaded once and kept in memory by the
+        :class:`.TemplateIndex` of the application.
 
         If the file is not found an empty string is returned.
         """
         if name:
-            filename = self.template_full_path(name)
-            if filename:
-                with open(filename, 'r') as file:
-                    return Template(file.read())
+            template = template_index(self).get(name)
+            if template is not None:
+                return template
         return Template()
 
     def render_template(self, name, context=None,
@@ -458,6 +488,8 @@ class Application(ConsoleMixin, LuxExtension, EventHandler):
         """
         if args:
             self.logger.warning('Reload WSGI application')
+            template_index(self).clear()
+            output_cache(self).clear()
             self.callable.clear_local()
         elif self.channels is not None:
             return self.channels.publish(
@@ -1,6 +1,11 @@
+import time
+from functools import partial
 from importlib import import_module
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-from pulsar.api import PermissionDenied, Http401, BadRequest
+from pulsar.api import (
+    PermissionDenied, Http401, BadRequest, HttpException, ImproperlyConfigured
+)
 from pulsar.utils.structures import inverse_mapping
 from pulsar.utils.string import to_bytes
 from pulsar.utils.log import lazyproperty
@@ -36,12 +41,108 @@ class AuthenticationError(ValueError):
     pass
 
 
+class PasswordExecutor:
+    '''Bounded executor for password hashing and verification.
+
+    Depending on the :setting:`PASSWORD_EXECUTOR` setting, functions are
+    executed in a thread pool, a process pool or inline (when the setting
+    is empty). When on a green worker, the result is waited without blocking
+    the other greenlets.
+
+    If more than :setting:`PASSWORD_QUEUE_SIZE` calls are pending a 503
+    :class:`~pulsar.api.HttpException` is raised.
+    '''
+    executors = {
+        'thread': ThreadPoolExecutor,
+        'process': ProcessPoolExecutor
+    }
+    _executor = None
+
+    def __init__(self, app):
+        cfg = app.config
+        self.app = app
+        self.kind = cfg['PASSWORD_EXECUTOR']
+        self.workers = cfg['PASSWORD_WORKERS']
+        self.queue_size = cfg['PASSWORD_QUEUE_SIZE']
+        self.pending = 0
+        self.max_pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.total_time = 0
+        self.last_time = 0
+
+    def __call__(self, callable, *args, **kwargs):
+        if self.queue_size and self.pending >= self.queue_size:
+            self.rejected += 1
+            raise HttpException('Too many password requests, try later',
+                                status=503)
+        start = time.time()
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        try:
+            return self.run(partial(callable, *args, **kwargs))
+        finally:
+            self.pending -= 1
+            self.calls += 1
+            self.last_time = time.time() - start
+            self.total_time += self.last_time
+
+    def run(self, callable):
+        app = self.app
+        pool = app.green_pool
+        executor = self.executor
+        if executor and pool and pool.in_green_worker:
+            future = app._loop.run_in_executor(executor, callable)
+            return pool.wait(future, True)
+        elif executor:
+            return executor.submit(callable).result()
+        else:
+            return callable()
+
+    @property
+    def executor(self):
+        if self._executor is None and self.kind:
+            Executor = self.executors.get(self.kind)
+            if not Executor:
+                raise ImproperlyConfigured('Unknown password executor "%s"'
+                                           % self.kind)
+            self._executor = Executor(self.workers)
+        return self._executor
+
+    def info(self):
+        '''Dictionary of metrics for this executor
+        '''
+        return dict(
+            executor=self.kind,
+            workers=self.workers,
+            queue_size=self.queue_size,
+            pending=self.pending,
+            max_pending=self.max_pending,
+            calls=self.calls,
+            rejected=self.rejected,
+            last_time=self.last_time,
+            average_time=self.total_time/self.calls if self.calls else 0
+        )
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait)
+            self._executor = None
+
+
 class PasswordMixin:
     '''Adds password encryption to an authentication backend.
 
     It has two basic methods,
     :meth:`.encrypt` and :meth:`.decrypt`.
+
+    Encryption and verification are executed via the
+    :attr:`password_executor`.
     '''
+    @lazyproperty
+    def password_executor(self):
+        return PasswordExecutor(self.app)
+
     @lazyproperty
     def crypt_module(self):
         kwargs = self.config['CRYPT_ALGORITHM']
@@ -60,7 +161,7 @@ class PasswordMixin:
         secret_key = self.config['PASSWORD_SECRET_KEY'].encode()
         b = to_bytes(string_or_bytes, encoding)
         module, kwargs = self.crypt_module
-        p = module.encrypt(b, secret_key, **kwargs)
+        p = self.password_executor(module.encrypt, b, secret_key, **kwargs)
         return p.decode(encoding)
 
     def crypt_verify(self, encrypted, raw):
@@ -68,8 +169,8 @@ class PasswordMixin:
         '''
         secret_key = self.config['PASSWORD_SECRET_KEY'].encode()
         module, kwargs = self.crypt_module
-        return module.verify(to_bytes(encrypted), to_bytes(raw),
-                             secret_key, **kwargs)
+        return self.password_executor(module.verify, to_bytes(encrypted),
+                                      to_bytes(raw), secret_key, **kwargs)
 
     def decrypt(self, string_or_bytes):
         secret_key = self.config['PASSWORD_SECRET_KEY'].encode()
@@ -1,22 +1,44 @@
+import sys
 import json
+import time
+import uuid
+import zlib
+import pickle
 import logging
 import asyncio
 
 from copy import copy
+from threading import RLock
+from collections import OrderedDict
+from concurrent.futures import Future
 from inspect import isfunction
 
 from pulsar.utils.slugify import slugify
 from pulsar.apps.data import parse_store_url, create_store
 from pulsar.utils.importer import module_attribute
-from pulsar.utils.string import to_string
+from pulsar.utils.string import to_string, to_bytes
 from pulsar.api import ImproperlyConfigured, Lock
 
 from lux import models
+from lux.utils.lru import LRUCache
+
+try:
+    import msgpack
+except ImportError:     # pragma    nocover
+    msgpack = None
 
 
 logger = logging.getLogger('lux.cache')
 
+STALE_KEY = '__soft_expiry__'
+
 data_caches = {}
+serializers = {}
+serializer_codes = {}
+
+HEADER = b'\x00'
+COMPRESSED = b'z'
+UNCOMPRESSED = b'-'
 
 
 def passthrough(value):
@@ -34,8 +56,127 @@ def cached(*args, **kw):
         return CacheObject(*args, **kw)
 
 
+class Serializer:
+    """Base class for cache value serializers
+
+    Serialized values are prefixed by a three bytes header containing
+    the :attr:`code` of the serializer and the compression flag.
+    Uncompressed JSON values are stored without header, as they have always
+    been, so that the serializer can be changed without flushing the cache.
+    Values of serializers which are not :attr:`safe` are decoded only when
+    the serializer is the one in use.
+    """
+    name = None
+    code = None
+    safe = True
+
+    def dumps(self, value):
+        raise NotImplementedError
+
+    def loads(self, data):
+        raise NotImplementedError
+
+
+def register_serializer(cls):
+    """Register a :class:`.Serializer` class
+    """
+    serializer = cls()
+    serializers[cls.name] = serializer
+    serializer_codes[cls.code] = serializer
+    return cls
+
+
+@register_serializer
+class JsonSerializer(Serializer):
+    name = 'json'
+    code = b'j'
+
+    def dumps(self, value):
+        return json.dumps(value).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(to_string(data))
+
+
+@register_serializer
+class PickleSerializer(Serializer):
+    name = 'pickle'
+    code = b'p'
+    safe = False
+
+    def dumps(self, value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+@register_serializer
+class MsgpackSerializer(Serializer):
+    name = 'msgpack'
+    code = b'm'
+
+    def dumps(self, value):
+        if msgpack is None:
+            raise ImproperlyConfigured('msgpack serializer requires msgpack')
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data):
+        if msgpack is None:
+            raise ImproperlyConfigured('msgpack serializer requires msgpack')
+        return msgpack.unpackb(data, raw=False)
+
+
+def encode_value(value, serializer='json', compress_threshold=None):
+    """Serialize ``value`` into bytes
+
+    :param serializer: name of the :class:`.Serializer`
+    :param compress_threshold: compress with zlib when the serialized value
+        is at least this number of bytes
+    """
+    serializer = serializers[serializer]
+    data = serializer.dumps(value)
+    if compress_threshold and len(data) >= compress_threshold:
+        data = zlib.compress(data)
+        flag = COMPRESSED
+    elif serializer.code == JsonSerializer.code:
+        return data
+    else:
+        flag = UNCOMPRESSED
+    return HEADER + serializer.code + flag + data
+
+
+def decode_value(data, serializer='json'):
+    """Deserialize bytes obtained from :func:`encode_value`
+
+    :param serializer: name of the :class:`.Serializer` in use, values
+        encoded by a different serializer which is not safe, such as
+        pickle, raise :class:`ValueError`
+    """
+    data = to_bytes(data)
+    if data[:1] == HEADER:
+        name = serializer
+        serializer = serializer_codes.get(data[1:2])
+        if serializer is None:
+            raise ValueError('Unknown cache serializer')
+        if not serializer.safe and serializer.name != name:
+            raise ValueError('Cache serializer %s not allowed' %
+                             serializer.name)
+        flag = data[2:3]
+        data = data[3:]
+        if flag == COMPRESSED:
+            data = zlib.decompress(data)
+    else:
+        serializer = serializers['json']
+    return serializer.loads(data)
+
+
 class Cache(models.Component):
     """Cache base class
+
+    Values stored via :meth:`set_json` are serialized with the
+    :setting:`CACHE_SERIALIZER` and, when larger than
+    :setting:`CACHE_COMPRESS_THRESHOLD` bytes, compressed.
     """
     def __init__(self, app, name, url):
         self.name = name
@@ -71,19 +212,33 @@ class Cache(models.Component):
         pass
 
     def set_json(self, key, value, timeout=None):
-        value = json.dumps(value)
-        self.set(key, value, timeout=timeout)
+        self.set(key, self.dumps(value), timeout=timeout)
 
     def get_json(self, key):
         value = self.get(key)
         if value is not None:
             try:
-                return json.loads(to_string(value))
+                return self.loads(value)
             except Exception:
-                self.app.logger.warning('Could not convert to JSON: %s',
+                self.app.logger.warning('Could not decode cache value: %s',
                                         value)
 
-    def lock(self, name, timeout=None):
+    def dumps(self, value):
+        config = self.config
+        return encode_value(value, config['CACHE_SERIALIZER'],
+                            config['CACHE_COMPRESS_THRESHOLD'])
+
+    def loads(self, value):
+        return decode_value(value, self.config['CACHE_SERIALIZER'])
+
+    def lock(self, name, timeout=None, blocking=True):
+        """A distributed lock with ``name``
+
+        :param timeout: seconds after which the lock is released
+        :param blocking: ``False`` to not block, ``True`` to block until
+            the lock is acquired or the maximum number of seconds to wait
+            for the lock
+        """
         raise NotImplementedError
 
 
@@ -100,13 +255,147 @@ class DummyCache(Cache):
         else:
             self._loop = asyncio.get_event_loop()
 
-    def lock(self, name, **kwargs):
-        return GreenLock(Lock(name, **kwargs), self._wait)
+    def lock(self, name, timeout=None, blocking=True):
+        return GreenLock(Lock(name, timeout=timeout, blocking=blocking),
+                         self._wait)
 
     def _wait(self, coro):
         return self._loop.run_until_complete(coro)
 
 
+class MemoryCache(DummyCache):
+    """An in-process cache with expiry and LRU eviction
+
+    The cache holds at most :setting:`CACHE_MEMORY_MAX_ENTRIES` entries
+    and approximately :setting:`CACHE_MEMORY_MAX_BYTES` bytes, the least
+    recently used entries are evicted first.
+    Expired entries are removed when accessed and by a sweep of the whole
+    cache which runs, at most, every :setting:`CACHE_MEMORY_SWEEP_INTERVAL`
+    seconds.
+    """
+    def __init__(self, app, name, url):
+        super().__init__(app, name, url)
+        config = app.config
+        self.max_entries = config['CACHE_MEMORY_MAX_ENTRIES']
+        self.max_bytes = config['CACHE_MEMORY_MAX_BYTES']
+        self.sweep_interval = config['CACHE_MEMORY_SWEEP_INTERVAL']
+        self.last_sweep = time.time()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._mutex = RLock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def set(self, key, value, timeout=None):
+        expiry = time.time() + timeout if timeout else None
+        size = _size(value)
+        with self._mutex:
+            self._pop(key)
+            self._data[key] = (expiry, size, value)
+            self.bytes += size
+            self._evict()
+
+    def get(self, key):
+        entry = self._get(key)
+        return entry if entry is None else entry[2]
+
+    def delete(self, key):
+        with self._mutex:
+            return 1 if self._pop(key) else 0
+
+    def hmset(self, key, iterable, timeout=None):
+        with self._mutex:
+            entry = self._get(key, False)
+            value = dict(entry[2]) if entry else {}
+            value.update(iterable)
+            if not timeout and entry and entry[0]:
+                timeout = entry[0] - time.time()
+            self.set(key, value, timeout)
+
+    def hmget(self, key, *fields):
+        entry = self._get(key)
+        if entry is not None:
+            value = entry[2]
+            if fields:
+                return [value.get(field) for field in fields]
+            return value
+
+    def clear(self, prefix=None):
+        """Clear keys starting with ``prefix``, or all keys if not given
+        """
+        with self._mutex:
+            if prefix:
+                keys = [key for key in self._data if key.startswith(prefix)]
+            else:
+                keys = list(self._data)
+            for key in keys:
+                self._pop(key)
+        return len(keys)
+
+    def sweep(self):
+        """Remove all expired entries
+        """
+        now = time.time()
+        with self._mutex:
+            self.last_sweep = now
+            expired = [key for key, entry in self._data.items()
+                       if entry[0] and entry[0] <= now]
+            for key in expired:
+                self._pop(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def info(self):
+        """Dictionary of cache statistics
+        """
+        return dict(entries=len(self),
+                    bytes=self.bytes,
+                    max_entries=self.max_entries,
+                    max_bytes=self.max_bytes,
+                    hits=self.hits,
+                    misses=self.misses,
+                    evictions=self.evictions,
+                    expirations=self.expirations)
+
+    # INTERNALS
+    def _get(self, key, stats=True):
+        with self._mutex:
+            if time.time() - self.last_sweep > self.sweep_interval:
+                self.sweep()
+            entry = self._data.get(key)
+            if entry is not None and entry[0] and entry[0] <= time.time():
+                self._pop(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+            if stats:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return entry
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+        return entry
+
+    def _evict(self):
+        data = self._data
+        while data and ((self.max_entries and len(data) > self.max_entries) or
+                        (self.max_bytes and self.bytes > self.max_bytes)):
+            _, entry = data.popitem(last=False)
+            self.bytes -= entry[1]
+            self.evictions += 1
+
+
 class GreenLock:
 
     def __init__(self, lock, wait):
@@ -131,6 +420,8 @@ class GreenLock:
 class RedisCache(Cache):
     """A cache with redis backend
     """
+    sync = False
+
     def __init__(self, app, name, url):
         super().__init__(app, name, url)
         if app.green_pool:
@@ -138,6 +429,7 @@ class RedisCache(Cache):
             self.client = create_store(url).client()
         else:
             import redis
+            self.sync = True
             self.client = redis.StrictRedis.from_url(url)
 
     def set(self, key, value, timeout=None):
@@ -166,26 +458,194 @@ class RedisCache(Cache):
         result = self.client.eval(clear_cache, (), (pattern,))
         return self._wait(result)
 
-    def lock(self, name, **kwargs):
-        return GreenLock(self.client.lock(name, **kwargs), self._wait)
+    def lock(self, name, timeout=None, blocking=True):
+        if self.sync:
+            # redis-py locks wait for blocking_timeout seconds
+            if blocking is True:
+                blocking = None
+            elif blocking is False:
+                blocking = 0
+            lock = self.client.lock(name, timeout=timeout,
+                                    blocking_timeout=blocking)
+        else:
+            lock = self.client.lock(name, timeout=timeout, blocking=blocking)
+        return GreenLock(lock, self._wait)
 
     def _wait(self, value):
         return value
 
 
+class TieredCache(Cache):
+    """A two tier cache with an in-process LRU in front of a remote cache
+
+    The url scheme is in the form ``tiered+<remote scheme>``, for example
+    ``tiered+redis://127.0.0.1:6379/7``.
+
+    Values are kept decoded in the local tier, for at most
+    :setting:`CACHE_LOCAL_TIMEOUT` seconds, and therefore the values
+    returned by :meth:`get` and :meth:`get_json` must be treated as
+    read-only.
+    When publish/subscribe channels are available, local copies are
+    invalidated across workers via the :setting:`CHANNEL_CACHE` channel,
+    including writes from commands, threads and non-green code.
+    """
+    subscribed = False
+
+    def __init__(self, app, name, url):
+        super().__init__(app, name, url)
+        config = app.config
+        self.uid = uuid.uuid4().hex
+        self.remote = create_cache(app, url.split('+', 1)[1])
+        self.local = LRUCache(config['CACHE_LOCAL_SIZE'])
+        self.local_timeout = config['CACHE_LOCAL_TIMEOUT']
+
+    def ping(self):
+        return self.remote.ping()
+
+    def set(self, key, value, timeout=None):
+        self.remote.set(key, value, timeout=timeout)
+        self._set_local(key, False, value, timeout)
+
+    def get(self, key):
+        entry = self._get_local(key)
+        if entry is not None:
+            is_json, value = entry
+            return self.dumps(value) if is_json else value
+        value = self.remote.get(key)
+        if value is not None:
+            self.local.set(key, (False, value), self.local_timeout)
+        return value
+
+    def set_json(self, key, value, timeout=None):
+        self.remote.set_json(key, value, timeout=timeout)
+        self._set_local(key, True, value, timeout)
+
+    def get_json(self, key):
+        entry = self._get_local(key)
+        if entry is not None:
+            is_json, value = entry
+            if is_json:
+                return value
+        value = self.remote.get_json(key)
+        if value is not None:
+            self.local.set(key, (True, value), self.local_timeout)
+        return value
+
+    def delete(self, key):
+        result = self.remote.delete(key)
+        self.local.pop(key)
+        self._publish(key=key)
+        return result
+
+    def hmset(self, key, iterable, **params):
+        self.remote.hmset(key, iterable, **params)
+        self.local.pop(key)
+        self._publish(key=key)
+
+    def hmget(self, key, *fields):
+        return self.remote.hmget(key, *fields)
+
+    def clear(self, prefix=None):
+        result = self.remote.clear(prefix)
+        self._clear_local(prefix)
+        self._publish(prefix=prefix or '')
+        return result
+
+    def lock(self, name, timeout=None, blocking=True):
+        return self.remote.lock(name, timeout=timeout, blocking=blocking)
+
+    def info(self):
+        """Statistics of the local tier
+        """
+        info = self.local.info()
+        info['remote'] = str(self.remote)
+        return info
+
+    # INTERNALS
+    def _get_local(self, key):
+        self._subscribe()
+        return self.local.get(key)
+
+    def _set_local(self, key, is_json, value, timeout):
+        timeout = min(timeout or self.local_timeout, self.local_timeout)
+        self.local.set(key, (is_json, value), timeout)
+        self._publish(key=key)
+
+    def _clear_local(self, prefix=None):
+        if prefix:
+            for key in self.local:
+                if key.startswith(prefix):
+                    self.local.pop(key)
+        else:
+            self.local.clear()
+
+    def _invalidate(self, channel, match, data):
+        if data and data.get('origin') != self.uid:
+            if 'key' in data:
+                self.local.pop(data['key'])
+            else:
+                self._clear_local(data.get('prefix'))
+
+    def _subscribe(self):
+        channels = self.app.channels
+        if not self.subscribed and channels is not None:
+            self.subscribed = True
+            channels.register(self.config['CHANNEL_CACHE'], 'invalidate',
+                              self._invalidate)
+
+    def _publish(self, **data):
+        channels = self.app.channels
+        if channels is not None:
+            self._subscribe()
+            data['origin'] = self.uid
+            try:
+                channels.publish(self.config['CHANNEL_CACHE'], 'invalidate',
+                                 data)
+            except Exception:
+                self.logger.exception('Could not publish cache invalidation')
+
+
+def _size(value):
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    elif isinstance(value, dict):
+        return sum((_size(k) + _size(v) for k, v in value.items()))
+    else:
+        return sys.getsizeof(value)
+
+
 class CacheObject:
     """Object which implement cache functionality on callables.
 
     A callable can be either a method or a function
+
+    :param user: include the request user in the cache key
+    :param timeout: timeout in seconds, or name of a config parameter
+    :param key: optional cache key
+    :param app: optional application
+    :param single_flight: when the cache entry is missing, only one caller
+        per key computes the value while concurrent callers, in the same
+        process, wait for the result
+    :param lock: use the cache :meth:`~.Cache.lock` so that only one
+        process computes the value. It can be a number of seconds to wait
+        for the lock, ``True`` waits :setting:`CACHE_DEFAULT_TIMEOUT`
+        seconds
+    :param stale: number of seconds, or name of a config parameter, after
+        ``timeout`` during which a stale value is served to concurrent
+        callers while one of them recomputes it
     """
     instance = None
     callable = None
 
-    def __init__(self, user=False, timeout=None, key=None, app=None):
+    def __init__(self, user=False, timeout=None, key=None, app=None,
+                 single_flight=True, lock=False, stale=None):
         self.user = user
         self.timeout = timeout
         self.key = key
         self.app = app
+        self.single_flight = single_flight
+        self.lock = lock
+        self.stale = stale
 
     def cache_key(self, arg):
         key = self.key or ''
@@ -226,50 +686,155 @@ class CacheObject:
                                  'parameter nor from bound instance. '
                                  'Cannot use cache.')
 
-        if arg:
-            key = self.cache_key(arg)
-            result = arg.app.cache_server.get_json(key)
-            if result is not None:
-                return result
-
         if self.instance:
             args = (self.instance,) + args
 
-        result = self.callable(*args, **kw)
-
-        if arg:
-            timeout = self.timeout
-            app = arg.app
-            config = app.config
+        if not arg:
+            return self.callable(*args, **kw)
 
-            if timeout in config:
-                timeout = config[timeout]
-            try:
-                int(timeout)
-            except Exception:
-                timeout = config['CACHE_DEFAULT_TIMEOUT']
+        app = arg.app
+        key = self.cache_key(arg)
+        result, fresh = self.get(app, key)
+        if fresh:
+            return result
+
+        if not self.single_flight:
+            return self.compute(app, key, args, kw)
+
+        flight, leader = Flight.get(key)
+        if not leader:
+            # serve stale value or wait for the leader
+            return result if result is not None else flight.wait(app)
+        try:
+            result = self.compute(app, key, args, kw)
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+        finally:
+            Flight.done(key)
+        return result
 
-            if timeout:
-                try:
-                    app.cache_server.set_json(key, result, timeout=timeout)
-                except TypeError:
-                    app.logger.exception(
-                        'Could not convert to JSON a value to set in cache')
-                except Exception:
-                    app.logger.exception('Critical error while setting cache')
+    def get(self, app, key):
+        """Get a value from cache
 
+        :return: a two-elements tuple with value and a boolean
+            indicating if the value is fresh
+        """
+        result = app.cache_server.get_json(key)
+        if result is not None and self.stale:
+            try:
+                expiry = result[STALE_KEY]
+                result = result['value']
+            except (TypeError, KeyError):
+                return result, True
+            return result, expiry > time.time()
+        return result, result is not None
+
+    def compute(self, app, key, args, kw):
+        lock = None
+        if self.lock:
+            wait = self.lock
+            if wait is True:
+                wait = app.config['CACHE_DEFAULT_TIMEOUT']
+            lock = app.cache_server.lock('%s:lock' % key, timeout=wait,
+                                         blocking=wait)
+            if lock.acquire():
+                # Another process may have computed the value
+                result, fresh = self.get(app, key)
+                if fresh:
+                    lock.release()
+                    return result
+            else:
+                lock = None
+        try:
+            result = self.callable(*args, **kw)
+            self.set(app, key, result)
+        finally:
+            if lock:
+                lock.release()
         return result
 
+    def set(self, app, key, result):
+        config = app.config
+        timeout = self._config_value(config, self.timeout)
+        if timeout is None:
+            timeout = config['CACHE_DEFAULT_TIMEOUT']
+
+        if timeout:
+            stale = self._config_value(config, self.stale)
+            if stale:
+                result = {STALE_KEY: time.time() + timeout, 'value': result}
+                timeout += stale
+            try:
+                app.cache_server.set_json(key, result, timeout=timeout)
+            except TypeError:
+                app.logger.exception(
+                    'Could not convert to JSON a value to set in cache')
+            except Exception:
+                app.logger.exception('Critical error while setting cache')
+
     def __get__(self, instance, objtype):
         obj = copy(self)
         obj.instance = instance
         return obj
 
+    def _config_value(self, config, value):
+        if value in config:
+            value = config[value]
+        try:
+            int(value)
+        except Exception:
+            value = None
+        return value
+
+
+class Flight:
+    """A computation in progress for a cache key
+    """
+    flights = {}
+    lock = RLock()
+
+    def __init__(self):
+        self.future = Future()
+
+    @classmethod
+    def get(cls, key):
+        """Return a two-elements tuple with the :class:`.Flight` for ``key``
+        and a boolean indicating if the caller is the leader
+        """
+        with cls.lock:
+            flight = cls.flights.get(key)
+            if flight is None:
+                flight = cls.flights[key] = cls()
+                return flight, True
+            return flight, False
+
+    @classmethod
+    def done(cls, key):
+        with cls.lock:
+            cls.flights.pop(key, None)
+
+    def set_result(self, result):
+        self.future.set_result(result)
+
+    def set_exception(self, exc):
+        self.future.set_exception(exc)
+
+    def wait(self, app):
+        pool = app.green_pool
+        if pool and pool.in_green_worker:
+            future = asyncio.wrap_future(self.future, loop=app._loop)
+            return pool.wait(future, True)
+        return self.future.result()
+
 
 def create_cache(app, url):
     if isinstance(url, Cache):
         return url
     scheme, _, _ = parse_store_url(url)
+    scheme = scheme.split('+', 1)[0]
     dotted_path = data_caches.get(scheme)
     if not dotted_path:
         raise ImproperlyConfigured('%s cache not available' % scheme)
@@ -288,6 +853,8 @@ def register_cache(name, dotted_path):
 
 register_cache('dummy', 'lux.core.cache.DummyCache')
 register_cache('redis', 'lux.core.cache.RedisCache')
+register_cache('tiered', 'lux.core.cache.TieredCache')
+register_cache('memory', 'lux.core.cache.MemoryCache')
 
 
 clear_cache = '''\
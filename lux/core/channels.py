@@ -1,4 +1,5 @@
 import json
+import asyncio
 from collections import namedtuple
 
 from pulsar.api import ProtocolError
@@ -55,21 +56,43 @@ class LuxChannels(models.Component):
         return self.channels.namespace
 
     def register(self, channel_name, event, callback):
-        return self.app.green_pool.wait(
+        return self._execute(
             self._register_connect(channel_name, event, callback)
         )
 
     def unregister(self, channel_name, event, callback):
-        return self.app.green_pool.wait(
+        return self._execute(
             self.channels.unregister(channel_name, event, callback)
         )
 
     def publish(self, channel_name, event, data=None):
-        return self.app.green_pool.wait(
+        return self._execute(
             self.channels.publish(channel_name, event, data)
         )
 
     # INTERNALS
+    def _execute(self, coro):
+        """Execute a channels coroutine from any context
+
+        In a green worker wait for its result, in the event loop thread
+        schedule it as a task, from other threads submit it to the event
+        loop and, when the event loop is not running, run it until
+        completion
+        """
+        pool = self.app.green_pool
+        if pool and pool.in_green_worker:
+            return pool.wait(coro)
+        loop = self.channels._loop
+        if not loop.is_running():
+            return loop.run_until_complete(coro)
+        try:
+            current = asyncio.get_event_loop()
+        except RuntimeError:
+            current = None
+        if current is loop:
+            return asyncio.ensure_future(coro, loop=loop)
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
     def middleware(self, environ, start_response):
         """Add a middleeware when running with greenlets.
 
@@ -1,10 +1,10 @@
-import os
-
 from pulsar.apps.wsgi import Html, HtmlDocument
 from pulsar.utils.httpurl import CacheControl
 
 from lux.utils.url import absolute_uri
 from lux.utils.token import encode_json
+from lux.utils.lru import LRUCache
+from lux.utils.context import app_attribute
 
 from ..models import Component
 from .templates import Template
@@ -13,6 +13,7 @@ from .wrappers import HeadMeta
 
 HEAD_META = set(('title', 'description', 'author', 'keywords'))
 SKIP_META = set(('priority', 'order', 'url'))
+CACHE_METHODS = set(('GET', 'HEAD'))
 
 
 class Page:
@@ -185,13 +186,51 @@ class CMS(Component):
         """
         return self.replace_html_main(page.inner_template, inner_html)
 
+    def cached_response(self, request):
+        """Response from the :class:`.OutputCache` or ``None``
+
+        When the response for ``request`` can be cached, the response
+        built by :meth:`html_response` is stored in the cache
+        """
+        cache = output_cache(self.app)
+        key = cache.page_key(request)
+        if key:
+            request.cache.output_cache_key = key
+            return cache.get_page(request, key)
+
+    def fragment_key(self, request, page, inner_html):
+        """Key of the inner fragment of ``page`` in the
+        :class:`.OutputCache` or ``None`` if the fragment cannot be cached
+
+        By default fragments are not cached
+        """
+
+    def page_fragment(self, request, page, inner_html):
+        """Render the inner template of ``page`` via :meth:`inner_html`,
+        or retrieve it together with the page metadata from the
+        :class:`.OutputCache`
+        """
+        cache = output_cache(self.app)
+        key = self.fragment_key(request, page, inner_html)
+        if key and cache.enabled:
+            fragment = cache.get_fragment(key)
+            if fragment is not None:
+                page.__dict__.update(fragment.__dict__)
+                return page.inner_template
+        inner_template = self.inner_html(request, page, inner_html)
+        if key and cache.enabled:
+            fragment = page.copy()
+            fragment.inner_template = inner_template
+            cache.set_fragment(key, fragment)
+        return inner_template
+
     def html_response(self, request, inner_html):
         # fetch the cms page
         page = self.page(request)
         # render the inner part of the html page
         if isinstance(inner_html, Html):
             inner_html = inner_html.to_string(request)
-        page.inner_template = self.inner_html(request, page, inner_html)
+        page.inner_template = self.page_fragment(request, page, inner_html)
 
         # This request is for the inner template only
         if request.url_data.get('template') == 'ui':
@@ -201,6 +240,9 @@ class CMS(Component):
             response = self.page_response(request, page, self.context(request))
 
         self.cache_control(response)
+        key = request.cache.get('output_cache_key')
+        if key:
+            output_cache(self.app).set_page(request, key, response)
         return response
 
     def page_response(self, request, page, context=None,
@@ -301,14 +343,118 @@ class CMS(Component):
     # Template redering
     def template_full_path(self, names):
         """Return a template filesystem full path or None
+        """
+        return self.app.template_full_path(names)
+
+
+@app_attribute
+def output_cache(app):
+    """The :class:`.OutputCache` of an application
+    """
+    return OutputCache(app)
+
+
+class OutputCache:
+    """In-memory cache of rendered html
+
+    Pages of anonymous users are cached by host, path and query string,
+    with a variant for each value of the request headers listed in the
+    ``Vary`` response header.
+    :class:`.Page` fragments are cached for all users by the
+    :meth:`.CMS.fragment_key` of the CMS.
+
+    Entries expire after :setting:`HTML_CACHE_TIMEOUT` seconds or when
+    :meth:`clear` is called.
+    """
+    def __init__(self, app):
+        cfg = app.config
+        self.timeout = cfg['HTML_CACHE_TIMEOUT']
+        size = cfg['HTML_CACHE_SIZE']
+        self.vary = LRUCache(size)
+        self.pages = LRUCache(size)
+        self.fragments = LRUCache(size)
+
+    def __len__(self):
+        return len(self.pages)
+
+    @property
+    def enabled(self):
+        return bool(self.timeout)
+
+    def page_key(self, request):
+        """Cache key of the page for ``request`` or ``None`` when the page
+        cannot be cached
+        """
+        if (not self.enabled or request.method not in CACHE_METHODS or
+                request.cache.get('skip_output_cache')):
+            return
+        user = request.cache.get('user')
+        if user and not user.is_anonymous():
+            return
+        return (request.get_host(), request.path,
+                request.environ.get('QUERY_STRING', ''))
+
+    def get_page(self, request, key):
+        """Build the response for ``request`` from the cached page at
+        ``key``, return ``None`` if not available
+        """
+        vary = self.vary.get(key)
+        if vary is None:
+            return
+        entry = self.pages.get((key, self._variant(request, vary)))
+        if entry is None:
+            return
+        status_code, headers, body = entry
+        response = request.response
+        response.status_code = status_code
+        for name in set((name for name, _ in headers)):
+            response.headers.popall(name, None)
+        response.headers.extend(headers)
+        response.content = body
+        return response
+
+    def set_page(self, request, key, response):
+        """Store ``response`` in the cache if it is a public html page
+        """
+        if (response.status_code != 200 or response.is_streamed() or
+                response.cookies or request.cache.get('skip_output_cache')):
+            return
+        headers = response.headers
+        cache_control = ','.join(headers.getall('cache-control', ()))
+        if 'private' in cache_control or 'no-store' in cache_control:
+            return
+        vary = set()
+        for value in headers.getall('vary', ()):
+            vary.update((v.strip().lower() for v in value.split(',')))
+        vary.discard('')
+        if '*' in vary:
+            return
+        vary = tuple(sorted(vary))
+        self.vary.set(key, vary, self.timeout)
+        self.pages.set(
+            (key, self._variant(request, vary)),
+            (response.status_code, tuple(headers.items()),
+             b''.join(response.content)),
+            self.timeout
+        )
+
+    def get_fragment(self, key):
+        """A copy of the cached :class:`.Page` at ``key`` or ``None``
+        """
+        page = self.fragments.get(key)
+        return page.copy() if page is not None else None
+
+    def set_fragment(self, key, page):
+        self.fragments.set(key, page.copy(), self.timeout)
 
-        Loops through all :attr:`extensions` in reversed order and
-        check for ``name`` within the ``templates`` directory
+    def clear(self):
+        """Remove all pages and fragments
         """
-        if not isinstance(names, (list, tuple)):
-            names = (names,)
-        for name in names:
-            for ext in reversed(tuple(self.app.extensions.values())):
-                filename = ext.get_template_full_path(self, name)
-                if filename and os.path.exists(filename):
-                    return filename
+        self.vary.clear()
+        self.pages.clear()
+        self.fragments.clear()
+
+    def _variant(self, request, vary):
+        environ = request.environ
+        return tuple((environ.get('HTTP_%s' % h.upper().replace('-', '_'))
+                      for h in vary))
@@ -0,0 +1,247 @@
+"""Compiled dispatch table for a tree of :class:`.Router`
+
+The :class:`Dispatcher` flattens the router tree into endpoints, in the
+same depth-first order used by :meth:`.Router.resolve`, and indexes them:
+
+* paths without variables are resolved once, when the table is built, and
+  stored in a dictionary
+* paths with variables are stored in a prefix trie with one converter per
+  url segment; a ``path`` converter must be the last bit of a leaf route
+  and consumes the remaining segments
+* routes defined with ``re=True`` (or with a ``path`` converter in any other
+  position) are matched with their regular expressions
+
+When several endpoints match a path, the first in depth-first order wins,
+exactly as when walking the tree.
+"""
+import re
+from functools import partial
+
+from pulsar.api import Http404, MethodNotAllowed
+from pulsar.apps.wsgi import Route
+from pulsar.apps.wsgi.routers import Handler
+from pulsar.apps.wsgi.route import PathConverter
+
+from ..utils.lru import LRUCache
+
+
+NO_MATCH = ()
+
+
+class Node:
+    __slots__ = ('static', 'params', 'rest', 'endpoint', 'priority')
+
+    def __init__(self):
+        self.static = {}
+        self.params = []
+        self.rest = []
+        self.endpoint = None
+        self.priority = None
+
+    def add_priority(self, priority):
+        if self.priority is None or priority < self.priority:
+            self.priority = priority
+
+
+class Dispatcher:
+    """Resolve paths into :class:`.Handler` for a root :class:`.Router`
+
+    :param router: the root router
+    :param cache_size: size of the resolve-result LRU cache for
+        dynamic paths, ``0`` to disable it
+    """
+    def __init__(self, router, cache_size=1000):
+        self.router = router
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.refresh()
+
+    def __repr__(self):
+        return '%s(%d static, %d dynamic, %d regex)' % (
+            self.__class__.__name__, len(self.static), self.dynamic,
+            len(self.fallback))
+    __str__ = __repr__
+
+    def refresh(self):
+        """Build the dispatch table, call it when routes are added or
+        removed from the router tree
+        """
+        self.trie = Node()
+        self.static = {}
+        self.dynamic = 0
+        self.fallback = []
+        if self.cache is not None:
+            self.cache.clear()
+        static = []
+        for priority, chain in enumerate(_chains(self.router)):
+            bits = _bits(chain)
+            if bits is None:
+                self.fallback.append((priority, chain))
+            elif any(converter for converter, _ in bits):
+                self._add(priority, chain, bits)
+                self.dynamic += 1
+            else:
+                self._add(priority, chain, bits)
+                static.append('/'.join(bit for _, bit in bits))
+        for path in static:
+            self.static[path] = self._match(path)
+
+    def resolve(self, url, method):
+        """Resolve a ``url`` for a given ``method``
+
+        Return a :class:`.Handler` or ``None`` when the url is not
+        served by any router, raise :class:`.MethodNotAllowed` when the
+        router does not handle ``method``.
+        """
+        path = url[1:]
+        match = self.static.get(path)
+        if match is None:
+            if self.cache is None:
+                match = self._match(path)
+            else:
+                match = self.cache.get(path)
+                if match is None:
+                    match = self._match(path)
+                    self.cache.set(path, match)
+        if match is NO_MATCH:
+            return
+        router, urlargs = match
+        handler = getattr(router, method.lower(), None)
+        if handler is None:
+            raise MethodNotAllowed
+        response_wrapper = router.response_wrapper
+        if response_wrapper:
+            handler = partial(response_wrapper, handler)
+        return Handler(router, handler, dict(urlargs))
+
+    def info(self):
+        """Dictionary of dispatch table statistics
+        """
+        info = dict(static=len(self.static),
+                    dynamic=self.dynamic,
+                    regex=len(self.fallback))
+        if self.cache is not None:
+            info['cache'] = self.cache.info()
+        return info
+
+    def _add(self, priority, chain, bits):
+        node = self.trie
+        node.add_priority(priority)
+        router = chain[-1]
+        for converter, bit in bits:
+            if converter is None:
+                node = node.static.setdefault(bit, Node())
+            elif isinstance(converter, PathConverter):
+                node.rest.append((priority, router, bit, converter))
+                return
+            else:
+                key = (bit, type(converter), converter.regex)
+                for param in node.params:
+                    if param[0] == key:
+                        node = param[-1]
+                        break
+                else:
+                    child = Node()
+                    regex = re.compile(converter.regex, re.UNICODE)
+                    node.params.append((key, bit, converter, regex.fullmatch,
+                                        child))
+                    node = child
+            node.add_priority(priority)
+        if node.endpoint is None or priority < node.endpoint[0]:
+            node.endpoint = (priority, router)
+
+    def _match(self, path):
+        best = _search(self.trie, path.split('/'), 0, {}, None)
+        for priority, chain in self.fallback:
+            if best is not None and best[0] < priority:
+                break
+            urlargs = _match_chain(chain, path)
+            if urlargs is not None:
+                best = (priority, chain[-1], urlargs)
+                break
+        return best[1:] if best else NO_MATCH
+
+
+def _search(node, bits, index, urlargs, best):
+    if index == len(bits):
+        endpoint = node.endpoint
+        if endpoint and (best is None or endpoint[0] < best[0]):
+            best = endpoint + (urlargs,)
+        return best
+    bit = bits[index]
+    child = node.static.get(bit)
+    if child and (best is None or child.priority < best[0]):
+        best = _search(child, bits, index + 1, urlargs, best)
+    for _, name, converter, fullmatch, child in node.params:
+        if best is not None and child.priority > best[0]:
+            continue
+        if fullmatch(bit):
+            try:
+                value = converter.to_python(bit)
+            except Http404:
+                continue
+            args = urlargs.copy()
+            args[name] = value
+            best = _search(child, bits, index + 1, args, best)
+    for priority, router, name, converter in node.rest:
+        if best is not None and priority > best[0]:
+            break
+        try:
+            value = converter.to_python('/'.join(bits[index:]))
+        except Http404:
+            continue
+        args = urlargs.copy()
+        args[name] = value
+        best = (priority, router, args)
+    return best
+
+
+def _match_chain(chain, path):
+    """Match ``path`` with the regular expressions of the routers in
+    ``chain``, the same way :meth:`.Router.resolve` does
+    """
+    urlargs = {}
+    for router in chain[:-1]:
+        route = router.route
+        match = route.match(path)
+        if match is None:
+            if route.is_leaf:
+                continue
+            return
+        remaining = match.pop('__remaining__', None)
+        if remaining is None:
+            return
+        path = remaining
+        urlargs.update(match)
+    match = chain[-1].route.match(path)
+    if match is not None and '__remaining__' not in match:
+        urlargs.update(match)
+        return urlargs
+
+
+def _chains(router, chain=()):
+    chain = chain + (router,)
+    yield chain
+    for child in router.routes:
+        yield from _chains(child, chain)
+
+
+def _bits(chain):
+    """The ``(converter, bit)`` pairs of an endpoint or ``None`` if the
+    endpoint cannot be matched segment by segment
+    """
+    bits = []
+    for router in chain:
+        route = router._route
+        if Route(route.rule, route.defaults).regex != route.regex:
+            return
+        converters = route._converters
+        bits.extend(((converters[bit] if dynamic else None), bit)
+                    for dynamic, bit in route.breadcrumbs)
+    for converter, _ in bits[:-1]:
+        if isinstance(converter, PathConverter):
+            return
+    if not route.is_leaf:
+        if bits and isinstance(bits[-1][0], PathConverter):
+            return
+        bits.append((None, ''))
+    return bits
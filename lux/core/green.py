@@ -3,12 +3,15 @@ from pulsar.apps.greenio import wait
 from pulsar.apps.wsgi import wsgi_request, handle_wsgi_error
 from pulsar.api import Http404
 
+from .dispatcher import Dispatcher
+
 
 class Handler:
 
     def __init__(self, app, router):
         self.app = app
         self.router = router
+        self.dispatcher = Dispatcher(router, app.config['ROUTE_CACHE_SIZE'])
         self.wait = wait if app.green_pool else pass_through
 
     def __call__(self, environ, start_response):
@@ -28,7 +31,7 @@ class Handler:
         path = request.path
         try:
             self.app.on_request(data=request)
-            hnd = self.router.resolve(path, request.method)
+            hnd = self.dispatcher.resolve(path, request.method)
             if hnd:
                 request.cache.set('app_handler', hnd.router)
                 request.cache.set('urlargs', hnd.urlargs)
@@ -53,8 +53,12 @@ class HtmlRouter(JsonRouter):
         resource(request)
 
     def get(self, request):
-        html = self.get_html(request)
-        return request.app.cms.html_response(request, html)
+        cms = request.app.cms
+        response = cms.cached_response(request)
+        if response is None:
+            html = self.get_html(request)
+            response = cms.html_response(request, html)
+        return response
 
     def get_inner_template(self, request, inner_template=None):
         return inner_template or self.template
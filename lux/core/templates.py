@@ -1,12 +1,18 @@
+import os
+import time
 import string
+from hashlib import sha1
 from datetime import date
 from collections import Mapping
 
 import jinja2
 
 from pulsar.api import ImproperlyConfigured
+from pulsar.utils.string import to_bytes
 
 from lux.utils.date import iso8601
+from lux.utils.lru import LRUCache
+from lux.utils.context import app_attribute
 
 SKIP = object()
 numbers = (int, float)
@@ -15,23 +21,35 @@ template_engines = {}
 
 def register_template_engine(cls):
     cls.name = cls.__name__.lower()
-    template_engines[cls.name] = cls()
+    template_engines[cls.name] = cls
     return cls
 
 
 def template_engine(app, name):
+    """Template engine ``name`` for application ``app``
+
+    Engines are instantiated and configured once per application
+    """
     cache = '_template_engine_%s' % name
     engine = getattr(app, cache, None)
     if engine is None:
-        engine = template_engines.get(name)
-        if engine is None:
+        Engine = template_engines.get(name)
+        if Engine is None:
             raise ImproperlyConfigured('Template engine %s not available'
                                        % name)
+        engine = Engine()
         engine.configure(app)
         setattr(app, cache, engine)
     return engine
 
 
+@app_attribute
+def template_index(app):
+    """The :class:`.TemplateIndex` of an application
+    """
+    return TemplateIndex(app)
+
+
 def render_data(app, value, render, context):
     """Safely render a data structure
     """
@@ -63,18 +81,118 @@ def _render_dict(app, d, render, context):
 
 class Template(str):
     """Mark a string to be a template
+
+    Templates loaded from the file system carry the ``path`` of the file
+    and its modification time ``mtime`` so that template engines can
+    cache compiled templates by file.
     """
-    def __new__(cls, template=None):
-        if isinstance(template, Template):
+    path = None
+    mtime = None
+
+    def __new__(cls, template=None, path=None, mtime=None):
+        if isinstance(template, Template) and not path:
             return template
         else:
-            return super().__new__(cls, template or '')
+            self = super().__new__(cls, template or '')
+            if path:
+                self.path = path
+                self.mtime = mtime
+            return self
 
     def render(self, app, context, engine=None):
         rnd = app.template_engine(engine)
         return rnd(self, context)
 
 
+class TemplateIndex:
+    """In-memory index of templates in the file system
+
+    Maps template names to full paths by scanning, only once, the
+    ``templates`` directory of all extensions in reversed order, so that
+    later extensions override earlier ones.
+    Template contents are read once and kept in memory.
+
+    When the application runs in debug mode and
+    :setting:`TEMPLATE_WATCH_INTERVAL` is positive, the file system is
+    polled for changes at most once every interval seconds.
+    """
+    def __init__(self, app):
+        self.app = app
+        interval = app.config['TEMPLATE_WATCH_INTERVAL']
+        self.interval = interval if app.debug else 0
+        self.last_check = time.time()
+        self.paths = None
+        self.templates = {}
+
+    def __len__(self):
+        return len(self.index())
+
+    def index(self):
+        """Dictionary mapping template names to full paths
+        """
+        self.check()
+        if self.paths is None:
+            self.paths = self.scan()
+        return self.paths
+
+    def full_path(self, names):
+        """Return a template full path or None
+        """
+        if not isinstance(names, (list, tuple)):
+            names = (names,)
+        paths = self.index()
+        for name in names:
+            path = paths.get(name)
+            if path:
+                return path
+
+    def get(self, names):
+        """Return a :class:`.Template` or None
+        """
+        path = self.full_path(names)
+        if path:
+            template = self.templates.get(path)
+            if template is None:
+                with open(path, 'r') as file:
+                    mtime = os.fstat(file.fileno()).st_mtime
+                    template = Template(file.read(), path, mtime)
+                self.templates[path] = template
+            return template
+
+    def clear(self):
+        """Invalidate the index
+        """
+        self.paths = None
+        self.templates.clear()
+
+    def check(self):
+        """Poll the file system for changes and clear the index if needed
+        """
+        if self.interval and time.time() - self.last_check > self.interval:
+            self.last_check = time.time()
+            changed = self.paths is not None and self.paths != self.scan()
+            if not changed:
+                changed = any((_mtime(path) != template.mtime
+                               for path, template in self.templates.items()))
+            if changed:
+                self.app.logger.debug('Templates changed, clear index')
+                self.clear()
+
+    def scan(self):
+        paths = {}
+        app = self.app
+        for ext in reversed(tuple(app.extensions.values())):
+            directory = ext.get_template_full_path(app, '')
+            if not directory or not os.path.isdir(directory):
+                continue
+            for root, _, files in os.walk(directory):
+                for file in files:
+                    path = os.path.join(root, file)
+                    name = os.path.relpath(path, directory)
+                    paths.setdefault(name.replace(os.sep, '/'), path)
+        return paths
+
+
 class TemplateEngine:
 
     def __call__(self, text, context):
@@ -94,9 +212,57 @@ class Python(TemplateEngine):
 
 @register_template_engine
 class Jinja2(TemplateEngine):
+    """Jinja2 template engine
+
+    Each application owns a :class:`jinja2.Environment` and a bounded
+    LRU cache of compiled templates. Templates loaded from the file system
+    are cached by path and recompiled when their modification time changes,
+    all other templates are cached by the hash of their source.
+    """
+    app = None
+    env = None
+    templates = None
 
     def __call__(self, text, *args, **kwargs):
-        return jinja2.Template(text).render(*args, **kwargs)
+        return self.compile(text).render(*args, **kwargs)
 
     def configure(self, app):
-        pass
+        self.app = app
+        self.env = jinja2.Environment(loader=jinja2.FunctionLoader(self.load),
+                                      auto_reload=app.debug)
+        self.templates = LRUCache(app.config['TEMPLATE_CACHE_SIZE'])
+
+    def compile(self, text):
+        """Compiled :class:`jinja2.Template` from ``text``
+        """
+        path = getattr(text, 'path', None)
+        if path:
+            key = path
+            mtime = text.mtime
+        else:
+            key = sha1(to_bytes(text)).hexdigest()
+            mtime = None
+        entry = self.templates.get(key)
+        if entry is None or entry[0] != mtime:
+            entry = (mtime, self.env.from_string(text))
+            self.templates.set(key, entry)
+        return entry[1]
+
+    def load(self, name):
+        """Jinja2 loader function for ``extends`` and ``include`` tags
+        """
+        template = self.app.template(name)
+        if template.path:
+            path = template.path
+            mtime = template.mtime
+            return template, path, lambda: _mtime(path) == mtime
+
+    def info(self):
+        return self.templates.info()
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
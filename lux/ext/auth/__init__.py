@@ -20,6 +20,9 @@ from .rest.tokens import TokenCRUD
 from .rest.user import UserRest, UserModel
 from .rest.users import UserCRUD
 from .backend import AuthBackend
+from .permissions import (
+    collect_policies_changes, invalidate_policies, discard_policies_changes
+)
 
 
 __all__ = [
@@ -52,6 +55,15 @@ class Extension(LuxExtension):
                   'Python dotted path to module which provides the '
                   '``encrypt`` and, optionally, ``decrypt`` method for '
                   'password and sensitive data encryption/decryption'),
+        Parameter('PASSWORD_EXECUTOR', 'thread',
+                  'Executor for password encryption and verification. '
+                  'One of "thread", "process" or None to run them in the '
+                  'request worker'),
+        Parameter('PASSWORD_WORKERS', 4,
+                  'Number of workers in the password executor'),
+        Parameter('PASSWORD_QUEUE_SIZE', 100,
+                  'Maximum number of pending password encryptions and '
+                  'verifications before responding with 503'),
         Parameter('PASSWORD_SECRET_KEY',
                   None,
                   'A string or bytes used for encrypting data. Must be unique '
@@ -59,7 +71,35 @@ class Extension(LuxExtension):
         Parameter('CHECK_USERNAME', 'lux.ext.auth:check_username',
                   'Dotted path to username validation function'),
         Parameter('MAX_TOKEN_SESSION_EXPIRY', 60*60*24*14,
-                  'Maximum length of session token expiry in seconds')
+                  'Maximum length of session token expiry in seconds'),
+        Parameter('TOKEN_ACCESS_STALENESS', 60,
+                  'Maximum time in seconds token last access timestamps '
+                  'are buffered before being written to the database. '
+                  'Set to 0 to write them at every token lookup'),
+        Parameter('TOKEN_ACCESS_BUFFER_SIZE', 1000,
+                  'Number of buffered token last access timestamps which '
+                  'triggers a write to the database'),
+        Parameter('AUTH_TOKEN_CACHE_TIMEOUT', 30,
+                  'Number of seconds bearer tokens and their users are '
+                  'cached in memory. Set to 0 to load them from the '
+                  'database at every request'),
+        Parameter('AUTH_TOKEN_CACHE_NEGATIVE_TIMEOUT', 5,
+                  'Number of seconds unknown bearer tokens are cached'),
+        Parameter('AUTH_TOKEN_CACHE_SIZE', 10000,
+                  'Maximum number of bearer tokens cached in memory'),
+        Parameter('CHANNEL_AUTH', 'auth',
+                  'Channel name for bearer token cache invalidation'),
+        Parameter('POLICY_ENGINE_CACHE_SIZE', 100,
+                  'Maximum number of compiled permission policy sets '
+                  'kept in memory'),
+        Parameter('PERMISSION_CACHE_TIMEOUT', 3600,
+                  'Timeout in seconds of users permission policies in the '
+                  'cache server. Policies are invalidated when users, '
+                  'groups or permissions change'),
+        Parameter('PERMISSION_GENERATION_TIMEOUT', 5,
+                  'Number of seconds the generation of permission policies '
+                  'is kept in memory, policies changed by other workers '
+                  'are seen after at most this time')
     ]
 
     def on_config(self, app):
@@ -67,6 +107,38 @@ class Extension(LuxExtension):
         if not app.config['PASSWORD_SECRET_KEY']:
             app.config['PASSWORD_SECRET_KEY'] = app.config['SECRET_KEY']
 
+    def on_close(self, app):
+        executor = getattr(app.auth, 'password_executor', None)
+        if executor is not None:
+            executor.shutdown(False)
+        buffer = getattr(app.models.get('tokens'), 'access_buffer', None)
+        if buffer is not None:
+            buffer.flush()
+
+    def on_after_flush(self, app, session):
+        """Collect updated or deleted tokens and users, and changed
+        groups and permissions
+        """
+        cache = getattr(app.auth, 'token_cache', None)
+        if cache is not None:
+            cache.collect_changes(session)
+        collect_policies_changes(app, session)
+
+    def on_after_commit(self, app, session):
+        """Invalidate cached bearer tokens and permission policies of
+        committed changes
+        """
+        cache = getattr(app.auth, 'token_cache', None)
+        if cache is not None:
+            cache.invalidate_changes(session)
+        invalidate_policies(app, session)
+
+    def on_after_rollback(self, app, session):
+        cache = getattr(app.auth, 'token_cache', None)
+        if cache is not None:
+            cache.discard_changes(session)
+        discard_policies_changes(session)
+
     def on_token(self, app, request, token, user):
         if user and user.is_authenticated():
             token['username'] = user.username
@@ -1,6 +1,8 @@
 from datetime import datetime
+from uuid import UUID
 
 from pulsar.api import BadRequest, Http401, PermissionDenied, Http404
+from pulsar.utils.log import lazyproperty
 
 from sqlalchemy.exc import StatementError
 from sqlalchemy.orm import joinedload
@@ -11,12 +13,17 @@ from lux.utils.auth import normalise_email
 from lux.utils.data import compact_dict
 
 from .rest.user import CreateUserSchema
+from .principals import TokenCache, MISSING
 
 
 class AuthBackend(AuthBackendBase):
     """Mixin to implement authentication backend based on
     SQLAlchemy models
     """
+    @lazyproperty
+    def token_cache(self):
+        return TokenCache(self.app)
+
     def on_request(self, request):
         auth = request.get('HTTP_AUTHORIZATION')
         cache = request.cache
@@ -103,6 +110,25 @@ class AuthBackend(AuthBackendBase):
         return token
 
     def get_token(self, request, key):
+        """Get a bearer token, as a detached :class:`.TokenPrincipal`
+        when the :attr:`token_cache` is enabled
+        """
+        cache = self.token_cache
+        if not cache.enabled:
+            return self.load_token(request, key)
+        try:
+            key = str(UUID(key))
+        except ValueError:
+            raise BadRequest from None
+        token = cache.get(key)
+        if token is None:
+            token = cache.set(key, self.load_token(request, key))
+        if token is not MISSING:
+            return token
+
+    def load_token(self, request, key):
+        """Load a bearer token, with its user, from the database
+        """
         odm = request.app.odm()
         token = odm.token
         with odm.begin() as session:
@@ -1,11 +1,17 @@
+import json
+import uuid
 from itertools import chain
 
 from lux.core.auth import ACTIONS
-from lux.core import cached
 from lux.models import Schema, ValidationError, fields
+from lux.utils.context import app_attribute
+from lux.utils.lru import LRUCache
 from marshmallow.validate import OneOf
 
 
+POLICIES_CHANGES_KEY = 'auth_policies_changes'
+
+
 class PolicySchema(Schema):
     effect = fields.String(
         validator=OneOf(('allow', 'deny')), default='allow'
@@ -37,9 +43,7 @@ class PemissionsMixin:
         if user.is_superuser():
             return True
         else:
-            # Get permissions list for the current request
-            policies = self.get_permission_policies(request)
-            return has_permission(request, policies, resource, action)
+            return self.policy_checker(request)(resource, action)
 
     def get_permissions(self, request, resources, actions=None):
         if not actions:
@@ -52,12 +56,11 @@ class PemissionsMixin:
         obj = {}
 
         if not request.cache.user.is_superuser():
-            permissions = self.get_permission_policies(request)
+            checker = self.policy_checker(request)
             for resource in resources:
                 perms = {}
                 for action in actions:
-                    perms[action] = has_permission(request, permissions,
-                                                   resource, action)
+                    perms[action] = checker(resource, action)
                 obj[resource] = perms
 
         else:
@@ -66,28 +69,156 @@ class PemissionsMixin:
 
         return obj
 
-    @cached(user=True)
+    def policy_checker(self, request):
+        """The :class:`.PolicyChecker` for the current request user
+        """
+        user = request.cache.user
+        checker = request.cache.policy_checker
+        if checker is None or checker.user is not user:
+            policies = self.get_permission_policies(request)
+            checker = PolicyChecker(request, policies)
+            request.cache.policy_checker = checker
+        return checker
+
     def get_permission_policies(self, request):
         """Returns a list of permission policy documents for the
-        current request
+        current request user
 
-        Cache results on a user basis
+        Policies are cached on a user basis, in the application cache
+        server, until :func:`invalidate_policies` removes them or starts
+        a new generation of policies
         """
         user = request.cache.user
         users = request.app.models.get('users')
         groups = request.app.models.get('groups')
-        perms = []
-        if not users or not groups or not user.is_authenticated():
-            return perms
-        with users.session(request) as session:
-            session.add(user)
-            for group in set(user.groups):
-                for permission in group.permissions:
-                    policy = permission.policy
-                    if not isinstance(policy, list):
-                        policy = (policy,)
-                    perms.extend(policy)
-        return perms
+        if (not users or not groups or not user.is_authenticated() or
+                user.is_anonymous()):
+            return []
+        app = request.app
+        key = policies_key(app, user.id)
+        policies = app.cache_server.get_json(key)
+        if policies is None:
+            with users.session(request) as session:
+                policies = load_policies(session, user.id)
+            app.cache_server.set_json(
+                key, policies, timeout=app.config['PERMISSION_CACHE_TIMEOUT']
+            )
+        return policies
+
+
+def policies_key(app, user_id):
+    """Cache key of a user permission policies
+
+    The key includes the current policies generation, therefore a call
+    to :func:`new_policies_generation` invalidates the policies of all
+    users without scanning the cache
+    """
+    return '%s-permission-policies-%s-%s' % (app.config['APP_NAME'],
+                                             policies_generation(app),
+                                             user_id)
+
+
+def policies_generation_key(app):
+    return '%s-permission-policies-generation' % app.config['APP_NAME']
+
+
+def policies_generation(app):
+    """The current generation of cached permission policies
+
+    The generation is kept in process for
+    :setting:`PERMISSION_GENERATION_TIMEOUT` seconds, so that policy
+    checks do not read it from the cache server every time
+    """
+    local = local_policies_generation(app)
+    generation = local.get('generation')
+    if generation is None:
+        generation = app.cache_server.get_json(policies_generation_key(app))
+        if generation is None:
+            generation = new_policies_generation(app)
+        else:
+            local.set('generation', generation,
+                      app.config['PERMISSION_GENERATION_TIMEOUT'])
+    return generation
+
+
+def new_policies_generation(app):
+    """Start a new generation of cached permission policies
+    """
+    generation = uuid.uuid4().hex
+    app.cache_server.set_json(policies_generation_key(app), generation)
+    local_policies_generation(app).set(
+        'generation', generation, app.config['PERMISSION_GENERATION_TIMEOUT']
+    )
+    return generation
+
+
+@app_attribute
+def local_policies_generation(app):
+    return LRUCache(1)
+
+
+def load_policies(session, user_id):
+    """Load the permission policies of a user with a single query
+    """
+    odm = session.app.odm()
+    permission = odm.permission
+    query = session.query(permission.id, permission.policy).join(
+        permission.groups
+    ).join(
+        odm.group.users
+    ).filter(
+        odm.user.id == user_id
+    ).order_by(permission.id)
+    policies = []
+    seen = set()
+    for id, policy in query:
+        if id not in seen:
+            seen.add(id)
+            if not isinstance(policy, list):
+                policy = (policy,)
+            policies.extend(policy)
+    return policies
+
+
+def collect_policies_changes(app, session):
+    """Collect changes to permission policies in a flush of ``session``
+
+    Changes to groups or permissions, which include changes to the
+    ``users_groups`` and ``groups_permissions`` association tables, start
+    a new generation of policies for all users. Changes to a user clear
+    its policies. Policies are invalidated by :func:`invalidate_policies`
+    once the transaction is committed.
+    """
+    odm = app.odm()
+    changes = session.info.setdefault(POLICIES_CHANGES_KEY,
+                                      {'generation': False, 'users': set()})
+    for instance, event in session.changes():
+        if isinstance(instance, (odm.group, odm.permission)):
+            changes['generation'] = True
+        elif event != 'create' and isinstance(instance, odm.user):
+            changes['users'].add(instance.id)
+
+
+def invalidate_policies(app, session):
+    """Invalidate cached permission policies of the changes collected
+    from a committed ``session``
+    """
+    changes = session.info.pop(POLICIES_CHANGES_KEY, None)
+    if not changes:
+        return
+    if changes['generation']:
+        new_policies_generation(app)
+    else:
+        cache = app.cache_server
+        for user_id in changes['users']:
+            cache.delete(policies_key(app, user_id))
+
+
+def discard_policies_changes(session):
+    """Discard changes to permission policies collected from a rolled
+    back ``session``
+    """
+    session.info.pop(POLICIES_CHANGES_KEY, None)
 
 
 def user_permissions(request):
@@ -108,76 +239,202 @@ def has_permission(request, policies, resource, action):
     :param resource: resource string, colon separated
     :param action: action to check permission for
     '''
-    namespaces = resource.split(':')
-    available_policies = []
-    #
-    # First select appropriate policies
-    for policy in chain(policies, request.config['DEFAULT_POLICY']):
-        resources = policy.get('resource')
-        if resources and _has_policy_actions(action, policy.get('action')):
-            effect = EFFECTS.get(policy.get('effect', 'allow'))
-            condition = policy.get('condition')
-            if not isinstance(resources, list):
-                resources = (resources,)
-            for available_resource in resources:
-                bits = available_resource.split(':')
-                if len(bits) > len(namespaces):
-                    continue
-                available_policies.append((bits, effect, condition))
-
-    if not available_policies:
-        return False
+    return PolicyChecker(request, policies)(resource, action)
 
-    context = {
-        'user': request.cache.user,
-        'env': request.cache
-    }
 
-    while namespaces:
-        has = {}
-        for policy, effect, condition in available_policies:
-            if len(policy) != len(namespaces):
-                continue
+@app_attribute
+def policy_engines(app):
+    """Compiled :class:`.PolicyEngine` keyed by policy documents
+    """
+    return LRUCache(app.config['POLICY_ENGINE_CACHE_SIZE'])
 
-            match = {}
-            count = 0
-            for a, b in zip(namespaces, policy):
-                if a == b:
-                    continue
-                elif b == '*':
-                    match[count] = a
-                    count += 1
-                else:
-                    match = False
-                    break
 
-            if match is False:  # No match
-                continue
+class PolicyChecker:
+    """Check permissions for a request against a list of policies
+
+    The policies, together with the :setting:`DEFAULT_POLICY`, are compiled
+    into a :class:`.PolicyEngine` once per set of policies and results are
+    memoised per resource and action.
+    """
+    def __init__(self, request, policies):
+        self.user = request.cache.user
+        self.logger = request.logger
+        self.context = {
+            'user': self.user,
+            'env': request.cache
+        }
+        self.results = {}
+        engines = policy_engines(request.app)
+        key = json.dumps(policies, sort_keys=True, default=str)
+        self.engine = engines.get(key)
+        if self.engine is None:
+            self.engine = PolicyEngine(
+                chain(policies, request.config['DEFAULT_POLICY'])
+            )
+            engines.set(key, self.engine)
+
+    def __call__(self, resource, action):
+        key = (resource, action)
+        if key not in self.results:
+            self.results[key] = self.engine.has_permission(
+                resource, action, self.context, self.logger)
+        return self.results[key]
+
+
+class PolicyNode:
+    __slots__ = ('children', 'wildcard', 'policies')
+
+    def __init__(self):
+        self.children = {}
+        self.wildcard = None
+        self.policies = []
+
+    def child(self, bit):
+        if bit == '*':
+            if self.wildcard is None:
+                self.wildcard = PolicyNode()
+            return self.wildcard
+        return self.children.setdefault(bit, PolicyNode())
+
+
+class PolicyEngine:
+    """Policies compiled into a trie on resource segments
+
+    Each ``*`` segment of a policy resource is a wildcard edge of the trie,
+    actions are normalised into sets and conditions compiled into code
+    objects. A resource is checked by walking the trie once.
+    """
+    def __init__(self, policies):
+        self.root = PolicyNode()
+        self.size = 0
+        for policy in policies:
+            self.add(policy)
 
-            if condition:
-                local = {'match': match}
-                try:
-                    if not eval(condition, context, local):
+    def add(self, policy):
+        resources = policy.get('resource')
+        if not resources:
+            return
+        actions = policy_actions(policy.get('action'))
+        if not actions:
+            return
+        effect = EFFECTS.get(policy.get('effect', 'allow'))
+        condition = policy.get('condition')
+        if condition:
+            condition = (compile_condition(condition), condition)
+        if not isinstance(resources, list):
+            resources = (resources,)
+        for resource in resources:
+            node = self.root
+            for bit in resource.split(':'):
+                node = node.child(bit)
+            node.policies.append((self.size, actions, effect, condition))
+            self.size += 1
+
+    def match(self, resource, action):
+        """Policies matching ``resource`` and ``action``
+
+        Return a list with the ``(policy, wildcard matches)`` pairs of
+        each prefix of ``resource``, from the shortest to the longest
+        """
+        if not isinstance(action, str):
+            action = None
+        elif action:
+            action = action.lower()
+        levels = []
+        nodes = [(self.root, ())]
+        for bit in resource.split(':'):
+            matched = []
+            children = []
+            for node, matches in nodes:
+                if bit == '*':
+                    edges = ((node.wildcard, matches),)
+                else:
+                    edges = ((node.children.get(bit), matches),
+                             (node.wildcard, matches + (bit,)))
+                for child, child_matches in edges:
+                    if child is None:
                         continue
-                except Exception as exc:
-                    request.logger.error(
-                        'Could not evaluate policy condition "%s" '
-                        'on resource "%s": %s',
-                        condition, resource, exc)
+                    children.append((child, child_matches))
+                    for policy in child.policies:
+                        actions = policy[1]
+                        if actions is ALL or action in actions:
+                            matched.append((policy, child_matches))
+            levels.append(matched)
+            if not children:
+                break
+            nodes = children
+        return levels
+
+    def has_permission(self, resource, action, context, logger):
+        """Check for permission to perform an ``action`` on a ``resource``
+
+        The longest resource prefix with matching policies decides, among
+        those the policies with fewer wildcards win and a deny takes
+        precedence over an allow.
+        """
+        for matched in reversed(self.match(resource, action)):
+            if not matched:
+                continue
+            matched.sort(key=_policy_order)
+            has = {}
+            for (_, _, effect, condition), matches in matched:
+                match = dict(enumerate(matches))
+                if condition:
+                    code, source = condition
+                    try:
+                        if not eval(code, context, {'match': match}):
+                            continue
+                    except Exception as exc:
+                        logger.error(
+                            'Could not evaluate policy condition "%s" '
+                            'on resource "%s": %s',
+                            source, resource, exc)
+                        return False
+
+                if not match and not effect:
                     return False
 
-            if not match and not effect:
-                return False
+                if has.get(len(match)) is not False:
+                    has[len(match)] = effect
 
-            if has.get(len(match)) is not False:
-                has[len(match)] = effect
+            if has:
+                return has[min(has)]
 
-        if has:
-            return has[sorted(has)[0]]
+        return False
 
-        namespaces.pop()
 
-    return False
+ALL = '*'
+
+
+def policy_actions(actions):
+    """Normalise policy actions into :data:`ALL` or a set of lower case
+    actions
+    """
+    if actions == ALL:
+        return ALL
+    elif isinstance(actions, (list, tuple)):
+        normalised = set()
+        for action in actions:
+            action = policy_actions(action)
+            if action is ALL:
+                return ALL
+            normalised.update(action)
+        return frozenset(normalised)
+    elif isinstance(actions, str):
+        return frozenset((actions.lower(),))
+    return frozenset()
+
+
+def compile_condition(condition):
+    """Compile a policy condition into a code object
+
+    Invalid conditions are returned as they are so that the error is
+    reported when they are evaluated
+    """
+    try:
+        return compile(condition, '<policy condition>', 'eval')
+    except Exception:
+        return condition
 
 
 def validate_policy(policy):
@@ -199,12 +456,5 @@ def validate_single_policy(schema, policy):
     return policy
 
 
-def _has_policy_actions(action, actions):
-    if actions == '*':
-        return True
-    elif isinstance(actions, (list, tuple)):
-        for act in actions:
-            if _has_policy_actions(action, act):
-                return True
-    elif isinstance(action, str) and isinstance(actions, str):
-        return action.lower() == actions.lower()
+def _policy_order(match):
+    return match[0][0]
@@ -0,0 +1,192 @@
+"""Detached principals for bearer tokens and their in-process cache
+"""
+import uuid
+from datetime import datetime
+
+from pulsar.utils.structures import AttributeDictionary
+
+from lux.core import User
+from lux.models import Component
+from lux.utils.lru import LRUCache
+
+
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name',
+               'active', 'superuser', 'joined', 'full_name')
+TOKEN_FIELDS = ('id', 'user_id', 'created', 'expiry', 'session',
+                'description')
+MISSING = 'missing'
+CHANGES_KEY = 'auth_token_changes'
+
+
+class UserPrincipal(User):
+    """A user detached from the database session
+    """
+    def is_active(self):
+        return bool(self.active)
+
+    @classmethod
+    def create(cls, user):
+        return cls(((name, getattr(user, name, None))
+                    for name in USER_FIELDS))
+
+
+def load_user(request, session):
+    """Return the database instance of the request user in ``session``
+
+    A :class:`.UserPrincipal` is reloaded by id, any other user is
+    returned as it is
+    """
+    user = request.cache.user
+    if isinstance(user, UserPrincipal):
+        user = request.app.models['users'].get_one(session, id=user.id)
+    return user
+
+
+class TokenPrincipal(AttributeDictionary):
+    """A token detached from the database session
+    """
+    def __repr__(self):
+        return str(self.id)
+    __str__ = __repr__
+
+    @classmethod
+    def create(cls, token):
+        principal = cls(((name, getattr(token, name, None))
+                         for name in TOKEN_FIELDS))
+        if token.user:
+            principal.user = UserPrincipal.create(token.user)
+        return principal
+
+
+class TokenCache(Component):
+    """Map bearer tokens into :class:`.TokenPrincipal`
+
+    Tokens are cached for :setting:`AUTH_TOKEN_CACHE_TIMEOUT` seconds, or
+    until they expire, while unknown tokens are cached for
+    :setting:`AUTH_TOKEN_CACHE_NEGATIVE_TIMEOUT` seconds.
+    When publish/subscribe channels are available, invalidations are
+    propagated to other workers via the :setting:`CHANNEL_AUTH` channel,
+    including changes made from commands, threads and non-green code.
+    """
+    subscribed = False
+
+    def __init__(self, app):
+        self.init_app(app)
+        self.uid = uuid.uuid4().hex
+        self.local = LRUCache(self.config['AUTH_TOKEN_CACHE_SIZE'])
+
+    def __repr__(self):
+        return repr(self.local)
+    __str__ = __repr__
+
+    def __len__(self):
+        return len(self.local)
+
+    @property
+    def enabled(self):
+        return bool(self.config['AUTH_TOKEN_CACHE_TIMEOUT'])
+
+    def get(self, key):
+        """Get the cached principal for token ``key``
+
+        Return ``None`` when the token is not in cache, :data:`MISSING`
+        when the token is known not to exist
+        """
+        self._subscribe()
+        return self.local.get(key)
+
+    def set(self, key, token):
+        """Cache a token, or its absence when ``token`` is ``None``
+
+        Return the cached principal or :data:`MISSING`
+        """
+        config = self.config
+        if token is None:
+            value = MISSING
+            timeout = config['AUTH_TOKEN_CACHE_NEGATIVE_TIMEOUT']
+        else:
+            value = TokenPrincipal.create(token)
+            timeout = config['AUTH_TOKEN_CACHE_TIMEOUT']
+            if value.expiry:
+                expiry = value.expiry - datetime.utcnow()
+                timeout = max(min(timeout, expiry.total_seconds()), 0)
+        if timeout:
+            self.local.set(key, value, timeout)
+        return value
+
+    def invalidate(self, tokens=None, users=None):
+        """Remove ``tokens`` and tokens of ``users`` from this cache and from
+        the caches of other workers
+        """
+        tokens = [str(token) for token in tokens or ()]
+        users = [str(user) for user in users or ()]
+        if tokens or users:
+            self._invalidate_local(tokens, users)
+            self._publish(tokens=tokens, users=users)
+
+    def collect_changes(self, session):
+        """Collect tokens and users updated or deleted in ``session``
+
+        They are invalidated by :meth:`invalidate_changes` once the
+        transaction is committed, so that other workers do not cache
+        them again from the database before the changes are visible
+        """
+        odm = self.app.odm()
+        tokens, users = session.info.setdefault(CHANGES_KEY, (set(), set()))
+        for instance, event in session.changes():
+            if event == 'create':
+                continue
+            elif isinstance(instance, odm.token):
+                tokens.add(instance.id)
+            elif isinstance(instance, odm.user):
+                users.add(instance.id)
+
+    def invalidate_changes(self, session):
+        """Invalidate tokens and users collected from ``session``
+        """
+        tokens, users = session.info.pop(CHANGES_KEY, ((), ()))
+        self.invalidate(tokens, users)
+
+    def discard_changes(self, session):
+        """Discard tokens and users collected from a rolled back
+        ``session``
+        """
+        session.info.pop(CHANGES_KEY, None)
+
+    def info(self):
+        return self.local.info()
+
+    # INTERNALS
+    def _invalidate_local(self, tokens, users):
+        for key in tokens:
+            self.local.pop(key)
+        if users:
+            users = set(users)
+            for key in self.local:
+                value = self.local.get(key)
+                user = getattr(value, 'user', None)
+                if user and str(user.id) in users:
+                    self.local.pop(key)
+
+    def _invalidate(self, channel, match, data):
+        if data and data.get('origin') != self.uid:
+            self._invalidate_local(data.get('tokens', ()),
+                                   data.get('users', ()))
+
+    def _subscribe(self):
+        channels = self.app.channels
+        if not self.subscribed and channels is not None:
+            self.subscribed = True
+            channels.register(self.config['CHANNEL_AUTH'], 'invalidate',
+                              self._invalidate)
+
+    def _publish(self, **data):
+        channels = self.app.channels
+        if channels is not None:
+            self._subscribe()
+            data['origin'] = self.uid
+            try:
+                channels.publish(self.config['CHANNEL_AUTH'], 'invalidate',
+                                 data)
+            except Exception:
+                self.logger.exception('Could not publish token invalidation')
@@ -128,4 +128,6 @@ class Authorization(RestRouter):
             if not token:
                 raise Http401
             raise BadRequest
+        with self.model.begin_session() as session:
+            token = self.model.get_one(session, id=token.id)
         return self.model.delete_one_response(request, token)
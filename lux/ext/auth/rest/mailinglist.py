@@ -29,9 +29,9 @@ class MailingListSchema(Schema):
                     topic=topic
                 )
             else:
-                self.cleaned_data['user'] = user
+                self.cleaned_data['user_id'] = user.id
                 query.filter(
-                    user=user,
+                    user_id=user.id,
                     topic=topic
                 )
             try:
@@ -30,12 +30,15 @@ class ChangePasswordSchema(PasswordSchema):
     def clean_old_password(self, value):
         request = self.request
         user = request.cache.user
-        auth_backend = request.cache.auth_backend
         try:
-            if user.is_authenticated():
-                auth_backend.authenticate(request, user=user, password=value)
-            else:
+            if not user.is_authenticated():
                 raise AuthenticationError('not authenticated')
+            # the request user can be detached, authenticate the database
+            # instance
+            users = request.app.models['users']
+            with users.begin_session() as session:
+                session.auth.authenticate(session, id=user.id,
+                                          password=value)
         except AuthenticationError as exc:
             raise fields.ValidationError(str(exc))
         return value
@@ -1,4 +1,10 @@
+import time
 from datetime import datetime
+from threading import Lock
+
+import sqlalchemy as sa
+
+from pulsar.utils.log import lazyproperty
 
 from lux.models import Schema, fields
 from lux.ext.rest import RestRouter, route
@@ -20,14 +26,168 @@ class TokenCreateSchema(TokenSchema):
 
 class TokenModel(Model):
 
+    @lazyproperty
+    def access_buffer(self):
+        return LastAccess(self)
+
     def get_one(self, session, *filters, **kwargs):
         query = self.query(session, *filters, **kwargs)
         token = query.one()
-        query.update({'last_access': datetime.utcnow()},
-                     synchronize_session=False)
+        if self.config['TOKEN_ACCESS_STALENESS']:
+            self.access_buffer.touch(token.id)
+        else:
+            query.update({'last_access': datetime.utcnow()},
+                         synchronize_session=False)
         return token
 
 
+class LastAccess:
+    """Write-behind buffer for tokens ``last_access`` timestamps
+
+    Timestamps are coalesced per token in memory and written with a single
+    bulk update when the buffer reaches ``TOKEN_ACCESS_BUFFER_SIZE``
+    entries, when the oldest entry is older than
+    ``TOKEN_ACCESS_STALENESS`` seconds and when the application closes.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.app = model.app
+        self._entries = {}
+        self._since = None
+        self._timer = None
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def staleness(self):
+        return self.app.config['TOKEN_ACCESS_STALENESS']
+
+    def touch(self, token_id, when=None):
+        """Record an access to a token
+        """
+        when = when or datetime.utcnow()
+        with self._lock:
+            previous = self._entries.get(token_id)
+            if not previous or previous < when:
+                self._entries[token_id] = when
+            if self._since is None:
+                self._since = time.time()
+                self._schedule()
+            flush = (
+                len(self._entries) >= self.app.config[
+                    'TOKEN_ACCESS_BUFFER_SIZE'] or
+                time.time() - self._since >= self.staleness
+            )
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Write buffered timestamps to the database
+
+        Return the number of tokens updated. When the update fails the
+        timestamps are buffered again for the next flush.
+        """
+        with self._lock:
+            entries, self._entries = self._entries, {}
+            self._since = None
+            self._cancel()
+        if not entries:
+            return 0
+        try:
+            with self.model.begin_session() as session:
+                bulk_update(session, self.model.db_model.__table__, entries)
+        except Exception:
+            self.app.logger.exception(
+                'Could not update last access of %d tokens', len(entries))
+            self._requeue(entries)
+            return 0
+        return len(entries)
+
+    def _requeue(self, entries):
+        with self._lock:
+            for token_id, when in entries.items():
+                previous = self._entries.get(token_id)
+                if not previous or previous < when:
+                    self._entries[token_id] = when
+            if self._since is None:
+                self._since = time.time()
+                self._schedule()
+
+    def _schedule(self):
+        """Schedule a flush after :attr:`staleness` seconds in the event
+        loop, from any thread
+        """
+        try:
+            loop = self.app._loop
+        except RuntimeError:
+            return
+        if loop.is_running():
+            loop.call_soon_threadsafe(self._start_timer, loop)
+
+    def _start_timer(self, loop):
+        with self._lock:
+            if self._since is not None and not self._timer:
+                timer = loop.call_later(self.staleness, self._flush_later,
+                                        loop)
+                self._timer = (loop, timer)
+
+    def _cancel(self):
+        if self._timer:
+            loop, timer = self._timer
+            loop.call_soon_threadsafe(timer.cancel)
+            self._timer = None
+
+    def _flush_later(self, loop):
+        """Flush in the green pool or, without greenlets, in the event
+        loop executor so that the database update never blocks the loop
+        """
+        with self._lock:
+            self._timer = None
+        pool = self.app.green_pool
+        if pool:
+            pool.submit(self.flush)
+        else:
+            loop.run_in_executor(None, self.flush)
+
+
+def bulk_update(session, table, entries):
+    """Update ``last_access`` of tokens in one statement
+
+    Uses ``UPDATE ... FROM (VALUES ...)`` with PostgreSQL and an
+    executemany update otherwise
+    """
+    bind = session.get_bind(clause=table)
+    if bind.dialect.name == 'postgresql':
+        params = {}
+        values = []
+        for index, (token_id, when) in enumerate(entries.items()):
+            params['id%d' % index] = str(token_id)
+            params['t%d' % index] = when
+            values.append('(CAST(:id%d AS uuid), CAST(:t%d AS timestamp))'
+                          % (index, index))
+        session.execute(sa.text(
+            'UPDATE {table} SET last_access = v.last_access '
+            'FROM (VALUES {values}) AS v (id, last_access) '
+            'WHERE {table}.id = v.id AND ({table}.last_access IS NULL OR '
+            '{table}.last_access < v.last_access)'.format(
+                table=table.name, values=', '.join(values))
+        ), params)
+    else:
+        column = table.c.last_access
+        session.execute(
+            table.update().where(
+                table.c.id == sa.bindparam('_id', type_=table.c.id.type)
+            ).where(
+                sa.or_(column.is_(None),
+                       column < sa.bindparam('_last_access'))
+            ).values(last_access=sa.bindparam('_last_access')),
+            [dict(_id=token_id, _last_access=when)
+             for token_id, when in entries.items()]
+        )
+
+
 class TokenCRUD(RestRouter):
     """
     ---
@@ -9,6 +9,7 @@ from lux.ext.odm import Model, Related
 
 from .permissions import PermissionSchema
 from ..permissions import user_permissions
+from ..principals import UserPrincipal
 
 
 URI = 'users'
@@ -70,6 +71,8 @@ class UserModel(Model):
             user = session.request.cache.get('user')
             if not user.is_authenticated():
                 raise Http401('token')
+            if isinstance(user, UserPrincipal):
+                user = super().get_one(session, id=user.id)
             return user
         return super().get_one(session, *args, **kwargs)
 
@@ -7,6 +7,7 @@ from .rest import ContentCRUD
 from .cms import CMS, LazyContext
 from .github import GithubHook, EventHandler, PullRepo
 from .files import content_location
+from .contents import render_executor
 from .views import TemplateRouter
 
 
@@ -31,6 +32,24 @@ class Extension(LuxExtension):
         }, 'List of content model configurations'),
         Parameter('CONTENT_LOCATION', None,
                   'Directory where content is located inside CONTENT_REPO'),
+        Parameter('CONTENT_INDEX', None,
+                  'Path of a sqlite index of parsed content files. When set '
+                  'only new and modified files are parsed when a content '
+                  'group is loaded, otherwise all files of a group are '
+                  'parsed when not in cache. Relative paths are relative to '
+                  'the content location, use an absolute path to keep the '
+                  'index outside the content repository'),
+        Parameter('CONTENT_INDEX_TIMEOUT', 60,
+                  'Number of seconds a content group is served from the '
+                  'index before checking the file system for changes. '
+                  'Set to 0 to check only when the application reloads'),
+        Parameter('MD_WORKERS', 0,
+                  'Number of worker processes rendering markdown files '
+                  'when a content group is loaded. Set to 0 to render '
+                  'files in the application process'),
+        Parameter('CMS_PAGE_CACHE_SIZE', 10000,
+                  'Maximum number of paths whose matching content group page '
+                  'is kept in memory'),
         Parameter('HTML_TEMPLATES_URL', 'templates',
                   'Base url for serving HTML templates when the default '
                   'content type is text/html. Set to None if not needed.'),
@@ -50,6 +69,11 @@ class Extension(LuxExtension):
         if app.config['DEFAULT_CONTENT_TYPE'] == 'text/html':
             app.cms = CMS(app)
 
+    def on_close(self, app):
+        executor = render_executor(app)
+        if executor:
+            executor.shutdown(False)
+
     def api_sections(self, app):
         location = content_location(app)
         if not location:
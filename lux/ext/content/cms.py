@@ -5,6 +5,7 @@ from pulsar.apps.wsgi import Route
 from pulsar.api import Http404
 
 from lux.utils.context import app_attribute
+from lux.utils.lru import LRUCache
 from lux.ext.sitemap import Sitemap, SitemapIndex
 from lux.core import (
     cached, Template, Page, HtmlRouter, CMS as CMSbase
@@ -68,6 +69,13 @@ class CMS(CMSbase):
     def api(self):
         return self.app.api
 
+    @property
+    def content_model(self):
+        """The :class:`.ContentModel` serving contents in process or
+        ``None`` when the content api is remote
+        """
+        return local_content_model(self.app)
+
     def middleware(self):
         processed = set()
         yield CMSmap('/sitemap.xml', cms=self)
@@ -87,21 +95,41 @@ class CMS(CMSbase):
         """
         return app_sitemap(request.app)
 
+    def page(self, request):
+        """Obtain a page object from a request via the :class:`.PageMatcher`
+        of content groups
+        """
+        matcher = page_matcher(request.app)
+        if matcher is None:
+            return super().page(request)
+        matched = matcher.match(request.path[1:])
+        if matched:
+            page, urlargs = matched
+            page = page.copy()
+            page.urlargs = dict(urlargs)
+            return page
+        return Page()
+
     def inner_html(self, request, page, inner_html=None):
         try:
             if not page.name:
                 raise Http404
             path = page.urlargs.get('path') or 'index'
-            data = self.api.get(
-                '/%s/%s/%s' % (self.api_contents_path, page.name, path),
-                auth_error=Http404
-            ).json()
+            data = self.get_content(request, page.name, path)
             inner_html = self.data_to_html(page, data, inner_html)
         except Http404:
             if request.cache.get('cms_router'):
                 raise
         return super().inner_html(request, page, inner_html)
 
+    def fragment_key(self, request, page, inner_html):
+        """Fragments of contents served in process are cached, they are
+        the same for all users
+        """
+        if page.name and self.content_model is not None:
+            path = page.urlargs.get('path') or 'index'
+            return (page.name, path, inner_html)
+
     def context(self, request, context=None):
         ctx = dict(context or ())
         app = request.app
@@ -113,12 +141,8 @@ class CMS(CMSbase):
     @cached(key='cms:context')
     def context_data(self, request):
         try:
-            params = {'load_only': ['slug', 'body']}
-            return self.api.get(
-                '/%s/%s' % (self.api_contents_path, self.api_context_path),
-                params=params,
-                auth_error=Http404
-            ).json()['result']
+            return self.get_contents(request, self.api_context_path,
+                                     load_only=('slug', 'body'))
         except Http404 as exc:
             exc = str(exc)
             if exc:
@@ -161,8 +185,56 @@ class CMS(CMSbase):
         params = None
         if self.set_priority:
             params = {'priority:gt': 0}
-        data = self.api.get('contents/%s' % group, params=params).json()
-        return data['result']
+        return self.get_contents(request, group, **(params or {}))
+
+    def get_content(self, request, group, slug):
+        """Get the content ``slug`` in ``group`` as a dictionary
+
+        Contents are read from the :attr:`content_model` when available,
+        otherwise from the remote content api.
+        Raise :class:`.Http404` when the content is not available
+        """
+        model = self.content_model
+        if model is None:
+            return self.api.get(
+                '/%s/%s/%s' % (self.api_contents_path, group, slug),
+                auth_error=Http404
+            ).json()
+        data = model.contents(group, (slug,))
+        if not data:
+            raise Http404
+        return data[0]
+
+    def get_contents(self, request, group, load_only=None, **params):
+        """Get the list of contents in ``group``
+
+        :param load_only: optional list of fields to load, when not
+            provided the ``body`` is not loaded
+        :param params: key-valued filters, only ``priority:gt`` is
+            supported in process
+        """
+        model = self.content_model
+        if model is None:
+            if load_only:
+                params['load_only'] = list(load_only)
+            return self.api.get(
+                '/%s/%s' % (self.api_contents_path, group),
+                params=params or None,
+                auth_error=Http404
+            ).json()['result']
+        priority = params.get('priority:gt')
+        data = []
+        for entry in model.contents(group):
+            if priority is not None and (
+                    (entry.get('priority') or 0) <= priority):
+                continue
+            if load_only:
+                entry = dict(((name, entry[name]) for name in load_only
+                              if name in entry))
+            else:
+                entry.pop('body', None)
+            data.append(entry)
+        return data
 
 
 class LazyContext:
@@ -193,6 +265,22 @@ class LazyContext:
         return self.context
 
 
+@app_attribute
+def local_content_model(app):
+    """The :class:`.ContentModel` of the application when contents are
+    served by a local api, ``None`` otherwise
+    """
+    if not app.apis or not app.cms:
+        return
+    path = app.cms.api_contents_path
+    try:
+        api = app.apis.get(path)
+    except Http404:
+        return
+    if not api.netloc:
+        return app.models.get(path)
+
+
 @app_attribute
 def app_sitemap(app):
     """Build and store HTML sitemap in the application
@@ -200,12 +288,41 @@ def app_sitemap(app):
     return routes_from_groups(app.config['CONTENT_GROUPS'])
 
 
+@app_attribute
+def page_matcher(app):
+    """The :class:`.PageMatcher` of content groups or ``None`` when group
+    paths contain variables which cannot be matched segment by segment
+    """
+    pages = group_pages(app.config['CONTENT_GROUPS'])
+    if any(('<' in path for path, _ in pages)):
+        return
+    return PageMatcher(pages, app.config['CMS_PAGE_CACHE_SIZE'])
+
+
 def routes_from_groups(groups):
     """build the routes from content groups
     """
-    assert isinstance(groups, list), 'groups must be a list'
     paths = {}
 
+    for path, page in group_pages(groups):
+        paths[path] = page
+        paths['%s/<path:path>' % path] = page
+
+    return [(Route(path), paths[path]) for path in reversed(sorted(paths))]
+
+
+def group_pages(groups):
+    """List of ``(path, page)`` pairs from content groups
+
+    :param groups: a dictionary of group configurations by name or a list
+        of group configurations
+    """
+    if isinstance(groups, dict):
+        groups = [dict(page, name=name) if isinstance(page, dict) else page
+                  for name, page in groups.items()]
+    assert isinstance(groups, list), 'groups must be a list or a dictionary'
+    pages = []
+
     for page in groups:
         if not isinstance(page, dict):
             LOGGER.error(
@@ -226,9 +343,75 @@ def routes_from_groups(groups):
         if path.endswith('/'):
             path = path[:-1]
 
-        page = Page(path=path, **page)
+        pages.append((path, Page(path=path, **page)))
 
-        paths[path] = page
-        paths['%s/<path:path>' % path] = page
+    return pages
 
-    return [(Route(path), paths[path]) for path in reversed(sorted(paths))]
+
+class PageNode:
+    __slots__ = ('children', 'path', 'page')
+
+    def __init__(self):
+        self.children = {}
+        self.path = None
+        self.page = None
+
+
+class PageMatcher:
+    """Match paths to content group pages
+
+    Group paths are compiled into a trie on path segments and a path is
+    matched by walking the trie once, the group with the longest matching
+    prefix wins. Results are memoised per path.
+
+    A path equal to a group path matches with no url arguments, otherwise
+    the remaining part of the path is the ``path`` url argument.
+    This is the result of matching the :func:`routes_from_groups` routes
+    in order, except that the reverse sorting of routes could prefer a
+    shorter prefix when a nested group path contains characters sorting
+    before ``<``, such as digits.
+    """
+    def __init__(self, pages, size=None):
+        self.root = PageNode()
+        self.memo = LRUCache(size)
+        for path, page in pages:
+            self.add(path, page)
+
+    def add(self, path, page):
+        node = self.root
+        if path:
+            for bit in path.split('/'):
+                node = node.children.setdefault(bit, PageNode())
+        node.path = path
+        node.page = page
+        self.memo.clear()
+
+    def match(self, path):
+        """Match a path, without the leading slash
+
+        Return a two-elements tuple with the :class:`.Page` and the url
+        arguments or ``None`` if no group matches
+        """
+        matched = self.memo.get(path)
+        if matched is None:
+            matched = self._match(path) or False
+            self.memo.set(path, matched)
+        return matched or None
+
+    def _match(self, path):
+        root = self.root
+        node = root
+        best = node if node.page else None
+        for bit in path.split('/'):
+            node = node.children.get(bit)
+            if node is None:
+                break
+            if node.page:
+                best = node
+        else:
+            if node is not root and node.page:
+                return node.page, {}
+        if best is root:
+            return best.page, {'path': path}
+        elif best:
+            return best.page, {'path': path[len(best.path) + 1:]}
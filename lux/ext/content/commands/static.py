@@ -41,7 +41,12 @@ class Command(LuxCommand):
                 desc='Static website base url'),
         Setting('static_path',
                 ['--static-path'],
-                desc='Path where to install files'),)
+                desc='Path where to install files'),
+        Setting('workers',
+                ['--workers'],
+                type=int,
+                default=os.cpu_count(),
+                desc='Number of processes rendering markdown files'),)
 
     help = "create a static site"
 
@@ -60,6 +65,7 @@ class Command(LuxCommand):
             raise CommandError('specify base url with --base-url flag')
         base = options.base_url[0]
         self.app.config['CACHE_SERVER'] = 'static://'
+        self.app.config['MD_WORKERS'] = options.workers
         self.bs = bs
         self.http = HttpTestClient(self.app.callable, wsgi=self.app)
         self.files = {}
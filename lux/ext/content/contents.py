@@ -1,8 +1,11 @@
 import os
 import stat
+import asyncio
+from functools import partial
 from datetime import datetime, date
 from collections import Mapping
 from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
 
 from dateutil.parser import parse as parse_date
 
@@ -11,6 +14,7 @@ from pulsar.utils.slugify import slugify
 from pulsar.utils.structures import mapping_iterator
 
 from lux.utils.date import iso8601
+from lux.utils.context import app_attribute
 
 from .urlwrappers import (URLWrapper, Processor, MultiValue, Tag, Author,
                           Category)
@@ -170,6 +174,14 @@ class HtmlReader:
             body = text.read()
         return self.process(body.decode('utf-8'), src, meta=meta)
 
+    def read_all(self, sources):
+        """Read content from several files
+
+        :param sources: list of ``(src, meta)`` pairs
+        :return: list of contents in the same order as ``sources``
+        """
+        return [self.read(src, meta) for src, meta in sources]
+
     def process(self, body, src=None, meta=None):
         """Return the dict containing document metadata
         """
@@ -189,19 +201,45 @@ class MarkdownReader(HtmlReader):
     def md(self):
         md = getattr(self.app, '_markdown', None)
         if md is None:
-            extensions = list(self.config['MD_EXTENSIONS'])
-            if 'meta' not in extensions:
-                extensions.append('meta')
-            self.app._markdown = Markdown(extensions=extensions)
+            self.app._markdown = Markdown(extensions=self.extensions())
         return self.app._markdown
 
+    def extensions(self):
+        extensions = list(self.config['MD_EXTENSIONS'])
+        if 'meta' not in extensions:
+            extensions.append('meta')
+        return extensions
+
     def process(self, raw, src=None, meta=None):
-        raw = '%s\n\n%s' % (raw, self.links())
-        md = self.md
-        body = md.convert(raw)
-        meta = tuple(chain_meta(meta, md.Meta))
+        body, md_meta = self.convert(raw)
+        return self.build(body, md_meta, src, meta)
+
+    def convert(self, raw):
+        """Convert markdown into html
+
+        :return: a two-elements tuple with the html body and the
+            markdown metadata
+        """
+        return convert_markdown(self.md, raw, self.links())
+
+    def build(self, body, md_meta, src=None, meta=None):
+        """Build the content from the html body and the markdown metadata
+        """
+        meta = tuple(chain_meta(meta, md_meta))
         return super().process(body, src, meta=meta)
 
+    def read_all(self, sources):
+        """Read markdown files, in parallel when :setting:`MD_WORKERS`
+        is positive
+        """
+        executor = render_executor(self.app)
+        if not executor or len(sources) < 2:
+            return super().read_all(sources)
+        results = executor.map(render_markdown, [src for src, _ in sources],
+                               self.extensions(), self.links())
+        return [self.build(body, md_meta, src, meta) for
+                (src, meta), (body, md_meta) in zip(sources, results)]
+
     def links(self):
         links = self.app.config.get('_MARKDOWN_LINKS_')
         if links is None:
@@ -218,6 +256,87 @@ class MarkdownReader(HtmlReader):
         return links
 
 
+@app_attribute
+def render_executor(app):
+    """The :class:`.RenderExecutor` of the application or ``None`` when
+    :setting:`MD_WORKERS` is not positive
+    """
+    workers = app.config['MD_WORKERS']
+    if workers and workers > 0:
+        return RenderExecutor(app, workers)
+
+
+class RenderExecutor:
+    """Process pool for rendering content files in parallel
+
+    Each worker process keeps its own ``Markdown`` instances. When on a
+    green worker, results are waited without blocking the other greenlets.
+    """
+    _executor = None
+
+    def __init__(self, app, workers):
+        self.app = app
+        self.workers = workers
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        return self._executor
+
+    def map(self, callable, items, *args):
+        """Call ``callable`` on chunks of ``items`` in the worker
+        processes and return the list of results in order
+        """
+        size = max(len(items) // (4 * self.workers), 1)
+        calls = [partial(callable, items[i:i+size], *args)
+                 for i in range(0, len(items), size)]
+        executor = self.executor
+        app = self.app
+        pool = app.green_pool
+        if pool and pool.in_green_worker:
+            futures = [app._loop.run_in_executor(executor, call)
+                       for call in calls]
+            results = pool.wait(asyncio.gather(*futures), True)
+        else:
+            futures = [executor.submit(call) for call in calls]
+            results = [future.result() for future in futures]
+        return list(chain.from_iterable(results))
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait)
+            self._executor = None
+
+
+def convert_markdown(md, raw, links):
+    try:
+        body = md.convert('%s\n\n%s' % (raw, links))
+        return body, md.Meta
+    finally:
+        md.reset()
+
+
+_markdowns = {}
+
+
+def render_markdown(sources, extensions, links):
+    """Render markdown files in a worker process
+
+    :return: a list of ``(body, meta)`` pairs
+    """
+    key = tuple(extensions)
+    md = _markdowns.get(key)
+    if md is None:
+        md = _markdowns[key] = Markdown(extensions=extensions)
+    results = []
+    for src in sources:
+        with open(src, 'rb') as text:
+            raw = text.read().decode('utf-8')
+        results.append(convert_markdown(md, raw, links))
+    return results
+
+
 # INTERNALS
 def _flatten(meta):
     for key, value in mapping_iterator(meta):
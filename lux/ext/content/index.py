@@ -0,0 +1,242 @@
+"""Persistent index of parsed content files
+
+The index is a SQLite database with one record per content file, keyed by
+group and path. Each record stores the file modification time and size
+together with the parsed document, so that only new and changed files are
+parsed again when a group is loaded.
+"""
+import os
+import json
+import pickle
+import time
+import sqlite3
+import hashlib
+from threading import Lock
+from collections import namedtuple
+
+from lux.core import output_cache
+from lux.core.cache import Flight
+
+
+ContentRecord = namedtuple('ContentRecord', 'path mtime size slug data')
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS content_groups ('
+    'name TEXT PRIMARY KEY, signature TEXT)',
+    'CREATE TABLE IF NOT EXISTS content_files ('
+    'grp TEXT, path TEXT, mtime INTEGER, size INTEGER, slug TEXT, '
+    'data BLOB, PRIMARY KEY (grp, path))'
+)
+
+
+class ContentIndex:
+    """Index of parsed documents of a :class:`.ContentModel`
+
+    Groups are synchronised with the file system the first time they are
+    accessed, after that documents are served from memory for
+    :setting:`CONTENT_INDEX_TIMEOUT` seconds or until :meth:`clear` is
+    called.
+
+    :param model: the :class:`.ContentModel`
+    :param path: path of the SQLite database
+    """
+    def __init__(self, model, path):
+        self.model = model
+        self.path = path
+        self.logger = model.logger
+        self.parsed = 0
+        self._groups = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return self.path
+    __str__ = __repr__
+
+    def contents(self, group, slugs=None):
+        """List of documents in ``group``, only those with ``slugs`` if
+        given
+        """
+        records, by_slug = self.group(group)
+        if slugs:
+            entries = []
+            for slug in slugs:
+                entries.extend(by_slug.get(slug, ()))
+        else:
+            entries = records.values()
+        return [dict(record.data) for record in entries]
+
+    def group(self, group):
+        """Records of a group as a two-elements tuple of dictionaries,
+        by path and by slug
+
+        Only one caller synchronises an expired group, the others wait
+        for its result without holding any lock, so that green workers
+        waiting for the rendering pool do not block each other.
+        """
+        entry = self._groups.get(group)
+        if entry is None or self._expired(entry):
+            key = (self, group)
+            flight, leader = Flight.get(key)
+            if not leader:
+                return flight.wait(self.model.app)[:2]
+            try:
+                records = self.sync(group)
+                by_slug = {}
+                for record in records.values():
+                    by_slug.setdefault(record.slug, []).append(record)
+                entry = (records, by_slug, time.time())
+                with self._lock:
+                    self._groups[group] = entry
+            except BaseException as exc:
+                flight.set_exception(exc)
+                raise
+            else:
+                flight.set_result(entry)
+            finally:
+                Flight.done(key)
+        return entry[:2]
+
+    def clear(self, group=None):
+        """Clear the in-memory records so that groups are synchronised
+        again at next access
+        """
+        with self._lock:
+            if group:
+                self._groups.pop(group, None)
+            else:
+                self._groups.clear()
+
+    def sync(self, group):
+        """Synchronise the records of ``group`` with the file system
+
+        Only files which are new or whose modification time or size
+        has changed are parsed, in a single batch so that they can be
+        rendered in parallel. Return a dictionary of records by path.
+        """
+        model = self.model
+        signature = self.signature(group)
+        stored = self.load(group, signature)
+        reset = stored is None
+        if reset:
+            stored = {}
+        records = {}
+        files = []
+        stats = []
+        for filename, src in model.group_files(group):
+            try:
+                stat = os.stat(src)
+            except OSError:
+                continue
+            record = stored.pop(filename, None)
+            if (not record or record.mtime != stat.st_mtime_ns or
+                    record.size != stat.st_size):
+                files.append((filename, src))
+                stats.append(stat)
+            records[filename] = record
+        changed = []
+        datas = model.read_contents(group, files) if files else ()
+        for (filename, _), stat, data in zip(files, stats, datas):
+            record = ContentRecord(filename, stat.st_mtime_ns,
+                                   stat.st_size, data.get('slug'), data)
+            records[filename] = record
+            changed.append(record)
+        self.parsed += len(changed)
+        if changed or stored or reset:
+            self.store(group, signature, changed, stored, reset)
+            output_cache(model.app).clear()
+        return records
+
+    def signature(self, group):
+        """Signature of the configuration used to parse documents
+        in ``group``
+        """
+        cfg = self.model.app.config
+        value = json.dumps([cfg['CONTENT_GROUPS'].get(group),
+                            cfg['MD_EXTENSIONS'],
+                            cfg['CONTENT_LINKS'],
+                            self.model.ext],
+                           sort_keys=True, default=str)
+        return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+    def load(self, group, signature):
+        """Load stored records of ``group``
+
+        Return ``None`` when ``signature`` does not match the signature
+        of the stored group
+        """
+        try:
+            with self.connection() as db:
+                row = db.execute(
+                    'SELECT signature FROM content_groups WHERE name=?',
+                    (group,)
+                ).fetchone()
+                if not row or row[0] != signature:
+                    return
+                cursor = db.execute(
+                    'SELECT path, mtime, size, slug, data FROM content_files '
+                    'WHERE grp=?', (group,)
+                )
+                return dict(((row[0], ContentRecord(
+                    row[0], row[1], row[2], row[3], pickle.loads(row[4])
+                )) for row in cursor))
+        except Exception:
+            self.logger.exception('Could not load content index %s', self)
+            return {}
+
+    def store(self, group, signature, records, removed, reset=False):
+        """Store changed ``records`` and delete ``removed`` paths, or all
+        the previous records of ``group`` when ``reset`` is true
+        """
+        try:
+            with self.connection() as db:
+                if reset:
+                    db.execute('DELETE FROM content_files WHERE grp=?',
+                               (group,))
+                db.execute(
+                    'INSERT OR REPLACE INTO content_groups (name, signature) '
+                    'VALUES (?, ?)', (group, signature)
+                )
+                db.executemany(
+                    'DELETE FROM content_files WHERE grp=? AND path=?',
+                    ((group, path) for path in removed)
+                )
+                db.executemany(
+                    'INSERT OR REPLACE INTO content_files '
+                    '(grp, path, mtime, size, slug, data) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    ((group, r.path, r.mtime, r.size, r.slug,
+                      pickle.dumps(r.data, pickle.HIGHEST_PROTOCOL))
+                     for r in records)
+                )
+        except Exception:
+            self.logger.exception('Could not store content index %s', self)
+
+    def _expired(self, entry):
+        timeout = self.model.config['CONTENT_INDEX_TIMEOUT']
+        return timeout and entry[2] + timeout < time.time()
+
+    def connection(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        for statement in SCHEMA:
+            db.execute(statement)
+        return Connection(db)
+
+
+class Connection:
+    """Commit, or rollback, and close a SQLite connection
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.db.commit()
+            else:
+                self.db.rollback()
+        finally:
+            self.db.close()
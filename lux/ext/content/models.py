@@ -1,6 +1,7 @@
 import os
 
 from pulsar.api import Http404, ImproperlyConfigured
+from pulsar.utils.log import lazyproperty
 
 from lux.core import cached
 from lux.models import Schema, fields, memory
@@ -8,6 +9,7 @@ from lux.utils.files import skipfile
 from lux.utils.data import as_tuple
 
 from .contents import get_reader
+from .index import ContentIndex
 
 
 class ContentSchema(Schema):
@@ -42,6 +44,15 @@ class ContentModel(memory.Model):
             os.makedirs(location)
         return self
 
+    @lazyproperty
+    def index(self):
+        """The :class:`.ContentIndex` of this model or ``None`` if
+        :setting:`CONTENT_INDEX` is not set
+        """
+        path = self.config['CONTENT_INDEX']
+        if path:
+            return ContentIndex(self, os.path.join(self.directory, path))
+
     def get_query(self, session):
         return ContentQuery(self, session)
 
@@ -52,47 +63,45 @@ class ContentModel(memory.Model):
             data.pop('body', None)
         return self.instance_urls(request, instance, data)
 
+    def contents(self, group, slugs=None):
+        """List of content dictionaries in ``group``, only those with
+        ``slugs`` if given
 
-class ContentQuery(memory.Query):
-
-    def __init__(self, model, session):
-        super().__init__(model, session)
-        self._groups = []
-
-    def filter_field(self, field, op, value):
-        if field.name == 'group' and op == 'eq':
-            self._groups.extend(as_tuple(value))
-        super().filter_field(field, op, value)
-
-    #  INTERNALS
-    def _get_data(self):
-        if self._data is None:
-            self._data = []
-            for group in self._groups:
-                cache = cached(app=self.app, key='contents:%s' % group)
-                self._data.extend(cache(self._all)(group))
-        return self._data
+        Dictionaries are copies and can be modified by the caller
+        """
+        index = self.index
+        if index:
+            return index.contents(group, slugs)
+        cache = cached(app=self.app, key='contents:%s' % group)
+        data = cache(self.read_group)(group)
+        if slugs:
+            data = [d for d in data if d.get('slug') in slugs]
+        return [dict(d) for d in data]
+
+    def read_group(self, group):
+        """Read and parse all content files in ``group``
+        """
+        return self.read_contents(group, self.group_files(group))
 
-    def _all(self, group):
-        """Contents in this model group
+    def group_directory(self, group):
+        """Directory of a content ``group`` or ``None`` if the group is
+        configured but its directory does not exist
         """
-        model = self.model
-        content = self.app.config['CONTENT_GROUPS'].get(group)
-        if content:
-            base_html_path = content.get('path')
-            default_meta = content.get('meta', {})
-        else:
-            base_html_path = None
-            default_meta = {}
-        directory = os.path.join(model.directory, group)
+        directory = os.path.join(self.directory, group)
         if not os.path.isdir(directory):
-            if content:
-                return []
-            else:
-                raise Http404
-        ext = '.%s' % model.ext
-        reader = get_reader(self.app, ext)
-        data = []
+            if group in self.config['CONTENT_GROUPS']:
+                return
+            raise Http404
+        return directory
+
+    def group_files(self, group):
+        """Generator of ``(filename, path)`` pairs of content files in
+        ``group``, where ``filename`` is relative to the group directory
+        """
+        directory = self.group_directory(group)
+        if not directory:
+            return
+        ext = '.%s' % self.ext
         for dirpath, dirnames, filenames in os.walk(directory):
             for filename in filenames:
                 if skipfile(filename):
@@ -103,20 +112,44 @@ class ContentQuery(memory.Query):
                     filename = os.path.join(path, filename)
 
                 if filename.endswith(ext):
-                    slug = filename[:-len(ext)]
-                    src = os.path.join(directory, filename)
-                    bits = slug.split('/')
-                    if len(bits) > 1 and bits[-1] == 'index':
-                        slug = '/'.join(bits[:-1])
-                    meta = default_meta.copy()
-                    #
-                    html_path = self._html_path(base_html_path, slug)
-                    meta.update({'group': group,
-                                 'slug': slug})
-                    if html_path is not None:
-                        meta['path'] = html_path
-                    data.append(reader.read(src, meta).tojson())
-        return data
+                    yield filename, os.path.join(directory, filename)
+
+    def read_content(self, group, filename, src, reader=None):
+        """Read and parse a content file into a JSON dictionary
+        """
+        return self.read_contents(group, ((filename, src),), reader)[0]
+
+    def read_contents(self, group, files, reader=None):
+        """Read and parse several content files into JSON dictionaries
+
+        :param files: iterable over ``(filename, src)`` pairs
+        :return: list of dictionaries in the same order as ``files``
+        """
+        content = self.config['CONTENT_GROUPS'].get(group)
+        if content:
+            base_html_path = content.get('path')
+            meta = content.get('meta', {})
+        else:
+            base_html_path = None
+            meta = {}
+        reader = reader or get_reader(self.app, ext=self.ext)
+        sources = [(src, self._meta(group, filename, base_html_path, meta))
+                   for filename, src in files]
+        return [content.tojson() for content in reader.read_all(sources)]
+
+    def _meta(self, group, filename, base_html_path, meta):
+        meta = meta.copy()
+        slug = filename[:-len(self.ext)-1]
+        bits = slug.split('/')
+        if len(bits) > 1 and bits[-1] == 'index':
+            slug = '/'.join(bits[:-1])
+        #
+        html_path = self._html_path(base_html_path, slug)
+        meta.update({'group': group,
+                     'slug': slug})
+        if html_path is not None:
+            meta['path'] = html_path
+        return meta
 
     def _html_path(self, base_html_path, slug):
         if not base_html_path:
@@ -128,3 +161,27 @@ class ContentQuery(memory.Query):
             else:
                 html_path = base_html_path
         return '/%s' % html_path if html_path else ''
+
+
+class ContentQuery(memory.Query):
+
+    def __init__(self, model, session):
+        super().__init__(model, session)
+        self._groups = []
+        self._slugs = []
+
+    def filter_field(self, field, op, value):
+        if op == 'eq':
+            if field.name == 'group':
+                self._groups.extend(as_tuple(value))
+            elif field.name == 'slug':
+                self._slugs.extend(as_tuple(value))
+        super().filter_field(field, op, value)
+
+    #  INTERNALS
+    def _get_data(self):
+        if self._data is None:
+            self._data = []
+            for group in self._groups:
+                self._data.extend(self.model.contents(group, self._slugs))
+        return self._data
@@ -112,15 +112,17 @@ class OAuth1(metaclass=OAuthMeta):
             raise ValueError(data.get('error_description', data['error']))
 
     @classmethod
-    def associate_token(cls, request, user_data, user, access_token):
+    def associate_token(cls, request, user_data, user, access_token,
+                        session=None):
         """Associate a database user with a database access token
         :param request: WSGI request
         :param user: user model instance
         :param access_token: access token model instance
+        :param session: optional database session of ``user``
         :return: the user
         """
         odm = request.app.odm()
-        with odm.begin() as session:
+        with odm.begin(session=session) as session:
             session.add(access_token)
             session.add(user)
             q = session.query(odm.accesstoken).filter_by(provider=cls.name,
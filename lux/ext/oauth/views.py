@@ -1,14 +1,17 @@
 from pulsar.apps.wsgi import Router, route
 from pulsar.api import HttpRedirect
 
+from lux.ext.auth.principals import load_user
+
 from .oauth import request_oauths
 
 
 def oauth_context(request, path='/oauth/'):
     user = request.cache.user
     if user:
+        with request.app.models['users'].begin_session() as session:
+            current = load_user(request, session).get_oauths()
         oauths = []
-        current = user.get_oauths()
         for name, o in request_oauths(request).items():
             if o.available():
                 data = {'href': path + name,
@@ -65,7 +68,11 @@ class OAuthRouter(Router):
         if not user.is_authenticated():
             oauth.create_or_login_user(request, user_data, access_token)
         else:
-            oauth.associate_token(request, user_data, user, access_token)
+            users = request.app.models['users']
+            with users.begin_session() as session:
+                oauth.associate_token(request, user_data,
+                                      load_user(request, session),
+                                      access_token, session=session)
         raise HttpRedirect('/')
 
     @route('<name>/remove', method='post')
@@ -73,5 +80,7 @@ class OAuthRouter(Router):
         user = request.cache.user
         if user.is_authenticated():
             name = request.urlargs['name']
-            removed = user.remove_oauth(name)
+            users = request.app.models['users']
+            with users.begin_session() as session:
+                removed = load_user(request, session).remove_oauth(name)
             return request.json_response({'success': removed})
@@ -49,6 +49,15 @@ class Extension(LuxExtension):
                   'operator'),
         Parameter('CHANNEL_DATAMODEL', 'datamodel',
                   'Channel name for data models updates'),
+        Parameter('COUNT_STRATEGY', 'exact',
+                  'Default strategy for counting elements in paginated '
+                  'lists: "exact", "estimated" or "cached". Models can '
+                  'override it with the "count_strategy" metadata'),
+        Parameter('COUNT_CACHE_TIMEOUT', 60,
+                  'Timeout in seconds of counts with the "cached" strategy'),
+        Parameter('COUNT_ESTIMATE_THRESHOLD', 1000,
+                  'Estimated counts below this number are replaced by an '
+                  'exact count'),
     ]
 
     def on_config(self, app):
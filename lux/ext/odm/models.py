@@ -1,15 +1,17 @@
 from datetime import date, datetime
 from functools import partial
+from hashlib import sha1
 
 import sqlalchemy as sa
 from sqlalchemy import desc, String
 from sqlalchemy.orm import class_mapper, load_only, RelationshipProperty
 from sqlalchemy.sql.expression import func, cast
-from sqlalchemy.exc import DataError, StatementError, IntegrityError
+from sqlalchemy.exc import (DataError, StatementError, IntegrityError,
+                            SQLAlchemyError)
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 from sqlalchemy.dialects import postgresql
 
-from pulsar.api import Http404
+from pulsar.api import Http404, BadRequest
 from pulsar.utils.log import lazyproperty
 
 from odm.mapper import object_session
@@ -18,6 +20,7 @@ from lux.utils.context import app_attribute
 from lux.utils.crypt import as_hex
 from lux import models
 from lux.models import fields
+from lux.models.query import keyset_key
 
 from .convert import ModelConverter
 from .fields import get_primary_keys
@@ -44,6 +47,9 @@ class Query(models.Query):
     def count(self):
         return self._query().count()
 
+    def total(self):
+        return self.model.query_count(self)
+
     def one(self):
         query = self._query()
         try:
@@ -59,6 +65,14 @@ class Query(models.Query):
     def all(self):
         return list(self._query())
 
+    def iter(self, chunk_size=None):
+        query = self._query()
+        if chunk_size:
+            query = query.execution_options(
+                stream_results=True
+            ).yield_per(chunk_size)
+        return iter(query)
+
     def delete(self):
         return self._query().delete()
 
@@ -70,6 +84,24 @@ class Query(models.Query):
         self.sql_query = self.sql_query.offset(offset)
         return self
 
+    def keyset(self, keys, values=None, reverse=False):
+        db_model = self.model.db_model
+        db_columns = db_model.__mapper__.columns
+        columns = []
+        for key in keys:
+            name, descending = keyset_key(key)
+            if name not in db_columns:
+                raise BadRequest('Cannot paginate by "%s"' % name)
+            columns.append((getattr(db_model, name), descending != reverse))
+        query = self.sql_query
+        if values is not None:
+            query = query.filter(keyset_filter(columns, values))
+        # keyset ordering replaces any ordering from sortby
+        order = [desc(column) if descending else column
+                 for column, descending in columns]
+        self.sql_query = query.order_by(None).order_by(*order)
+        return self
+
     def filter_args(self, *filters):
         if filters:
             self.sql_query = self.sql_query.filter(*filters)
@@ -219,6 +251,38 @@ class Model(models.Model):
     def fields(self):
         return self.db_columns()
 
+    def batch_keys(self):
+        return tuple((pk.key for pk in self.primary_keys))
+
+    def expunge(self, session, instances):
+        for instance in instances:
+            session.expunge(instance)
+
+    def query_count(self, query):
+        """Number of elements in a :class:`.Query` and whether the number
+        is approximate
+
+        The strategy is given by the ``count_strategy`` model metadata
+        or the :setting:`COUNT_STRATEGY` setting:
+
+        * ``exact``: run a ``COUNT`` query
+        * ``estimated``: use the PostgreSQL planner estimates, ``pg_class``
+          for unfiltered queries and ``EXPLAIN`` otherwise. Falls back to
+          an exact count for other databases and for small estimates
+        * ``cached``: exact count cached in the application cache server for
+          :setting:`COUNT_CACHE_TIMEOUT` seconds, keyed by the query
+          statement and its parameters
+        """
+        strategy = (self.metadata.get('count_strategy') or
+                    self.config['COUNT_STRATEGY'])
+        if strategy == 'estimated':
+            total = self._estimated_count(query)
+            if total is not None:
+                return total, True
+        elif strategy == 'cached':
+            return self._cached_count(query)
+        return query.count(), False
+
     def create_instance(self, session, data):
         """Create a new model instance from data and add to session
 
@@ -284,6 +348,49 @@ class Model(models.Model):
         return tuple((c for c in columns if c in dbc) if columns else dbc)
 
     # INTERNALS
+    def _estimated_count(self, query):
+        sql_query = query._query()
+        bind = query.session.get_bind(self.db_model)
+        if bind.dialect.name != 'postgresql':
+            return
+        try:
+            with bind.connect() as conn:
+                if sql_query.whereclause is None:
+                    total = conn.execute(
+                        sa.text('SELECT reltuples FROM pg_class '
+                                'WHERE oid = CAST(:table AS regclass)'),
+                        table=self.db_model.__table__.fullname
+                    ).scalar()
+                else:
+                    compiled = sql_query.statement.compile(
+                        dialect=bind.dialect)
+                    plan = conn.execute(
+                        'EXPLAIN (FORMAT JSON) %s' % compiled,
+                        compiled.params
+                    ).scalar()
+                    total = plan[0]['Plan']['Plan Rows']
+        except (SQLAlchemyError, LookupError, TypeError):
+            self.logger.warning('Could not estimate count of %s', self,
+                                exc_info=True)
+            return
+        if total is not None:
+            total = int(total)
+            if total >= self.config['COUNT_ESTIMATE_THRESHOLD']:
+                return total
+
+    def _cached_count(self, query):
+        compiled = query._query().statement.compile()
+        signature = '%s%s' % (compiled, sorted(compiled.params.items()))
+        key = '%s-count:%s:%s' % (self.config['APP_NAME'], self.uri,
+                                  sha1(signature.encode('utf-8')).hexdigest())
+        cache = self.app.cache_server
+        total = cache.get_json(key)
+        if total is not None:
+            return total, True
+        total = query.count()
+        cache.set_json(key, total, timeout=self.config['COUNT_CACHE_TIMEOUT'])
+        return total, False
+
     def _same_instance(self, obj1, obj2):
         if type(obj1) == type(obj2):
             if obj1 is not None:
@@ -364,6 +471,24 @@ def column_info(name, col):
     return info
 
 
+def keyset_filter(columns, values):
+    """Filter rows after ``values`` in the ordering of ``columns``, a list
+    of ``(column, descending)`` pairs
+    """
+    directions = set(descending for _, descending in columns)
+    if len(directions) == 1:
+        left = sa.tuple_(*(column for column, _ in columns))
+        right = sa.tuple_(*values)
+        return left < right if directions.pop() else left > right
+    clauses = []
+    for index, (column, descending) in enumerate(columns):
+        value = values[index]
+        equal = [c == v for (c, _), v in zip(columns[:index], values)]
+        after = column < value if descending else column > value
+        clauses.append(sa.and_(*(equal + [after])))
+    return sa.or_(*clauses)
+
+
 def _should_exclude_field(column, fields=None, exclude=None,
                           include_related=None):
     if fields and column.key not in fields:
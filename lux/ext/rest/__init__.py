@@ -9,7 +9,7 @@ from lux.core import Parameter, LuxExtension
 
 from .apis import Apis, Api
 from .rest import RestRoot, RestRouter
-from .pagination import Pagination, GithubPagination
+from .pagination import Pagination, GithubPagination, CursorPagination
 from .route import route
 
 __all__ = [
@@ -20,9 +20,7 @@ __all__ = [
     #
     'Pagination',
     'GithubPagination',
-    #
-    'Pagination',
-    'GithubPagination',
+    'CursorPagination',
     #
     'api_url',
     'api_path',
@@ -68,6 +66,8 @@ class Extension(LuxExtension):
                   'The query key for full text search'),
         Parameter('API_OFFSET_KEY', 'offset', ''),
         Parameter('API_LIMIT_KEY', 'limit', ''),
+        Parameter('API_CURSOR_KEY', 'cursor',
+                  'The query key for the cursor of CursorPagination'),
         Parameter('API_LIMIT_DEFAULT', 25,
                   'Default number of items returned when no limit '
                   'API_LIMIT_KEY available in the url'),
@@ -77,8 +77,21 @@ class Extension(LuxExtension):
         Parameter('API_LIMIT_NOAUTH', 30,
                   ('Maximum number of items returned when user is '
                    'not authenticated')),
+        Parameter('API_STREAM_KEY', 'stream',
+                  'The query key for streaming list responses, use '
+                  '"ndjson" for newline delimited JSON, any other value for '
+                  'a JSON array'),
+        Parameter('API_STREAM_LIMIT', 10000,
+                  'Maximum number of rows of a streaming list response for '
+                  'authenticated users, set to 0 for no limit. Streaming '
+                  'responses for anonymous users are bounded by '
+                  'API_LIMIT_NOAUTH'),
+        Parameter('API_STREAM_CHUNK_SIZE', 500,
+                  'Number of rows fetched from the database and written '
+                  'to a streaming list response in one chunk'),
         Parameter('PAGINATION', 'lux.ext.rest.Pagination',
-                  'Pagination class'),
+                  'Pagination class, use lux.ext.rest.CursorPagination for '
+                  'keyset pagination'),
         Parameter('MAX_TOKEN_SESSION_EXPIRY', 7 * 24 * 60 * 60,
                   'Maximum expiry for a token used by a web site in seconds.'),
         Parameter('DEFAULT_REST_RESPONSES', {
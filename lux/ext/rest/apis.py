@@ -1,5 +1,6 @@
 import logging
 import json
+import hashlib
 from collections import OrderedDict
 from urllib.parse import urlparse
 
@@ -10,6 +11,7 @@ from pulsar.utils.importer import module_attribute
 
 from lux import models
 from lux.openapi import OpenAPI
+from lux.utils.lru import LRUCache
 
 from .openapi import api_schema, Specification
 from .rest import RestRoot, RestRouter, Rest404
@@ -131,6 +133,8 @@ class Api(models.Component):
         self.cors = cors
         self.registry = {}
         self._spec_path = spec_path
+        self._spec_doc = None
+        self._spec_documents = LRUCache(32)
         self._router = [Specification(spec_path, api=self)]
         self.spec.add_schema(ErrorSchema)
         self.spec.add_schema(ErrorMessageSchema)
@@ -200,12 +204,40 @@ class Api(models.Component):
                 root.add_child(self._prepare_router(router))
             self._router = root
             # build the spec so that all lazy operations are done here
-            json.dumps(self.spec_dict())
+            self._spec_doc = self.spec_dict()
         return self._router
 
     def spec_dict(self):
         return self.spec.to_dict()
 
+    def spec_document(self, server):
+        """Serialised spec document for a ``server`` url
+
+        The document is built once, after the :meth:`router` is built,
+        and serialised once per server url.
+        Return a two elements tuple, the strong ETag and the JSON bytes
+        """
+        document = self._spec_documents.get(server)
+        if document is None:
+            if self._spec_doc is None:
+                self._spec_doc = self.spec_dict()
+            spec = self._spec_doc.copy()
+            spec['servers'] = [
+                dict(url=server, description="default server")
+            ]
+            body = json.dumps(spec).encode('utf-8')
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            document = (etag, body)
+            self._spec_documents.set(server, document)
+        return document
+
+    def spec_changed(self):
+        """Clear cached spec documents, call it when the spec is changed
+        after the :meth:`router` was built
+        """
+        self._spec_doc = None
+        self._spec_documents.clear()
+
     # INTERNALS
 
     def _prepare_router(self, router):
@@ -1,3 +1,5 @@
+from pulsar.api import HttpException
+
 from lux.models import Schema, fields
 
 from .rest import RestRouter
@@ -34,13 +36,25 @@ class Specification(RestRouter):
             200:
                 description: The OpenAPI specification document
         """
-        if not self.api:
-            pass
-        spec = self.api.spec_dict()
-        spec['servers'] = [
-            dict(
-                url='%s://%s' % (request.scheme, request.get_host()),
-                description="default server"
-            )
-        ]
-        return request.json_response(spec)
+        ct = 'application/json'
+        content_types = request.content_types
+        if content_types and ct not in content_types:
+            raise HttpException(status=415, msg=content_types)
+        server = '%s://%s' % (request.scheme, request.get_host())
+        etag, body = self.api.spec_document(server)
+        response = request.response
+        response.content_type = ct
+        if etag_match(request, etag):
+            response.not_modified()
+        else:
+            response.content = body
+        response['ETag'] = etag
+        return response
+
+
+def etag_match(request, etag):
+    if_none_match = request.environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = [e.strip() for e in if_none_match.split(',')]
+        return etag in etags or '*' in etags
+    return False
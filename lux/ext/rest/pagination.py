@@ -1,7 +1,50 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+
+from dateutil.parser import parse as parse_date
+
+from pulsar.api import BadRequest
 from pulsar.utils.httpurl import iri_to_uri
 
+from lux.models.query import keyset_key
+from lux.utils.data import as_int
+
 
 class Pagination:
+    """Offset/limit pagination
+    """
+    def limit(self, request):
+        """Number of items requested, bounded by the ``API_LIMIT_AUTH`` or
+        ``API_LIMIT_NOAUTH`` setting
+        """
+        cfg = request.config
+        user = request.cache.user
+        if user and user.is_authenticated():
+            max_limit = cfg['API_LIMIT_AUTH']
+        else:
+            max_limit = cfg['API_LIMIT_NOAUTH']
+        limit = as_int(request.url_data.get(cfg['API_LIMIT_KEY']),
+                       cfg['API_LIMIT_DEFAULT'])
+        return max(1, min(limit, max_limit))
+
+    def page(self, request, query):
+        """Fetch a page of results from a :class:`.Query`
+
+        Return the list of results and a dictionary of keyed-valued
+        parameters for the pagination :meth:`__call__` method
+        """
+        limit = self.limit(request)
+        offset = max(0, as_int(
+            request.url_data.get(request.config['API_OFFSET_KEY']), 0))
+        total, approximate = query.total()
+        result = query.offset(offset).limit(limit).all()
+        return result, dict(total=total, limit=limit, offset=offset,
+                            approximate=approximate)
 
     def first_link(self, request, total, limit, offset):
         n = self._count_part(offset, limit, 0)
@@ -34,7 +77,8 @@ class Pagination:
         location = iri_to_uri(request.path, params)
         return request.absolute_uri(location)
 
-    def __call__(self, request, result, total=None, limit=None, offset=None):
+    def __call__(self, request, result, total=None, limit=None, offset=None,
+                 approximate=False):
         if total is None:
             total = len(result)
             offset = 0
@@ -43,6 +87,8 @@ class Pagination:
             'total': total,
             'result': result
         }
+        if approximate:
+            data['approximate'] = True
         first = self.first_link(request, total, limit, offset)
         if first:
             data['first'] = first
@@ -68,8 +114,12 @@ class Pagination:
 
 class GithubPagination(Pagination):
     '''Github style pagination
+
+    Links are returned in the ``links`` header and an estimated total is
+    flagged by the ``X-Total-Approximate`` header
     '''
-    def __call__(self, request, result, total, limit, offset):
+    def __call__(self, request, result, total, limit, offset,
+                 approximate=False):
         links = []
         first = self.first_link(request, total, limit, offset)
         if first:
@@ -84,4 +134,137 @@ class GithubPagination(Pagination):
                 links.append(next)
             links.append(last)
         request.response['links'] = links
+        if approximate:
+            request.response['X-Total-Approximate'] = 'true'
         return result
+
+
+class CursorPagination(Pagination):
+    """Keyset pagination
+
+    Results are ordered by the query ``sortby`` fields followed by
+    :attr:`keys`, the unique tie-breaker, and the position in the result
+    set is encoded into an opaque signed cursor together with the sort.
+    It does not require a ``total`` and it does not scan and discard rows
+    for deep pages.
+    """
+    keys = ('id',)
+
+    def page(self, request, query, keys=None):
+        limit = self.limit(request)
+        cursor = request.url_data.get(request.config['API_CURSOR_KEY'])
+        values = None
+        reverse = False
+        keys = self.sort_keys(query, keys)
+        if cursor:
+            sort, values, reverse = self.decode(request, cursor)
+            if tuple(sort) != keys:
+                raise BadRequest('Cursor does not match the requested sort')
+        query = query.keyset(keys, values, reverse)
+        result = query.limit(limit + 1).all()
+        more = len(result) > limit
+        result = result[:limit]
+        if reverse:
+            result.reverse()
+        next = prev = None
+        if result:
+            if more or reverse:
+                next = self.encode(request, keys, result[-1])
+            if more if reverse else cursor:
+                prev = self.encode(request, keys, result[0], True)
+        return result, dict(limit=limit, next=next, prev=prev)
+
+    def __call__(self, request, result, total=None, limit=None, offset=None,
+                 next=None, prev=None):
+        data = {'result': result}
+        if prev:
+            data['prev'] = self.link(request, prev, limit)
+        if next:
+            data['next'] = self.link(request, next, limit)
+        return data
+
+    def sort_keys(self, query, keys=None):
+        """Keyset keys of a :class:`.Query`, its sorting followed by
+        ``keys``, or :attr:`keys`, as tie-breaker
+        """
+        sort = []
+        names = set()
+        for name, direction in query.sorting:
+            if name not in names:
+                names.add(name)
+                sort.append('%s:desc' % name if direction == 'desc' else name)
+        for key in keys or self.keys:
+            if keyset_key(key)[0] not in names:
+                sort.append(key)
+        return tuple(sort)
+
+    def link(self, request, cursor, limit):
+        params = request.url_data.copy()
+        cfg = request.config
+        params.pop(cfg['API_OFFSET_KEY'], None)
+        params.update({cfg['API_CURSOR_KEY']: cursor,
+                       cfg['API_LIMIT_KEY']: limit})
+        location = iri_to_uri(request.path, params)
+        return request.absolute_uri(location)
+
+    def encode(self, request, keys, instance, reverse=False):
+        """Encode the ``keys`` values of a model ``instance`` into a
+        signed cursor
+        """
+        values = [encode_value(getattr(instance, keyset_key(key)[0]))
+                  for key in keys]
+        payload = json.dumps([keys, values, reverse]).encode('utf-8')
+        payload = base64.urlsafe_b64encode(payload).rstrip(b'=')
+        return '%s.%s' % (payload.decode('utf-8'),
+                          self.signature(request, payload))
+
+    def decode(self, request, cursor):
+        """Decode a signed cursor into a ``(keys, values, reverse)`` tuple
+
+        Raise :class:`.BadRequest` if the cursor is not valid
+        """
+        try:
+            payload, signature = cursor.split('.')
+            payload = payload.encode('utf-8')
+            if not hmac.compare_digest(signature,
+                                       self.signature(request, payload)):
+                raise ValueError
+            payload += b'=' * (-len(payload) % 4)
+            keys, values, reverse = json.loads(
+                base64.urlsafe_b64decode(payload).decode('utf-8'))
+            values = [decode_value(value) for value in values]
+            if len(keys) != len(values):
+                raise ValueError
+        except (ValueError, TypeError, OverflowError, InvalidOperation):
+            raise BadRequest('Invalid cursor') from None
+        return keys, values, bool(reverse)
+
+    def signature(self, request, payload):
+        key = request.config['SECRET_KEY'].encode('utf-8')
+        return hmac.new(key, payload, hashlib.sha256).hexdigest()[:32]
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    elif isinstance(value, date):
+        return {'date': value.isoformat()}
+    elif isinstance(value, UUID):
+        return {'uuid': value.hex}
+    elif isinstance(value, Decimal):
+        return {'decimal': str(value)}
+    return value
+
+
+def decode_value(value):
+    if isinstance(value, dict):
+        if 'datetime' in value:
+            return parse_date(value['datetime'])
+        elif 'date' in value:
+            return parse_date(value['date']).date()
+        elif 'uuid' in value:
+            return UUID(value['uuid'])
+        elif 'decimal' in value:
+            return Decimal(value['decimal'])
+        raise ValueError
+    return value
@@ -33,6 +33,10 @@ class Extension(LuxExtension):
                   'Expiry for a session/token in seconds.'),
         Parameter('SESSION_STORE', None,
                   'Cache backend for session objects.'),
+        Parameter('SESSION_REFRESH_INTERVAL', 60 * 60,
+                  'Minimum interval in seconds between extensions of the '
+                  'expiry of sessions without a token. Set to 0 for '
+                  'sessions with a fixed expiry'),
         Parameter('APP_JWT', None,
                   'Application JWT'),
         #
@@ -88,7 +92,9 @@ class Extension(LuxExtension):
                 session.expiry is None or session.expiry < time.time())):
             store.delete(session.id)
             session = None
-        if not session:
+        if session:
+            store.refresh(session)
+        else:
             session = store.create()
         request.cache.set('session', session)
         token = session.token
@@ -107,14 +113,14 @@ class Extension(LuxExtension):
         request, response = data
         session = request.cache.get('session')
         if session:
-            if response.can_set_cookies():
+            saved = session_store(app).save(session)
+            if not session.new and response.can_set_cookies():
                 key = request.config['SESSION_COOKIE_NAME']
                 session_key = request.cookies.get(key)
                 id = session.id
-                if not session_key or session_key.value != id:
+                if saved or not session_key or session_key.value != id:
                     response.set_cookie(key, value=str(id), httponly=True,
                                         expires=session.expiry)
-            session_store(app).save(session)
 
     def on_jwt(self, app, request, payload):
         cfg = app.config
@@ -154,6 +160,11 @@ class Extension(LuxExtension):
     def csrf_token(self, request):
         session = request.cache.get('session')
         if session:
+            if session.new:
+                # the session must be stored for the token to be validated
+                session.changed()
+            # the token is bound to the session, the html cannot be shared
+            request.cache.skip_output_cache = True
             expiry = request.config['CSRF_EXPIRY']
             return jwt.encode({'exp': time.time() + expiry}, session.id)
 
@@ -102,7 +102,9 @@ class SessionBackend:
                 session.expiry is None or session.expiry < time.time())):
             store.delete(session.id)
             session = None
-        if not session:
+        if session:
+            store.refresh(session)
+        else:
             session = self._create_session(request)
         request.cache.session = session
         token = session.token
@@ -121,14 +123,14 @@ class SessionBackend:
     def response(self, request, response):
         session = request.cache.get('session')
         if session:
-            if response.can_set_cookies():
+            saved = session_store(request).save(session)
+            if not session.new and response.can_set_cookies():
                 key = request.config['SESSION_COOKIE_NAME']
                 session_key = request.cookies.get(key)
                 id = session.id
-                if not session_key or session_key.value != id:
+                if saved or not session_key or session_key.value != id:
                     response.set_cookie(key, value=str(id), httponly=True,
                                         expires=session.expiry)
-            session_store(request).save(session)
         return response
 
     # INTERNALS
@@ -52,8 +52,63 @@ class SessionMixin:
 class Session(AttributeDictionary, SessionMixin):
     '''A dictionary-based Session
 
-    Used by the :class:`.ApiSessionBackend`
+    Used by the :class:`.ApiSessionBackend`.
+    Keeps track of changes so that the :class:`.SessionStore` writes it
+    only when needed. Mutations of values stored in the session, such as
+    appending to a list, are not tracked, call :meth:`changed` after them.
     '''
+    __slots__ = ('_modified', '_new')
+
+    def __init__(self, *iterable, **kwargs):
+        super().__init__(*iterable, **kwargs)
+        self.saved(False)
+
+    @property
+    def modified(self):
+        """``True`` when the session has changed since it was loaded
+        or saved
+        """
+        return self._modified
+
+    @property
+    def new(self):
+        """``True`` when the session is not in the store
+        """
+        return self._new
+
+    def __setattr__(self, name, value):
+        data = self.__dict__
+        if name not in data or data[name] != value:
+            data[name] = value
+            self.changed()
+
+    __setitem__ = __setattr__
+
+    def __delattr__(self, name):
+        self.pop(name)
+
+    __delitem__ = __delattr__
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.changed()
+
+    def pop(self, name, default=None):
+        if name in self.__dict__:
+            self.changed()
+        return super().pop(name, default)
+
+    def changed(self):
+        """Mark the session as modified
+        """
+        object.__setattr__(self, '_modified', True)
+
+    def saved(self, new=False):
+        """Mark the session as saved, or as ``new`` when not in the store
+        """
+        object.__setattr__(self, '_modified', False)
+        object.__setattr__(self, '_new', new)
+
     def todict(self):
         return self.__dict__.copy()
 
@@ -64,6 +119,10 @@ class SessionStore:
     def __init__(self, store):
         self.store = store
 
+    @property
+    def config(self):
+        return self.store.config
+
     def get(self, id):
         """Get a session at id
         """
@@ -71,10 +130,10 @@ class SessionStore:
         if obj:
             return Session(obj)
 
-    def set(self, id, data):
+    def set(self, id, data, timeout=None):
         """Set session data at id
         """
-        self.store.set_json(self.session_key(id), data)
+        self.store.set_json(self.session_key(id), data, timeout=timeout)
 
     def delete(self, id):
         """Delete session at id
@@ -88,17 +147,52 @@ class SessionStore:
         return self.store.clear(key)
 
     def create(self, id=None, token=None, expiry=None, **kw):
+        """Create a new session
+
+        The session is written to the store only when something is stored
+        in it, straight away when it is created with a ``token`` or with
+        additional data
+        """
         id = id or create_token()
         if token:
             expiry = to_timestamp(token.get('expiry'))
             token = token['id']
         if not expiry:
-            seconds = self.store.config['SESSION_EXPIRY']
+            seconds = self.config['SESSION_EXPIRY']
             expiry = time.time() + seconds
-        return Session(id=id, token=token, expiry=expiry, **kw)
+        session = Session(id=id, token=token, expiry=expiry, **kw)
+        session.saved(True)
+        if token or kw:
+            session.changed()
+        return session
+
+    def refresh(self, session):
+        """Slide the expiry of a session without a token
+
+        The expiry is extended at most once every
+        :setting:`SESSION_REFRESH_INTERVAL` seconds so that the session is
+        not rewritten at every request
+        """
+        interval = self.config['SESSION_REFRESH_INTERVAL']
+        if interval and not session.token and session.expiry:
+            seconds = self.config['SESSION_EXPIRY']
+            now = time.time()
+            if session.expiry - seconds + interval <= now:
+                session.expiry = now + seconds
 
     def save(self, session):
-        self.set(session.id, session.todict())
+        """Write the session to the store if it was modified
+
+        Return ``True`` when the session was written
+        """
+        if not session.modified:
+            return False
+        timeout = None
+        if session.expiry:
+            timeout = max(int(session.expiry - time.time()), 1)
+        self.set(session.id, session.todict(), timeout)
+        session.saved()
+        return True
 
     def session_key(self, id=None, app_name=None):
         app_name = app_name or self.store.app.config['APP_NAME']
@@ -4,6 +4,7 @@ from pulsar.api import Http404
 
 from . import model
 from . import query
+from .query import keyset_key
 
 
 OPERATORS = {
@@ -52,6 +53,7 @@ class Query(query.Query):
     _data = None
     _limit = None
     _offset = None
+    _keyset = None
     _filtered_data = None
 
     def __init__(self, model, session):
@@ -90,6 +92,12 @@ class Query(query.Query):
         self._offset = v
         return self
 
+    def keyset(self, keys, values=None, reverse=False):
+        self._keyset = (tuple(keys),
+                        tuple(values) if values is not None else None,
+                        reverse)
+        return self
+
     def count(self):
         return len(self.all())
 
@@ -121,6 +129,8 @@ class Query(query.Query):
             else:
                 data = [asc(d, field) for d in data]
             data = [s.d for s in sorted(data)]
+        if self._keyset:
+            data = self._apply_keyset(data)
         if self._offset:
             data = data[self._offset:]
         if self._limit:
@@ -143,6 +153,26 @@ class Query(query.Query):
     def _get_data(self):
         raise NotImplementedError
 
+    def _apply_keyset(self, data):
+        keys, values, reverse = self._keyset
+        keys = [keyset_key(key) for key in keys]
+
+        def after(entry):
+            for (name, descending), value in zip(keys, values):
+                current = entry.get(name)
+                if current != value:
+                    if descending != reverse:
+                        return current < value
+                    return current > value
+            return False
+
+        if values is not None:
+            data = [entry for entry in data if after(entry)]
+        for name, descending in reversed(keys):
+            data = sorted(data, key=lambda entry, name=name: entry.get(name),
+                          reverse=descending != reverse)
+        return data
+
 
 class asc:
     __slots__ = ('d', 'value')
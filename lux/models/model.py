@@ -1,3 +1,4 @@
+import json
 import uuid
 
 from abc import ABC, abstractmethod
@@ -8,12 +9,14 @@ from contextlib import contextmanager
 from pulsar.api import UnprocessableEntity, MethodNotAllowed, context
 
 from .component import Component
-from .schema import resource_name, get_schema_class
-from ..utils.data import compact_dict
+from .schema import resource_name, get_schema_class, schema_instances
+from ..utils.data import compact_dict, as_int
 
 
 GET_HEAD = frozenset(('GET', 'HEAD'))
 POST_PUT = frozenset(('POST', 'PUT'))
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
 
 
 class ModelNotAvailable(Exception):
@@ -148,11 +151,19 @@ class Model(ABC, Component):
     # SCHEMA METHODS
 
     def get_schema(self, schema=None, **kw):
+        """Get a schema instance from the application schema cache
+        """
+        schema = self.get_schema_class(schema)
+        if schema:
+            return schema_instances(self.app).get(schema, **kw)
+
+    def get_schema_class(self, schema=None):
         schema = schema or self.model_schema
+        if not schema:
+            return
         if not isclass(schema):
             schema = type(schema)
-        schema = get_schema_class(schema.__name__)
-        return schema(**kw)
+        return get_schema_class(schema.__name__) or schema
 
     def all_schemas(self):
         if self.model_schema:
@@ -165,8 +176,10 @@ class Model(ABC, Component):
             yield self.query_schema
 
     def field(self, name, schema=None):
-        schema = self.get_schema(schema or self.model_schema)
-        return schema.fields.get(name) if schema else None
+        schema = self.get_schema_class(schema)
+        if schema:
+            schema = schema_instances(self.app).prototype(schema)
+            return schema.fields.get(name)
 
     def fields_map(self, base_fields=None, **kwargs):
         return base_fields
@@ -205,6 +218,10 @@ class Model(ABC, Component):
         """Get a HTTP response for a list of model data
         """
         params.update(request.url_data)
+        stream = self.stream_format(request, params)
+        if stream:
+            return self.stream_list_response(request, stream, schema,
+                                             filters, params)
         with self.begin_session() as session:
             query = self.query(session, *filters, **params)
             only = query.fields or None
@@ -212,6 +229,114 @@ class Model(ABC, Component):
             data = schema.dump(query.all(), many=True).data
         return request.json_response(data)
 
+    def get_page_response(self, request, schema=None, *filters, **params):
+        """Get a HTTP response for a page of model data
+
+        The page is fetched and decorated with links by the application
+        ``pagination`` (the ``PAGINATION`` setting), streaming requests
+        are served by :meth:`stream_list_response`
+        """
+        pagination = request.app.pagination
+        params.update(request.url_data)
+        stream = self.stream_format(request, params)
+        if stream:
+            return self.stream_list_response(request, stream, schema,
+                                             filters, params)
+        cfg = request.config
+        for key in ('API_OFFSET_KEY', 'API_LIMIT_KEY', 'API_CURSOR_KEY'):
+            params.pop(cfg[key], None)
+        with self.begin_session() as session:
+            query = self.query(session, *filters, **params)
+            result, kwargs = pagination.page(request, query)
+            only = query.fields or None
+            schema = self.get_schema(schema or self.model_schema, only=only)
+            data = schema.dump(result, many=True).data
+        return request.json_response(pagination(request, data, **kwargs))
+
+    def stream_format(self, request, params):
+        """Streaming format requested by the client
+
+        Return ``ndjson``, ``json`` or ``None`` for a non-streaming response.
+        The ``API_STREAM_KEY`` url parameter is removed from ``params``.
+        """
+        stream = params.pop(self.config['API_STREAM_KEY'], None)
+        accept = request.content_types
+        if stream == 'ndjson' or (accept and accept.best == NDJSON):
+            return 'ndjson'
+        elif stream and stream not in ('0', 'false'):
+            return 'json'
+
+    def stream_list_response(self, request, format, schema=None, filters=(),
+                             params=None):
+        """Stream a list of model data as a JSON array or as
+        newline delimited JSON
+
+        Rows are fetched from the :meth:`.Query.iter` in chunks of
+        ``API_STREAM_CHUNK_SIZE`` and serialised one by one, at most
+        :meth:`stream_limit` rows are streamed
+        """
+        params = dict(params or ())
+        limit, offset = self.stream_limit(request, params)
+        chunks = self.list_chunks(format, schema, filters, params,
+                                  limit=limit, offset=offset)
+        response = request.response
+        response.content_type = NDJSON if format == 'ndjson' else JSON
+        response.content = green_chunks(chunks, self.green_pool)
+        return response
+
+    def stream_limit(self, request, params):
+        """Limit and offset of a streaming response
+
+        The ``API_LIMIT_KEY`` and ``API_OFFSET_KEY`` url parameters are
+        removed from ``params``. The limit is bounded by
+        :setting:`API_STREAM_LIMIT` for authenticated users and by
+        :setting:`API_LIMIT_NOAUTH` for anonymous users
+        """
+        cfg = self.config
+        user = request.cache.user
+        if user and user.is_authenticated():
+            max_limit = cfg['API_STREAM_LIMIT']
+        else:
+            max_limit = cfg['API_LIMIT_NOAUTH']
+        limit = as_int(params.pop(cfg['API_LIMIT_KEY'], None), 0)
+        offset = as_int(params.pop(cfg['API_OFFSET_KEY'], None), 0)
+        if max_limit:
+            limit = min(limit, max_limit) if limit > 0 else max_limit
+        return max(limit, 0) or None, max(offset, 0)
+
+    def list_chunks(self, format, schema=None, filters=(), params=None,
+                    chunk_size=None, limit=None, offset=None):
+        """Generator of encoded chunks of model data
+        """
+        chunk_size = chunk_size or self.config['API_STREAM_CHUNK_SIZE']
+        ndjson = format == 'ndjson'
+        sep = '\n' if ndjson else ','
+        session = self.session()
+        try:
+            query = self.query(session, *filters, **(params or {}))
+            if offset:
+                query = query.offset(offset)
+            if limit:
+                query = query.limit(limit)
+            only = query.fields or None
+            schema = self.get_schema(schema or self.model_schema, only=only)
+            start = '' if ndjson else '['
+            rows = []
+            for instance in query.iter(chunk_size):
+                rows.append(json.dumps(schema.dump(instance).data))
+                if len(rows) == chunk_size:
+                    yield encode_rows(start, rows, sep, ndjson)
+                    start = '' if ndjson else ','
+                    rows = []
+            if rows:
+                yield encode_rows(start, rows, sep, ndjson)
+            elif start == '[':
+                yield b'['
+            if not ndjson:
+                yield b']'
+        finally:
+            session.close()
+
     def delete_one_response(self, request, instance=None):
         with self.begin_session() as session:
             if instance is None:
@@ -229,15 +354,66 @@ class Model(ABC, Component):
         return query.all()
 
     def paginate(self, session, limit=50, query=None):
-        if query is None:
-            query = self.query(session)
+        """Iterate over model instances, ``limit`` at a time
+
+        Shortcut for iterating over instances of :meth:`batches`
+        """
+        for batch in self.batches(session, limit, query):
+            yield from batch
+
+    def batches(self, session, batch_size=100, query=None, keys=None,
+                expunge=False, callback=None):
+        """Iterate over batches of model instances
+
+        Batches are fetched with keyset pagination over ``keys``,
+        the :meth:`batch_keys` by default, so that the cost of fetching a
+        batch does not grow with the number of batches already fetched.
+
+        :param session: model session
+        :param batch_size: maximum number of instances in a batch
+        :param query: optional unordered :class:`.Query`, a copy is used
+            for each batch
+        :param keys: optional unique keys to order and batch by
+        :param expunge: remove instances from the session once a batch has
+            been processed, so that memory usage stays flat
+        :param callback: optional callable invoked, once a batch has been
+            processed, with the number of batches and instances processed
+        """
+        keys = tuple(keys or self.batch_keys())
+        values = None
+        batches = 0
+        total = 0
         while True:
-            data = query.limit(limit).all()
-            for obj in data:
-                yield obj
-            if len(data) < limit:
+            batch_query = self.query(session) if query is None else copy(query)
+            batch = batch_query.keyset(keys, values).limit(batch_size).all()
+            if not batch:
+                break
+            values = [self.get_value(batch[-1], key) for key in keys]
+            yield batch
+            batches += 1
+            total += len(batch)
+            if expunge:
+                self.expunge(session, batch)
+            if callback:
+                callback(batches, total)
+            if len(batch) < batch_size:
                 break
 
+    def batch_keys(self):
+        """Unique keys used by :meth:`batches`
+        """
+        return ('id',)
+
+    def get_value(self, instance, name):
+        if isinstance(instance, dict):
+            return instance.get(name)
+        return getattr(instance, name, None)
+
+    def expunge(self, session, instances):
+        """Remove ``instances`` from the ``session``
+        """
+        pass
+
     def get_one(self, session, *filters, **kwargs):
         query = self.query(session, *filters, **kwargs)
         return query.one()
@@ -329,3 +505,36 @@ class Model(ABC, Component):
     def field_errors(self, fields, message=None):
         message = message or 'not available'
         return dict(((name, message) for name in fields))
+
+
+def encode_rows(start, rows, sep, ndjson):
+    chunk = '%s%s' % (start, sep.join(rows))
+    if ndjson:
+        chunk += sep
+    return chunk.encode('utf-8')
+
+
+def green_chunks(chunks, pool):
+    """Iterate over ``chunks`` in the green pool
+
+    Chunks are produced in a green worker, so that database queries work,
+    and written by the wsgi server as they become available
+    """
+    if not pool:
+        yield from chunks
+        return
+    done = []
+
+    def next_chunk():
+        try:
+            return next(chunks)
+        except StopIteration:
+            done.append(True)
+            return b''
+
+    try:
+        while not done:
+            yield pool.submit(next_chunk)
+    finally:
+        if not done:
+            pool.submit(chunks.close)
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 from .component import Component
+from .schema import schema_instances
 
 
 class Session(ABC, Component):
@@ -55,6 +56,7 @@ class Query(ABC):
         self.session = session
         self.fields = None
         self.filters = {}
+        self.sorting = []
         self.app.fire_event('on_query', data=self)
 
     @property
@@ -82,24 +84,50 @@ class Query(ABC):
         :return: an iterable over models
         """
 
+    def iter(self, chunk_size=None):
+        """Iterate over elements in this query
+
+        Backends which support it should fetch elements in chunks of
+        ``chunk_size`` rather than loading them all in memory
+        """
+        return iter(self.all())
+
     @abstractmethod
     def count(self):
         """Return the number of elements in this query"""
 
+    def total(self):
+        """Return a two elements tuple with the number of elements in
+        this query and a flag indicating if the number is approximate
+        """
+        return self.count(), False
+
     @abstractmethod
     def delete(self):
         """Delete all elements in this query"""
 
     @property
     def query_fields(self):
-        schema = self.model.get_schema(
+        schema = self.model.get_schema_class(
             self.model.query_schema or self.model.model_schema
         )
-        return schema.fields if schema else ()
+        if schema:
+            return schema_instances(self.model.app).prototype(schema).fields
+        return ()
 
     def limit(self, limit):
         raise NotImplementedError
 
+    def keyset(self, keys, values=None, reverse=False):
+        """Order by ``keys``, replacing any previous ordering, and, when
+        ``values`` are given, filter elements which come after ``values``
+        (before if ``reverse`` is True)
+
+        Keys are field names, in descending order when followed by
+        ``:desc``
+        """
+        raise NotImplementedError
+
     def offset(self, offset):
         raise NotImplementedError
 
@@ -122,7 +150,7 @@ class Query(ABC):
             self.fields = self.fields.intersection(fields)
         return self
 
-    def filter(self, *filters, search=None, **params):
+    def filter(self, *filters, search=None, sortby=None, **params):
         if filters:
             self.filter_args(*filters)
 
@@ -140,7 +168,7 @@ class Query(ABC):
         if search:
             self.search(search)
 
-        return self
+        return self.sortby(sortby)
 
     def sortby(self, sortby=None):
         if sortby:
@@ -150,5 +178,14 @@ class Query(ABC):
                 direction = None
                 if ':' in entry:
                     entry, direction = entry.split(':')
+                self.sorting.append((entry, direction))
                 self.sortby_field(entry, direction)
         return self
+
+
+def keyset_key(key):
+    """Split a :meth:`.Query.keyset` key into the field name and a flag
+    for descending order
+    """
+    name, _, direction = key.partition(':')
+    return name, direction == 'desc'
@@ -1,3 +1,5 @@
+from threading import Lock
+
 import marshmallow as ma
 from marshmallow import class_registry, post_dump, post_load
 
@@ -83,6 +85,58 @@ def model_schema_fields(app):
     return {}
 
 
+@app_attribute
+def schema_instances(app):
+    return SchemaCache()
+
+
+class SchemaCache:
+    """Cache of schema instances keyed by schema class and the
+    ``only``, ``partial`` and ``many`` options
+
+    Cached instances are prototypes for inspecting fields, :meth:`get`
+    builds a new instance, with its own bound fields, for serialisation
+    so that schemas are never shared by threads and greenlets. Model
+    fields are loaded once per schema class by :func:`get_model_fields`.
+    """
+    def __init__(self):
+        self._schemas = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._schemas)
+
+    def clear(self):
+        with self._lock:
+            self._schemas.clear()
+
+    def prototype(self, schema_cls, only=None, partial=False, many=False):
+        """The cached schema instance, it should not be used for
+        serialisation but only for inspecting fields
+        """
+        key = (schema_cls, _key(only), _key(partial), many)
+        schema = self._schemas.get(key)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.get(key)
+                if schema is None:
+                    schema = schema_cls(only=only, partial=partial,
+                                        many=many)
+                    self._schemas[key] = schema
+        return schema
+
+    def get(self, schema_cls, only=None, partial=False, many=False, **kw):
+        """A new instance of ``schema_cls`` for serialisation
+        """
+        return schema_cls(only=only, partial=partial, many=many, **kw)
+
+
+def _key(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(value)
+    return value
+
+
 def resource_name(schema):
     if not schema:
         return
@@ -36,8 +36,13 @@ from hashlib import sha512
 from base64 import b64encode as _b64encode
 from binascii import b2a_hex as _b2a_hex
 
+try:
+    from hashlib import pbkdf2_hmac
+except ImportError:     # pragma    nocover
+    pbkdf2_hmac = None
 
-__all__ = ['PBKDF2', 'crypt', 'encrypt', 'verify']
+
+__all__ = ['PBKDF2', 'derive_key', 'crypt', 'encrypt', 'verify']
 
 
 _0xffffffffL = 0xffffffff
@@ -206,14 +211,42 @@ class PBKDF2:
             self.closed = True
 
 
+def derive_key(passphrase, salt, iterations=24000, digestmodule=sha256,
+               secret_key=None, dklen=None, native=True):
+    """Derive a key of ``dklen`` bytes from ``passphrase`` and ``salt``
+
+    Uses :func:`hashlib.pbkdf2_hmac` when available and ``native`` is True,
+    otherwise it falls back to the pure python :class:`PBKDF2`.
+    Both give the same result, including the ``secret_key`` pre-hash
+    of the passphrase.
+    """
+    if not native or pbkdf2_hmac is None:
+        return PBKDF2(passphrase, salt, iterations, digestmodule,
+                      secret_key=secret_key).read(
+            dklen or digestmodule().digest_size)
+    if isunicode(passphrase):
+        passphrase = passphrase.encode('utf-8')
+    if isunicode(salt):
+        salt = salt.encode('utf-8')
+    if secret_key:
+        if isinstance(secret_key, str):
+            secret_key = secret_key.encode('latin-1')
+        passphrase = sha1(secret_key + passphrase).digest()
+    return pbkdf2_hmac(digestmodule().name, passphrase, salt, iterations,
+                       dklen)
+
+
 def crypt(word, salt=None, iterations=24000, digestmodule=sha256,
-          secret_key=None):
+          secret_key=None, native=True):
     """PBKDF2-based unix crypt(3) replacement.
 
     The number of iterations specified in the salt overrides the 'iterations'
     parameter.
 
     The effective hash length is dependant on the used `digestmodule`.
+
+    When ``native`` is True the key derivation is performed by
+    :func:`hashlib.pbkdf2_hmac` if available.
     """
 
     # Generate a (pseudo-)random salt if the user hasn't provided one.
@@ -264,8 +297,9 @@ def crypt(word, salt=None, iterations=24000, digestmodule=sha256,
 
     salt = "$p5k2$%s$%x$%s" % (digest.name.lower(),  iterations, salt)
 
-    rawhash = PBKDF2(word, salt, iterations, digestmodule,
-                     secret_key=secret_key).read(digest.digest_size)
+    rawhash = derive_key(word, salt, iterations, digestmodule,
+                         secret_key=secret_key, dklen=digest.digest_size,
+                         native=native)
     return salt + "$" + b64encode(rawhash, "./")
 
 
@@ -298,4 +332,5 @@ def verify(hashpass, raw, key, salt_length=None, *args, **kwargs):
         hashpass = hashpass.decode('utf-8')
     if isinstance(raw, bytes):
         raw = raw.decode('utf-8')
-    return hashpass == crypt(raw, hashpass, secret_key=key)
+    return hashpass == crypt(raw, hashpass, secret_key=key,
+                             native=kwargs.get('native', True))
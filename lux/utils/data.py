@@ -68,3 +68,10 @@ def as_tuple(value=None):
 
 def boolean_from_url_query(value):
     return value.lower() in ('', 'true', 'yes')
+
+
+def as_int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
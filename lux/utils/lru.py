@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict
+from threading import RLock
+
+
+class LRUCache:
+    """A bounded mapping which evicts the least recently used entry
+
+    Entries can be set with an optional ``timeout`` in seconds, expired
+    entries are removed when accessed.
+    Keeps ``hits`` and ``misses`` counters for the :meth:`get` method so
+    that the cache can be sized.
+
+    :param maxsize: maximum number of entries, ``0`` or ``None`` for an
+        unbounded cache
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._expiry = {}
+        self._lock = RLock()
+
+    def __repr__(self):
+        return '%s(%d/%s)' % (self.__class__.__name__, len(self),
+                              self.maxsize or 'inf')
+    __str__ = __repr__
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(list(self._data))
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            expiry = self._expiry.get(key)
+            if expiry and expiry < time.time():
+                self.pop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            data = self._data
+            data[key] = value
+            data.move_to_end(key)
+            if timeout:
+                self._expiry[key] = time.time() + timeout
+            else:
+                self._expiry.pop(key, None)
+            if self.maxsize:
+                while len(data) > self.maxsize:
+                    key, _ = data.popitem(last=False)
+                    self._expiry.pop(key, None)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            self._expiry.pop(key, None)
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expiry.clear()
+
+    def info(self):
+        """Dictionary of cache statistics
+        """
+        return dict(hits=self.hits,
+                    misses=self.misses,
+                    size=len(self),
+                    maxsize=self.maxsize)
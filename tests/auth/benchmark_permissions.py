@@ -0,0 +1,62 @@
+"""Permission checks against a few hundred compiled policies
+
+Builds policies for a set of models with wildcard, field-level and
+conditional entries and checks model and field resources the way
+:meth:`.Resource.permissions` does.
+Run with::
+
+    python -m tests.auth.benchmark_permissions
+"""
+import logging
+from timeit import timeit
+
+from lux.ext.auth.permissions import PolicyEngine
+
+
+logger = logging.getLogger('lux.benchmark')
+
+ACTIONS = ('read', 'create', 'update', 'delete')
+
+
+def policies(models=50, fields=5):
+    for n in range(models):
+        model = 'model%d' % n
+        yield {'resource': [model, '%s:*' % model], 'action': 'read'}
+        yield {'resource': '%s:*' % model, 'action': ['update', 'delete'],
+               'condition': 'user == "owner"'}
+        for f in range(fields):
+            yield {'resource': '%s:*:field%d' % (model, f),
+                   'action': '*',
+                   'effect': 'deny' if f % 2 else 'allow'}
+
+
+def resources(model, fields=5):
+    resource = '%s:1' % model
+    yield resource
+    for f in range(fields):
+        yield '%s:field%d' % (resource, f)
+
+
+def check(engine, model, context):
+    for resource in resources(model):
+        for action in ACTIONS:
+            engine.has_permission(resource, action, context, logger)
+
+
+def bench(number=100):
+    documents = list(policies())
+    context = {'user': 'owner'}
+    compile_ms = timeit(lambda: PolicyEngine(documents), number=number)
+    engine = PolicyEngine(documents)
+    for model in ('model0', 'model49', 'unknown'):
+        check_ms = timeit(lambda: check(engine, model, context),
+                          number=number)
+        yield model, len(documents), 1e3*compile_ms/number, \
+            1e3*check_ms/number
+
+
+if __name__ == '__main__':
+    print('%-10s %10s %12s %12s' % ('model', 'policies', 'compile ms',
+                                    'checks ms'))
+    for row in bench():
+        print('%-10s %10d %12.3f %12.3f' % row)
@@ -1,11 +1,19 @@
+from pulsar.api import HttpException
+
 from lux.utils import test
 from lux.models import fields
 
+from lux.ext.auth.permissions import (
+    load_policies, policies_key, policies_generation, policies_generation_key,
+    local_policies_generation
+)
+
 from tests.auth.utils import AuthUtils
 
 
 class TestBackend(test.AppTestCase, AuthUtils):
     config_file = 'tests.auth'
+    config_params = {'CACHE_SERVER': 'memory://'}
 
     @classmethod
     def populatedb(cls):
@@ -34,6 +42,30 @@ class TestBackend(test.AppTestCase, AuthUtils):
     def test_create_user(self):
         return self._new_credentials()
 
+    @test.green
+    def test_password_executor(self):
+        auth = self.app.auth
+        executor = auth.password_executor
+        calls = executor.calls
+        encrypted = auth.encrypt('pippo')
+        self.assertTrue(auth.crypt_verify(encrypted, 'pippo'))
+        self.assertFalse(auth.crypt_verify(encrypted, 'pluto'))
+        info = executor.info()
+        self.assertEqual(info['executor'], 'thread')
+        self.assertEqual(info['calls'], calls + 3)
+        self.assertEqual(info['pending'], 0)
+        self.assertTrue(info['average_time'] > 0)
+
+    def test_password_executor_saturated(self):
+        executor = self.app.auth.password_executor
+        executor.pending = executor.queue_size
+        try:
+            with self.assertRaises(HttpException) as exc:
+                self.app.auth.encrypt('pippo')
+            self.assertEqual(exc.exception.status, 503)
+        finally:
+            executor.pending = 0
+
     @test.green
     def test_create_superuser(self):
         with self.app.models.begin_session() as session:
@@ -76,8 +108,71 @@ class TestBackend(test.AppTestCase, AuthUtils):
                                         policy={})
             group.permissions.append(permission)
 
+    @test.green
+    def test_permission_policies(self):
+        odm = self.app.odm()
+        cache = self.app.cache_server
+        policy = {'resource': 'objectives:*', 'action': 'read'}
+        with odm.begin() as session:
+            user = odm.user(username=test.randomname())
+            permission = odm.permission(name=test.randomname(),
+                                        policy=policy)
+            for _ in range(2):
+                group = odm.group(name=test.randomname())
+                group.users.append(user)
+                group.permissions.append(permission)
+                session.add(group)
+
+        with odm.begin() as session:
+            self.assertEqual(load_policies(session, user.id), [policy])
+
+        key = policies_key(self.app, user.id)
+        cache.set_json(key, [policy])
+        with odm.begin() as session:
+            session.add(user)
+            user.first_name = 'pippo'
+            session.flush()
+            # invalidated only after commit
+            self.assertEqual(cache.get_json(key), [policy])
+        self.assertEqual(cache.get_json(key), None)
+
+        cache.set_json(key, [policy])
+        with odm.begin() as session:
+            session.add(permission)
+            permission.description = 'Read objectives'
+        new_key = policies_key(self.app, user.id)
+        self.assertNotEqual(new_key, key)
+        self.assertEqual(cache.get_json(new_key), None)
+        self.assertEqual(policies_key(self.app, user.id), new_key)
+
+    def test_policies_generation(self):
+        app = self.app
+        generation = policies_generation(app)
+        app.cache_server.set_json(policies_generation_key(app), 'foo')
+        self.assertEqual(policies_generation(app), generation)
+        local_policies_generation(app).clear()
+        self.assertEqual(policies_generation(app), 'foo')
+
     def test_rest_user(self):
         """Check that the RestField was overwritten properly"""
         model = self.app.models['users']
         schema = model.get_schema(model.model_schema)
         self.assertIsInstance(schema.fields['email'], fields.Email)
+
+    def test_schema_cache(self):
+        model = self.app.models['users']
+        schema1 = model.get_schema(model.model_schema)
+        schema2 = model.get_schema(model.model_schema)
+        self.assertNotEqual(schema1, schema2)
+        self.assertEqual(tuple(schema1.fields), tuple(schema2.fields))
+        self.assertNotEqual(schema1._marshal, schema2._marshal)
+        # fields are bound to their own schema
+        email = schema1.fields['email']
+        self.assertNotEqual(email, schema2.fields['email'])
+        self.assertEqual(email.parent, schema1)
+        self.assertEqual(schema2.fields['email'].parent, schema2)
+        schema3 = model.get_schema(model.model_schema, only=('email',))
+        self.assertEqual(tuple(schema3.fields), ('email',))
+        field = model.field('email')
+        self.assertIsInstance(field, type(email))
+        self.assertNotEqual(field, email)
@@ -0,0 +1,93 @@
+import logging
+
+from lux.ext.auth.permissions import PolicyEngine, policy_actions, ALL
+from lux.utils import test
+
+
+logger = logging.getLogger('lux.test')
+
+
+POLICIES = [
+    {
+        "resource": ["objectives:*", "objectives:*:subject"],
+        "action": "*"
+    },
+    {
+        "resource": "objectives:*:deadline",
+        "action": ["read", "UPDATE"],
+        "effect": "deny",
+        "condition": "user == 'anonymous'"
+    },
+    {
+        "resource": "secrets",
+        "action": "read"
+    },
+    {
+        "resource": "secrets:*",
+        "action": "read",
+        "condition": "match[0] != 'private'"
+    },
+    {
+        "resource": "secrets:private",
+        "action": "read",
+        "effect": "deny"
+    },
+    {
+        "resource": "broken",
+        "action": "read",
+        "condition": "user +"
+    }
+]
+
+
+class TestPolicyEngine(test.TestCase):
+
+    def check(self, resource, action, user='anonymous', policies=None):
+        engine = PolicyEngine(policies or POLICIES)
+        return engine.has_permission(resource, action, {'user': user},
+                                     logger)
+
+    def test_policy_actions(self):
+        self.assertEqual(policy_actions('*'), ALL)
+        self.assertEqual(policy_actions(['read', ['*']]), ALL)
+        self.assertEqual(policy_actions(['Read', 'update']),
+                         frozenset(('read', 'update')))
+        self.assertEqual(policy_actions(None), frozenset())
+
+    def test_wildcard(self):
+        self.assertTrue(self.check('objectives:1', 'read'))
+        self.assertTrue(self.check('objectives:1:subject', 'delete'))
+        self.assertFalse(self.check('objectives', 'read'))
+
+    def test_prefix(self):
+        self.assertTrue(self.check('secrets:public:field', 'read'))
+        self.assertFalse(self.check('secrets:public:field', 'update'))
+
+    def test_condition(self):
+        self.assertFalse(self.check('objectives:1:deadline', 'read'))
+        self.assertFalse(self.check('objectives:1:deadline', 'Update'))
+        self.assertTrue(self.check('objectives:1:deadline', 'delete'))
+        self.assertTrue(self.check('objectives:1:deadline', 'read', 'pippo'))
+
+    def test_condition_match(self):
+        self.assertTrue(self.check('secrets:public', 'read'))
+        self.assertFalse(self.check('secrets:private', 'read'))
+
+    def test_exact_deny(self):
+        policies = [
+            {"resource": "secrets", "action": "*"},
+            {"resource": "secrets", "action": "read", "effect": "deny"}
+        ]
+        self.assertFalse(self.check('secrets', 'read', policies=policies))
+        self.assertTrue(self.check('secrets', 'update', policies=policies))
+
+    def test_fewer_wildcards(self):
+        policies = [
+            {"resource": "a:*:*", "action": "*", "effect": "deny"},
+            {"resource": "a:b:*", "action": "*"}
+        ]
+        self.assertTrue(self.check('a:b:c', 'read', policies=policies))
+        self.assertFalse(self.check('a:c:c', 'read', policies=policies))
+
+    def test_invalid_condition(self):
+        self.assertFalse(self.check('broken', 'read'))
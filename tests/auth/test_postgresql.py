@@ -11,6 +11,7 @@ from tests.auth.registration import RegistrationMixin
 from tests.auth.mail_list import MailListMixin
 from tests.auth.groups import GroupsMixin
 from tests.auth.errors import ErrorsMixin
+from tests.auth.tokens import TokensMixin
 
 
 class TestPostgreSql(test.AppTestCase,
@@ -22,7 +23,8 @@ class TestPostgreSql(test.AppTestCase,
                      RegistrationMixin,
                      ErrorsMixin,
                      GroupsMixin,
-                     MailListMixin):
+                     MailListMixin,
+                     TokensMixin):
     config_file = 'tests.auth'
 
     @classmethod
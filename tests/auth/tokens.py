@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from unittest import mock
+from uuid import uuid4
+
+from lux.utils import test
+from lux.ext.auth.principals import TokenPrincipal, TokenCache, MISSING
+
+
+class TokensMixin:
+
+    @test.green
+    def test_last_access_buffer(self):
+        tokens = self.app.models['tokens']
+        buffer = tokens.access_buffer
+        buffer.flush()
+        with tokens.begin_session() as session:
+            token = tokens.get_one(session, id=self.pippo_token)
+        self.assertEqual(len(buffer), 1)
+        when = datetime.utcnow() + timedelta(hours=1)
+        buffer.touch(token.id, when)
+        buffer.touch(token.id, when - timedelta(minutes=1))
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.flush(), 0)
+        with tokens.begin_session() as session:
+            token = tokens.query(session, id=self.pippo_token).one()
+            self.assertEqual(token.last_access, when)
+
+    @test.green
+    def test_last_access_requeue(self):
+        buffer = self.app.models['tokens'].access_buffer
+        buffer.flush()
+        buffer.touch(self.pippo_token)
+        with mock.patch('lux.ext.auth.rest.tokens.bulk_update',
+                        side_effect=RuntimeError('database down')):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(len(buffer), 0)
+
+    async def test_token_cache(self):
+        cache = self.app.auth.token_cache
+        credentials = await self._new_credentials()
+        token = await self.user_token(credentials, jwt=self.admin_jwt)
+        request = await self.client.get(self.api_url('user'), token=token)
+        self.json(request.response, 200)
+        principal = cache.get(token)
+        self.assertIsInstance(principal, TokenPrincipal)
+        self.assertEqual(principal.user.username, credentials['username'])
+        self.assertTrue(principal.user.is_active())
+        self.assertFalse(principal.user.is_superuser())
+        request = await self.client.get(self.api_url('user'), token=token)
+        self.json(request.response, 200)
+        self.assertEqual(cache.get(token), principal)
+        await self._deactivate(principal.user.id)
+        self.assertEqual(cache.get(token), None)
+
+    async def test_token_cache_missing(self):
+        cache = self.app.auth.token_cache
+        token = str(uuid4())
+        request = await self.client.get(self.api_url('user'), token=token)
+        self.assertEqual(request.response.status_code, 400)
+        self.assertEqual(cache.get(token), MISSING)
+
+    async def test_token_cache_delete(self):
+        cache = self.app.auth.token_cache
+        credentials = await self._new_credentials()
+        token = await self.user_token(credentials, jwt=self.admin_jwt)
+        request = await self.client.head(self.api_url('authorizations'),
+                                         token=token)
+        self.assertEqual(request.response.status_code, 200)
+        self.assertIsInstance(cache.get(token), TokenPrincipal)
+        request = await self.client.delete(self.api_url('authorizations'),
+                                           token=token)
+        self.assertEqual(request.response.status_code, 204)
+        self.assertEqual(cache.get(token), None)
+        request = await self.client.head(self.api_url('authorizations'),
+                                         token=token)
+        self.assertEqual(request.response.status_code, 400)
+
+    @test.green
+    def test_token_cache_after_commit(self):
+        cache = self.app.auth.token_cache
+        tokens = self.app.models['tokens']
+        with tokens.begin_session() as session:
+            token = tokens.get_one(session, id=self.pippo_token)
+            key = str(token.id)
+            principal = cache.set(key, token)
+            token.description = 'changed'
+            session.add(token)
+            session.flush()
+            # not invalidated until the transaction is committed
+            self.assertEqual(cache.get(key), principal)
+        self.assertEqual(cache.get(key), None)
+
+    def test_token_cache_publish(self):
+        app = self.app
+        channels = app.channels
+        app.channels = mock.MagicMock()
+        try:
+            cache = TokenCache(app)
+            cache.invalidate(tokens=['foo'], users=[3])
+            app.channels.publish.assert_called_once_with(
+                'auth', 'invalidate',
+                {'tokens': ['foo'], 'users': ['3'], 'origin': cache.uid})
+        finally:
+            app.channels = channels
+
+    @test.green
+    def _deactivate(self, user_id):
+        users = self.app.models['users']
+        with users.begin_session() as session:
+            user = users.get_one(session, id=user_id)
+            user.active = False
+            session.add(user)
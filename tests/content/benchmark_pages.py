@@ -0,0 +1,52 @@
+"""Page lookup time for a few hundred content groups
+
+Compares matching the routes of :func:`.routes_from_groups` in order, as
+the base :meth:`.CMS.page` does, with the compiled :class:`.PageMatcher`,
+with and without its per-path memo.
+Run with::
+
+    python -m tests.content.benchmark_pages
+"""
+from timeit import timeit
+
+from lux.ext.content.cms import PageMatcher, group_pages, routes_from_groups
+
+
+def groups(size=300):
+    groups = {'site': {'path': '*'}}
+    for n in range(size):
+        groups['group%d' % n] = {'path': 'section%d/group%d' % (n % 10, n)}
+    return groups
+
+
+PATHS = ('',
+         'section0/group0',
+         'section9/group299/2016/first-post',
+         'section5/unknown/page')
+
+
+def linear(routes, path):
+    for route, page in routes:
+        matched = route.match(path)
+        if matched is not None and '__remaining__' not in matched:
+            return page, matched
+
+
+def bench(number=1000):
+    config = groups()
+    routes = routes_from_groups(config)
+    pages = group_pages(config)
+    for path in PATHS:
+        matcher = PageMatcher(pages, 0)
+        linear_ms = timeit(lambda: linear(routes, path),
+                           number=number)/number
+        trie_ms = timeit(lambda: matcher._match(path), number=number)/number
+        memo_ms = timeit(lambda: matcher.match(path), number=number)/number
+        yield path, 1e6*linear_ms, 1e6*trie_ms, 1e6*memo_ms
+
+
+if __name__ == '__main__':
+    print('%-36s %10s %10s %10s' % ('path', 'linear us', 'trie us',
+                                    'memo us'))
+    for row in bench():
+        print('%-36s %10.2f %10.2f %10.2f' % row)
@@ -0,0 +1,21 @@
+'''Config file for testing contents with a policy based backend'''
+from lux.ext.auth import AuthBackend
+from lux.ext.auth.permissions import PemissionsMixin
+
+from tests.content import *  # noqa
+
+
+EXTENSIONS = ['lux.ext.base',
+              'lux.ext.rest',
+              'lux.ext.odm',
+              'lux.ext.auth',
+              'lux.ext.content']
+
+DATASTORE = 'sqlite://'
+AUTHENTICATION_BACKEND = 'tests.content.policy:PolicyBackend'
+DEFAULT_POLICY = ()
+
+
+class PolicyBackend(PemissionsMixin, AuthBackend):
+    """Permissions are granted by policies only
+    """
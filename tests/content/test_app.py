@@ -1,5 +1,7 @@
 from urllib.parse import urlsplit
 
+from pulsar.api import Http404
+
 from lux.ext.content.github import github_signature
 
 from tests import content
@@ -13,6 +15,28 @@ class TestContentViews(content.Test):
         self.assertEqual(model.name, 'content')
         self.assertEqual(model.identifier, 'contents')
 
+    def test_cms_content_model(self):
+        cms = self.app.cms
+        self.assertEqual(cms.content_model, self.app.models.get('contents'))
+        request = self.app.wsgi_request()
+        data = cms.get_content(request, 'blog', 'foo')
+        self.assertEqual(data['title'], 'This is Foo')
+        self.assertTrue(data['body'])
+        # a copy
+        data.pop('body')
+        self.assertTrue(cms.get_content(request, 'blog', 'foo')['body'])
+        self.assertRaises(Http404, cms.get_content, request, 'blog', 'bla')
+
+    def test_cms_all(self):
+        cms = self.app.cms
+        request = self.app.wsgi_request()
+        data = cms.all(request, 'blog')
+        self.assertEqual(sorted(d['slug'] for d in data), ['foo', 'index'])
+        self.assertFalse([d for d in data if 'body' in d])
+        data = cms.get_contents(request, 'site', load_only=('slug', 'body'))
+        self.assertEqual(len(data), 2)
+        self.assertEqual(set(data[0]), set(('slug', 'body')))
+
     async def test_404(self):
         request = await self.client.get('/blog/bla')
         self.html(request.response, 404)
@@ -0,0 +1,80 @@
+import os
+import time
+from threading import Thread
+
+from lux.ext.content.index import ContentIndex
+
+from tests import content
+
+
+class TestContentIndex(content.Test):
+    config_params = {'CONTENT_INDEX': '.content-index.sqlite'}
+
+    def test_index(self):
+        model = self.app.models.get('contents')
+        index = model.index
+        self.assertIsInstance(index, ContentIndex)
+        self.assertEqual(os.path.dirname(index.path), content.CONTENT_REPO)
+        data = index.contents('blog')
+        self.assertEqual(sorted(d['slug'] for d in data), ['foo', 'index'])
+        data = index.contents('blog', ['foo'])
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['title'], 'This is Foo')
+        # data is a copy
+        data[0].pop('body')
+        self.assertTrue(index.contents('blog', ['foo'])[0]['body'])
+
+    def test_incremental(self):
+        model = self.app.models.get('contents')
+        model.index.contents('site')
+        index = ContentIndex(model, model.index.path)
+        self.assertEqual(len(index.contents('site')), 2)
+        self.assertEqual(index.parsed, 0)
+        src = os.path.join(content.CONTENT_REPO, 'site', 'foo.md')
+        with open(src, 'w') as fp:
+            fp.write('\n'.join(('title: Foo changed', '', 'Just foo')))
+        index = ContentIndex(model, model.index.path)
+        data = index.contents('site', ['foo'])
+        self.assertEqual(data[0]['title'], 'Foo changed')
+        self.assertEqual(index.parsed, 1)
+
+    def test_single_sync(self):
+        model = self.app.models.get('contents')
+        index = ContentIndex(model, model.index.path)
+        sync = index.sync
+        calls = []
+
+        def slow_sync(group):
+            calls.append(group)
+            time.sleep(0.1)
+            return sync(group)
+
+        index.sync = slow_sync
+        results = []
+        threads = [Thread(target=lambda: results.append(
+            index.contents('blog'))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, ['blog'])
+        self.assertEqual(len(results), 3)
+        for data in results:
+            self.assertEqual(sorted(d['slug'] for d in data),
+                             ['foo', 'index'])
+
+    async def test_api_read(self):
+        request = await self.client.get('/api/contents/blog/foo')
+        data = self.json(request.response, 200)
+        self.assertEqual(data['slug'], 'foo')
+
+
+class TestNoContentIndex(content.Test):
+
+    def test_no_index(self):
+        model = self.app.models.get('contents')
+        self.assertEqual(model.index, None)
+        data = model.contents('blog')
+        self.assertEqual(sorted(d['slug'] for d in data), ['foo', 'index'])
+        self.assertFalse(os.path.exists(
+            os.path.join(content.CONTENT_REPO, '.content-index.sqlite')))
@@ -0,0 +1,53 @@
+import os
+
+from lux.core import output_cache
+
+from tests import content
+
+
+class TestOutputCache(content.Test):
+    config_params = {'HTML_CACHE_TIMEOUT': 60,
+                     'CONTENT_INDEX': '.content-index.sqlite'}
+
+    def setUp(self):
+        output_cache(self.app).clear()
+
+    async def test_anonymous_page(self):
+        cache = output_cache(self.app)
+        self.assertTrue(cache.enabled)
+        request = await self.client.get('/blog/foo')
+        bs = self.bs(request.response, 200)
+        self.assertEqual(str(bs.title), '<title>This is Foo</title>')
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(len(cache.fragments), 1)
+        request = await self.client.get('/blog/foo')
+        bs = self.bs(request.response, 200)
+        self.assertEqual(str(bs.title), '<title>This is Foo</title>')
+        self.assertEqual(len(cache), 1)
+        request = await self.client.get('/blog/foo?template=ui')
+        self.html(request.response, 200)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(len(cache.fragments), 1)
+
+    async def test_404_not_cached(self):
+        cache = output_cache(self.app)
+        request = await self.client.get('/blog/bla')
+        self.html(request.response, 404)
+        self.assertEqual(len(cache), 0)
+
+    def test_content_change_clears(self):
+        cache = output_cache(self.app)
+        cache.fragments.set('test', 'fragment', 60)
+        model = self.app.models.get('contents')
+        model.index.contents('blog')
+        self.assertEqual(len(cache.fragments), 1)
+        src = os.path.join(content.CONTENT_REPO, 'blog', 'bar.md')
+        with open(src, 'w') as fp:
+            fp.write('\n'.join(('title: Bar', '', 'Just bar')))
+        try:
+            model.index.clear()
+            self.assertEqual(len(model.index.contents('blog')), 3)
+            self.assertEqual(len(cache.fragments), 0)
+        finally:
+            os.remove(src)
+            model.index.clear()
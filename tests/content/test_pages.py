@@ -0,0 +1,76 @@
+from lux.ext.content.cms import PageMatcher, group_pages, routes_from_groups
+from lux.utils import test
+
+
+GROUPS = {
+    'site': {'path': '*'},
+    'blog': {'path': '/blog/'},
+    'news': {'path': 'blog/news'},
+    'docs': {'path': 'docs/api'}
+}
+
+
+def linear_match(routes, path):
+    for route, page in routes:
+        matched = route.match(path)
+        if matched is not None and '__remaining__' not in matched:
+            return page.name, matched
+
+
+class TestPageMatcher(test.TestCase):
+
+    def matcher(self):
+        return PageMatcher(group_pages(GROUPS), 100)
+
+    def match(self, matcher, path):
+        matched = matcher.match(path)
+        if matched:
+            return matched[0].name, matched[1]
+
+    def test_group_pages(self):
+        pages = dict(group_pages(GROUPS))
+        self.assertEqual(set(pages), set(('', 'blog', 'blog/news',
+                                          'docs/api')))
+        self.assertEqual(pages['blog'].name, 'blog')
+        self.assertEqual(pages['blog'].path, 'blog')
+        self.assertEqual(len(routes_from_groups(GROUPS)), 8)
+
+    def test_match(self):
+        matcher = self.matcher()
+        self.assertEqual(self.match(matcher, ''), ('site', {'path': ''}))
+        self.assertEqual(self.match(matcher, 'blog'), ('blog', {}))
+        self.assertEqual(self.match(matcher, 'blog/'),
+                         ('blog', {'path': ''}))
+        self.assertEqual(self.match(matcher, 'blog/foo/bar'),
+                         ('blog', {'path': 'foo/bar'}))
+        self.assertEqual(self.match(matcher, 'blog/news'), ('news', {}))
+        self.assertEqual(self.match(matcher, 'blog/news/foo'),
+                         ('news', {'path': 'foo'}))
+        self.assertEqual(self.match(matcher, 'docs'),
+                         ('site', {'path': 'docs'}))
+        self.assertEqual(self.match(matcher, 'docs/api/v1'),
+                         ('docs', {'path': 'v1'}))
+
+    def test_no_match(self):
+        groups = dict(GROUPS)
+        groups.pop('site')
+        matcher = PageMatcher(group_pages(groups))
+        self.assertEqual(matcher.match('foo'), None)
+        self.assertEqual(matcher.match('blogs'), None)
+        self.assertEqual(matcher.match('foo'), None)
+        self.assertEqual(matcher.memo.hits, 1)
+
+    def test_same_as_routes(self):
+        matcher = self.matcher()
+        routes = routes_from_groups(GROUPS)
+        for path in ('', 'blog', 'blog/', 'blog//foo', 'blog/news/',
+                     'blog/newsx', 'docs/api', 'docs/apis', 'foo/bar/'):
+            self.assertEqual(self.match(matcher, path),
+                             linear_match(routes, path))
+
+    def test_memo(self):
+        matcher = self.matcher()
+        self.match(matcher, 'blog/foo')
+        self.match(matcher, 'blog/foo')
+        self.assertEqual(matcher.memo.hits, 1)
+        self.assertEqual(len(matcher.memo), 1)
@@ -0,0 +1,26 @@
+from tests import content
+from tests.content.policy import PolicyBackend
+
+
+class TestPolicyBackend(content.Test):
+    config_file = 'tests.content.policy'
+
+    def test_backend(self):
+        auth = self.app.auth
+        self.assertIsInstance(auth, PolicyBackend)
+        request = self.app.wsgi_request()
+        self.assertFalse(auth.has_permission(request, 'api:contents:blog',
+                                             'read'))
+
+    def test_cms_contents(self):
+        cms = self.app.cms
+        request = self.app.wsgi_request()
+        data = cms.get_content(request, 'blog', 'foo')
+        self.assertEqual(data['title'], 'This is Foo')
+        data = cms.all(request, 'blog')
+        self.assertEqual(sorted(d['slug'] for d in data), ['foo', 'index'])
+
+    async def test_anonymous_read(self):
+        request = await self.client.get('/blog/foo')
+        bs = self.bs(request.response, 200)
+        self.assertEqual(str(bs.title), '<title>This is Foo</title>')
@@ -0,0 +1,31 @@
+from lux.ext.content.contents import RenderExecutor, render_markdown
+
+from tests import content
+
+
+class TestRender(content.Test):
+    config_params = {'MD_WORKERS': 2}
+
+    def test_read_contents(self):
+        model = self.app.models.get('contents')
+        files = sorted(model.group_files('blog'))
+        self.assertEqual(len(files), 2)
+        data = model.read_contents('blog', files)
+        self.assertEqual([d['slug'] for d in data], ['foo', 'index'])
+        self.assertEqual(data[0]['title'], 'This is Foo')
+        self.assertEqual(data[1]['title'], 'Index')
+        self.assertEqual(data[0]['priority'], 1)
+        single = model.read_content('blog', *files[0])
+        self.assertEqual(single['body'], data[0]['body'])
+
+    def test_executor_order(self):
+        model = self.app.models.get('contents')
+        srcs = [src for _, src in sorted(model.group_files('site'))] * 5
+        executor = RenderExecutor(self.app, 2)
+        try:
+            results = executor.map(render_markdown, srcs, ['meta'], '')
+        finally:
+            executor.shutdown()
+        self.assertEqual(len(results), 10)
+        titles = [meta['title'] for _, meta in results]
+        self.assertEqual(titles, [['This is Foo'], ['Index']] * 5)
@@ -0,0 +1,65 @@
+"""Encode/decode cost and payload size of cache serializers
+
+Documents are built from the markdown files in the ``docs`` directory,
+in the same shape as the content model ``tojson`` output.
+Run with::
+
+    python -m tests.core.benchmark_cache
+"""
+import os
+from timeit import timeit
+
+try:
+    from markdown import markdown
+except ImportError:     # pragma    nocover
+    markdown = None
+
+from lux.core.cache import encode_value, decode_value, serializers, msgpack
+
+
+DOCS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), 'docs')
+
+
+def documents():
+    docs = []
+    for dirpath, _, filenames in os.walk(DOCS):
+        for filename in sorted(filenames):
+            if not filename.endswith('.md'):
+                continue
+            with open(os.path.join(dirpath, filename)) as fp:
+                text = fp.read()
+            slug = filename[:-3]
+            docs.append({
+                'group': 'docs',
+                'slug': slug,
+                'path': '/docs/%s' % slug,
+                'title': slug.replace('-', ' ').title(),
+                'description': text[:120],
+                'priority': 1,
+                'order': len(docs),
+                'body': markdown(text) if markdown else text
+            })
+    return docs
+
+
+def bench(number=50):
+    data = documents()
+    for name in sorted(serializers):
+        if name == 'msgpack' and msgpack is None:
+            continue
+        for threshold in (None, 1024):
+            encoded = encode_value(data, name, threshold)
+            dumps = timeit(lambda: encode_value(data, name, threshold),
+                           number=number)/number
+            loads = timeit(lambda: decode_value(encoded),
+                           number=number)/number
+            yield (name, 'zlib' if threshold else '', len(encoded),
+                   1000*dumps, 1000*loads)
+
+
+if __name__ == '__main__':
+    print('%-8s %-5s %10s %10s %10s' % ('format', 'comp', 'bytes',
+                                        'dumps ms', 'loads ms'))
+    for row in bench():
+        print('%-8s %-5s %10d %10.3f %10.3f' % row)
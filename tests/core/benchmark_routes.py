@@ -0,0 +1,62 @@
+"""Resolve time of the compiled dispatcher against the router tree
+
+Builds a few hundred routes shaped like a lux site: API routers with
+model instances, html pages and a catch-all CMS router.
+Run with::
+
+    python -m tests.core.benchmark_routes
+"""
+from timeit import timeit
+
+from pulsar.apps.wsgi import Router
+
+from lux.core.dispatcher import Dispatcher
+
+
+def get(request):
+    pass
+
+
+def site(models=60):
+    root = Router('/', get=get)
+    api = Router('api/', get=get)
+    root.add_route(api)
+    for n in range(models):
+        model = Router('model%d' % n, get=get)
+        model.add_route(Router('<id>', get=get))
+        model.add_route(Router('<id>/metadata', get=get))
+        model.add_route(Router('metadata', get=get))
+        api.add_route(model)
+        root.add_route(Router('page%d' % n, get=get))
+    root.add_route(Router('<path:path>', get=get))
+    return root
+
+
+PATHS = ('/api/model0',
+         '/api/model59/metadata',
+         '/api/model30/45',
+         '/api/model59/45/metadata',
+         '/page59',
+         '/blog/2016/first-post')
+
+
+def bench(number=1000):
+    root = site()
+    tree = root._resolve
+    dispatcher = Dispatcher(root, 0)
+    cached = Dispatcher(root)
+    for path in PATHS:
+        tree_ms = timeit(lambda: tree(path[1:], 'get'),
+                         number=number)/number
+        dispatch_ms = timeit(lambda: dispatcher.resolve(path, 'get'),
+                             number=number)/number
+        cached_ms = timeit(lambda: cached.resolve(path, 'get'),
+                           number=number)/number
+        yield path, 1e6*tree_ms, 1e6*dispatch_ms, 1e6*cached_ms
+
+
+if __name__ == '__main__':
+    print('%-28s %10s %10s %10s' % ('path', 'tree us', 'trie us',
+                                    'cached us'))
+    for row in bench():
+        print('%-28s %10.2f %10.2f %10.2f' % row)
@@ -1,3 +1,5 @@
+import os
+
 from pulsar.api import ImproperlyConfigured
 
 from lux.utils import test
@@ -56,3 +58,50 @@ class CommandTests(test.TestCase):
         self.assertTrue('RANDOM_P' in app.config)
         self.assertTrue('USE_ETAGS' in app.config)
         self.assertTrue('SERVE_STATIC_FILES' in app.config)
+
+    def test_jinja2_compiled_cache(self):
+        app = self.application()
+        engine = app.template_engine('jinja2')
+        self.assertEqual(engine, app.template_engine())
+        self.assertEqual(engine('Hello {{ name }}', {'name': 'luca'}),
+                         'Hello luca')
+        self.assertEqual(engine('Hello {{ name }}', name='pippo'),
+                         'Hello pippo')
+        info = engine.info()
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 1)
+        other = self.application().template_engine('jinja2')
+        self.assertNotEqual(engine.env, other.env)
+
+    def test_jinja2_file_template(self):
+        app = self.application()
+        template = app.template('home.html')
+        self.assertTrue(template.path)
+        self.assertTrue(template.mtime)
+        engine = app.template_engine()
+        self.assertEqual(engine(template, html_main='foo'), 'foo')
+        self.assertEqual(engine(app.template('home.html'), html_main='foo'),
+                         'foo')
+        self.assertEqual(engine.info()['hits'], 1)
+        self.assertEqual(engine('{% include "home.html" %}', html_main='a'),
+                         'a')
+
+    def test_template_index(self):
+        from lux.core.templates import template_index
+        app = self.application()
+        index = template_index(app)
+        path = index.full_path('home.html')
+        self.assertTrue(path)
+        fixture = os.path.join(os.path.dirname(__file__), 'templates',
+                               'home.html')
+        self.assertEqual(os.path.realpath(path), os.path.realpath(fixture))
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(app.template_full_path(['xxx.html', 'home.html']),
+                         index.full_path('home.html'))
+        self.assertEqual(app.template_full_path('xxx.html'), None)
+        template = app.template('home.html')
+        self.assertEqual(id(template), id(app.template('home.html')))
+        self.assertEqual(app.template('xxx.html'), '')
+        app.reload(True)
+        self.assertFalse(index.templates)
+        self.assertNotEqual(id(template), id(app.template('home.html')))
@@ -1,10 +1,18 @@
-from unittest import skipUnless
+import time
+from datetime import date
+from threading import Thread
+from unittest import mock, skipUnless
 
 try:
     from redis import StrictRedis
 except ImportError:     # pragma    nocover
     StrictRedis = None
 
+try:
+    import msgpack
+except ImportError:     # pragma    nocover
+    msgpack = None
+
 from pulsar.api import ImproperlyConfigured
 from pulsar.apps.test import check_server
 from pulsar.utils.string import random_string
@@ -18,6 +26,19 @@ from tests.config import redis_cache_server
 REDIS_OK = check_server('redis')
 
 
+class RecordChannels:
+
+    def __init__(self):
+        self.registered = []
+        self.published = []
+
+    def register(self, channel_name, event, callback):
+        self.registered.append((channel_name, event, callback))
+
+    def publish(self, channel_name, event, data=None):
+        self.published.append((channel_name, event, data))
+
+
 class LockTests:
 
     @test.green
@@ -109,3 +130,266 @@ class TestRedisCache(test.AppTestCase, LockTests):
                                        'redis python client'))
 class TestRedisCacheSync(TestRedisCache):
     ClientClass = StrictRedis
+
+
+@skipUnless(StrictRedis, 'Requires redis python client')
+class TestRedisLockSync(test.TestCase):
+
+    def test_lock_arguments(self):
+        app = self.application(CACHE_SERVER=redis_cache_server, GREEN_POOL=0)
+        cache = app.cache_server
+        self.assertTrue(cache.sync)
+        cache.client = mock.MagicMock()
+        cache.lock('foo', timeout=2, blocking=1)
+        cache.client.lock.assert_called_with('foo', timeout=2,
+                                             blocking_timeout=1)
+        cache.lock('foo', blocking=False)
+        cache.client.lock.assert_called_with('foo', timeout=None,
+                                             blocking_timeout=0)
+        cache.lock('foo')
+        cache.client.lock.assert_called_with('foo', timeout=None,
+                                             blocking_timeout=None)
+
+
+class TestTieredCache(test.TestCase, LockTests):
+
+    def setUp(self):
+        self.app = self.application(CACHE_SERVER='tiered+dummy://')
+        self.cache = self.app.cache_server
+
+    def test_tiered_cache(self):
+        from lux.core.cache import TieredCache, DummyCache
+        self.assertIsInstance(self.cache, TieredCache)
+        self.assertIsInstance(self.cache.remote, DummyCache)
+        self.assertEqual(self.cache.name, 'tiered')
+        self.assertEqual(str(self.cache), 'tiered+dummy://')
+        self.assertEqual(self.cache.ping(), True)
+
+    def test_local_tier(self):
+        data = {'name': 'pippo', 'age': 4}
+        self.assertEqual(self.cache.get_json('foo'), None)
+        self.cache.set_json('foo', data)
+        self.assertEqual(id(self.cache.get_json('foo')), id(data))
+        self.assertEqual(self.cache.get('foo'), self.cache.dumps(data))
+        self.cache.set('bla', b'xxx')
+        self.assertEqual(self.cache.get('bla'), b'xxx')
+        self.cache.delete('foo')
+        self.assertEqual(self.cache.get_json('foo'), None)
+        info = self.cache.info()
+        self.assertEqual(info['hits'], 3)
+        self.assertEqual(info['size'], 1)
+
+    def test_local_timeout(self):
+        self.cache.set_json('foo', [1, 2], timeout=0.01)
+        self.assertEqual(self.cache.get_json('foo'), [1, 2])
+        time.sleep(0.02)
+        self.assertEqual(self.cache.get_json('foo'), None)
+
+    def test_clear(self):
+        self.cache.set_json('lux-foo', 1)
+        self.cache.set_json('lux-bla', 2)
+        self.cache.set_json('other', 3)
+        self.cache.clear('lux-')
+        self.assertEqual(self.cache.get_json('lux-foo'), None)
+        self.assertEqual(self.cache.get_json('other'), 3)
+        self.cache.clear()
+        self.assertEqual(self.cache.get_json('other'), None)
+
+    def test_invalidate(self):
+        cache = self.cache
+        cache.set_json('foo', 1)
+        cache._invalidate(None, None, {'origin': cache.uid, 'key': 'foo'})
+        self.assertEqual(cache.get_json('foo'), 1)
+        cache._invalidate(None, None, {'origin': 'other', 'key': 'foo'})
+        self.assertEqual(cache.get_json('foo'), None)
+
+    def test_publish_outside_green_worker(self):
+        cache = self.cache
+        channels = RecordChannels()
+        self.app.channels = channels
+        cache.set_json('foo', 1)
+        cache.delete('foo')
+        self.assertEqual(channels.registered,
+                         [('cache', 'invalidate', cache._invalidate)])
+        self.assertEqual(channels.published, [
+            ('cache', 'invalidate', {'key': 'foo', 'origin': cache.uid}),
+            ('cache', 'invalidate', {'key': 'foo', 'origin': cache.uid})
+        ])
+
+
+class TestMemoryCache(test.TestCase, LockTests):
+
+    def setUp(self):
+        self.app = self.application(CACHE_SERVER='memory://',
+                                    CACHE_MEMORY_MAX_ENTRIES=3)
+        self.cache = self.app.cache_server
+
+    def test_memory_cache(self):
+        from lux.core.cache import MemoryCache
+        self.assertIsInstance(self.cache, MemoryCache)
+        self.assertEqual(self.cache.name, 'memory')
+        self.assertEqual(self.cache.get('foo'), None)
+        self.cache.set('foo', 'bla')
+        self.assertEqual(self.cache.get('foo'), 'bla')
+        self.cache.set_json('foo', {'name': 'pippo'})
+        self.assertEqual(self.cache.get_json('foo'), {'name': 'pippo'})
+        self.assertEqual(self.cache.delete('foo'), 1)
+        self.assertEqual(self.cache.delete('foo'), 0)
+        self.assertEqual(self.cache.get('foo'), None)
+
+    def test_timeout(self):
+        self.cache.set('foo', 'bla', timeout=0.01)
+        self.assertEqual(self.cache.get('foo'), 'bla')
+        time.sleep(0.02)
+        self.assertEqual(self.cache.get('foo'), None)
+        self.cache.set('foo', 'bla', timeout=0.01)
+        time.sleep(0.02)
+        self.assertEqual(self.cache.sweep(), 1)
+        self.assertEqual(self.cache.info()['expirations'], 2)
+
+    def test_eviction(self):
+        cache = self.cache
+        cache.set('a', '1')
+        cache.set('b', '2')
+        cache.set('c', '3')
+        self.assertEqual(cache.get('a'), '1')
+        cache.set('d', '4')
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(len(cache), 3)
+        info = cache.info()
+        self.assertEqual(info['evictions'], 1)
+        self.assertEqual(info['bytes'], 3)
+
+    def test_hmset(self):
+        self.cache.hmset('foo', {'name': 'pippo'})
+        self.cache.hmset('foo', {'age': 4})
+        self.assertEqual(self.cache.hmget('foo', 'name', 'age'), ['pippo', 4])
+        self.assertEqual(self.cache.hmget('foo'), {'name': 'pippo', 'age': 4})
+        self.assertEqual(self.cache.hmget('bla'), None)
+
+    def test_clear(self):
+        self.cache.set('lux-a', '1')
+        self.cache.set('lux-b', '2')
+        self.cache.set('c', '3')
+        self.assertEqual(self.cache.clear('lux-'), 2)
+        self.assertEqual(self.cache.get('c'), '3')
+        self.assertEqual(self.cache.clear(), 1)
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestCacheObject(test.TestCase):
+
+    def setUp(self):
+        self.app = self.application(CACHE_SERVER='memory://')
+        self.calls = 0
+
+    def slow(self, app, value=None):
+        self.calls += 1
+        time.sleep(0.05)
+        return value or self.calls
+
+    def test_single_flight(self):
+        from lux.core import cached
+        app = self.app
+        compute = cached(app=app, key='slow', timeout=10)(self.slow)
+        results = []
+        threads = [Thread(target=lambda: results.append(compute(app)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [1, 1, 1, 1, 1])
+        self.assertEqual(compute(app), 1)
+
+    def test_no_single_flight(self):
+        from lux.core import cached
+        app = self.app
+        compute = cached(app=app, key='slow2', single_flight=False)(self.slow)
+        threads = [Thread(target=lambda: compute(app)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 3)
+
+    def test_stale_while_revalidate(self):
+        from lux.core import cached
+        app = self.app
+        compute = cached(app=app, key='slow3', timeout=0.01,
+                         stale=10)(self.slow)
+        self.assertEqual(compute(app), 1)
+        time.sleep(0.02)
+        results = []
+        threads = [Thread(target=lambda: results.append(compute(app)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # one thread recomputes while the others get the stale value
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(sorted(results), [1, 1, 2])
+        self.assertEqual(compute(app), 2)
+
+    @test.green
+    def test_lock(self):
+        from lux.core import cached
+        app = self.app
+        compute = cached(app=app, key='slow4', lock=1)(self.slow)
+        self.assertEqual(compute(app), 1)
+        self.assertEqual(compute(app), 1)
+        self.assertEqual(self.calls, 1)
+
+
+class TestSerializers(test.TestCase):
+
+    def test_json(self):
+        from lux.core.cache import encode_value, decode_value
+        data = {'name': 'pippo', 'body': 'x'*100}
+        encoded = encode_value(data)
+        self.assertEqual(encoded[:1], b'{')
+        self.assertEqual(decode_value(encoded), data)
+        self.assertEqual(decode_value(encoded.decode('utf-8')), data)
+        compressed = encode_value(data, compress_threshold=50)
+        self.assertEqual(compressed[:3], b'\x00jz')
+        self.assertTrue(len(compressed) < len(encoded))
+        self.assertEqual(decode_value(compressed), data)
+
+    def test_pickle(self):
+        from lux.core.cache import encode_value, decode_value
+        data = {'date': date.today(), 'tags': {'a', 'b'}}
+        encoded = encode_value(data, 'pickle')
+        self.assertEqual(encoded[:3], b'\x00p-')
+        self.assertEqual(decode_value(encoded, 'pickle'), data)
+        self.assertRaises(ValueError, decode_value, encoded)
+        encoded = encode_value(data, 'pickle', 10)
+        self.assertEqual(encoded[:3], b'\x00pz')
+        self.assertEqual(decode_value(encoded, 'pickle'), data)
+        self.assertRaises(ValueError, decode_value, encoded, 'msgpack')
+
+    @skipUnless(msgpack, 'Requires msgpack')
+    def test_msgpack(self):
+        from lux.core.cache import encode_value, decode_value
+        data = {'name': 'pippo', 'values': [1, 2.5, None, True]}
+        encoded = encode_value(data, 'msgpack')
+        self.assertEqual(encoded[:3], b'\x00m-')
+        self.assertEqual(decode_value(encoded), data)
+
+    def test_change_serializer(self):
+        app = self.application(CACHE_SERVER='memory://',
+                               CACHE_SERIALIZER='pickle')
+        cache = app.cache_server
+        cache.set_json('foo', {'day': date(2016, 1, 1)})
+        self.assertEqual(cache.get_json('foo'), {'day': date(2016, 1, 1)})
+        # json values written before the serializer changed
+        cache.set('bla', '{"name": "pippo"}')
+        self.assertEqual(cache.get_json('bla'), {'name': 'pippo'})
+
+    def test_pickle_not_configured(self):
+        from lux.core.cache import encode_value
+        app = self.application(CACHE_SERVER='memory://')
+        cache = app.cache_server
+        cache.set('foo', encode_value({'name': 'pippo'}, 'pickle'))
+        self.assertEqual(cache.get_json('foo'), None)
@@ -1,4 +1,5 @@
 import asyncio
+from threading import Thread
 from unittest import skipUnless
 
 from pulsar.apps.test import check_server
@@ -11,6 +12,46 @@ from tests.config import redis_cache_server
 REDIS_OK = check_server('redis')
 
 
+class FakeChannels:
+
+    def __init__(self, loop):
+        self._loop = loop
+        self.published = []
+
+    async def publish(self, channel_name, event, data=None):
+        self.published.append((channel_name, event, data))
+        return len(self.published)
+
+
+class ExecuteTests(test.TestCase):
+    config_file = 'tests.core'
+
+    def test_publish_without_running_loop(self):
+        from lux.core.channels import LuxChannels
+        loop = asyncio.new_event_loop()
+        fake = FakeChannels(loop)
+        channels = LuxChannels(fake).init_app(self.application())
+        results = []
+        # as from a command, no event loop runs in the publishing thread
+        thread = Thread(target=lambda: results.append(
+            channels.publish('test', 'foo', 1)))
+        try:
+            thread.start()
+            thread.join()
+        finally:
+            loop.close()
+        self.assertEqual(results, [1])
+        self.assertEqual(fake.published, [('test', 'foo', 1)])
+
+    async def test_publish_in_event_loop(self):
+        from lux.core.channels import LuxChannels
+        fake = FakeChannels(asyncio.get_event_loop())
+        channels = LuxChannels(fake).init_app(self.application())
+        result = channels.publish('test', 'foo', 2)
+        self.assertEqual(await result, 1)
+        self.assertEqual(fake.published, [('test', 'foo', 2)])
+
+
 @skipUnless(REDIS_OK, 'Requires a running Redis server')
 class ChannelsTests(test.TestCase):
     config_file = 'tests.core'
@@ -0,0 +1,74 @@
+from pulsar.api import MethodNotAllowed
+from pulsar.apps.wsgi import Router, Route
+
+from lux.core.dispatcher import Dispatcher
+from lux.utils import test
+
+
+def get(request):
+    pass
+
+
+def site():
+    root = Router('/', get=get)
+    api = Router('api/', get=get)
+    root.add_route(api)
+    users = Router('users', get=get)
+    users.add_route(Router('metadata', get=get))
+    users.add_route(Router('<int:id>', get=get))
+    users.add_route(Router('<id>/avatar', post=get))
+    api.add_route(users)
+    api.add_route(Router(Route(r'v\d+/status', is_re=True), get=get))
+    root.add_route(Router('<path:path>', get=get))
+    return root
+
+
+class TestDispatcher(test.TestCase):
+
+    def assertSameHandler(self, root, dispatcher, path, method='GET'):
+        expected = root._resolve(path[1:], method.lower())
+        handler = dispatcher.resolve(path, method)
+        if expected is None:
+            self.assertEqual(handler, None)
+        else:
+            self.assertEqual(handler.router, expected.router)
+            self.assertEqual(handler.urlargs, expected.urlargs)
+        return handler
+
+    def test_table(self):
+        dispatcher = Dispatcher(site())
+        info = dispatcher.info()
+        self.assertEqual(info['static'], 4)
+        self.assertEqual(info['dynamic'], 3)
+        self.assertEqual(info['regex'], 1)
+
+    def test_resolve(self):
+        root = site()
+        dispatcher = Dispatcher(root)
+        for path in ('/', '/api/', '/api', '/api/users', '/api/users/',
+                     '/api/users/metadata', '/api/users/56',
+                     '/api/users/foo', '/api/v2/status', '/api/vx/status',
+                     '/foo/bar', '/api/users/56/avatar/x'):
+            self.assertSameHandler(root, dispatcher, path)
+        handler = dispatcher.resolve('/api/users/56', 'GET')
+        self.assertEqual(handler.urlargs, {'id': 56})
+        handler = dispatcher.resolve('/api/users/foo', 'GET')
+        self.assertEqual(handler.urlargs, {'path': 'api/users/foo'})
+
+    def test_method_not_allowed(self):
+        dispatcher = Dispatcher(site())
+        self.assertRaises(MethodNotAllowed, dispatcher.resolve,
+                          '/api/users/56/avatar', 'GET')
+        handler = dispatcher.resolve('/api/users/56/avatar', 'POST')
+        self.assertEqual(handler.urlargs, {'id': '56'})
+
+    def test_cache(self):
+        dispatcher = Dispatcher(site(), 2)
+        urlargs = dispatcher.resolve('/api/users/5', 'GET').urlargs
+        urlargs['id'] = 6
+        self.assertEqual(dispatcher.resolve('/api/users/5', 'GET').urlargs,
+                         {'id': 5})
+        self.assertEqual(dispatcher.cache.info()['hits'], 1)
+        dispatcher.resolve('/api/users/metadata', 'GET')
+        self.assertEqual(dispatcher.cache.info()['hits'], 1)
+        self.assertEqual(len(dispatcher.cache), 1)
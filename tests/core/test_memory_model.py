@@ -1,5 +1,23 @@
 from lux.utils import test
-from lux.models.memory import Model
+from lux.models.memory import Model, Query
+
+
+DATA = [dict(id=n, name='entry %d' % n) for n in (5, 1, 3, 2, 4)]
+
+
+class DictModel(Model):
+
+    def create_instance(self, session, data):
+        return dict(data)
+
+    def fields(self):
+        return ('id', 'name')
+
+
+class DictQuery(Query):
+
+    def _get_data(self):
+        return DATA
 
 
 class TestDictModel(test.TestCase):
@@ -28,3 +46,16 @@ class TestDictModel(test.TestCase):
         model.set_instance_value(o, 'name', None)
         data = model.tojson(request, o)
         self.assertEqual(len(data), 1)
+
+    def test_batches(self):
+        model = DictModel('entries').init_app(self.application())
+        progress = []
+        batches = list(model.batches(
+            None, 2, query=DictQuery(model, None),
+            callback=lambda *args: progress.append(args)
+        ))
+        self.assertEqual([[e['id'] for e in batch] for batch in batches],
+                         [[1, 2], [3, 4], [5]])
+        self.assertEqual(progress, [(1, 2), (2, 4), (3, 5)])
+        entries = model.paginate(None, 4, query=DictQuery(model, None))
+        self.assertEqual([e['id'] for e in entries], [1, 2, 3, 4, 5])
@@ -0,0 +1,29 @@
+"""Compare the native and pure python PBKDF2 backends
+
+Run with::
+
+    python -m tests.crypt.benchmark
+"""
+import sys
+from timeit import timeit
+
+from lux.utils.crypt.pbkdf2 import crypt
+
+
+def bench(iterations=24000, number=5):
+    salt = crypt('password', iterations=iterations)
+    results = {}
+    for name, native in (('native', True), ('python', False)):
+        results[name] = timeit(
+            lambda: crypt('password', salt, secret_key='key', native=native),
+            number=number
+        )/number
+    return results
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 24000
+    results = bench(iterations)
+    for name, value in results.items():
+        print('%s: %.2f ms per hash' % (name, 1000*value))
+    print('speedup: %.1fx' % (results['python']/results['native']))
@@ -4,7 +4,7 @@ from lux.utils import test
 from lux.utils.crypt.pbkdf2 import (_0xffffffffL, algorithms,
                                     isbytes, isinteger, callable, binxor,
                                     b64encode, verify, b2a_hex, PBKDF2,
-                                    crypt, _makesalt, encrypt,
+                                    crypt, _makesalt, encrypt, derive_key,
                                     sha1, sha256, sha512)
 
 
@@ -387,3 +387,30 @@ class TestPBKDF2(test.TestCase):
         with self.assertRaises(ValueError) as e:
             crypt('test', '$$$')
         self.assertEqual(str(e.exception), "Illegal character '$' in salt")
+
+    def test_native_equivalence(self):
+        vectors = (
+            ('password', 'ATHENA.MIT.EDUraeburn', 1200, sha1, None, 32),
+            ('X'*65, 'pass phrase exceeds block size', 1200, sha1, None, 32),
+            ('pass\0word', 'sa\0lt', 4096, sha256, None, 16),
+            ('passwordPASSWORDpassword',
+             'saltSALTsaltSALTsaltSALTsaltSALTsalt', 4096, sha256, None, 40),
+            ('hello', 'salt', 1000, sha512, '123', 64),
+            ('test', '$p5k2$sha256$3e8$XXXXXXXX', 1000, sha256, 'key', 32)
+        )
+        for word, salt, iterations, digest, key, dklen in vectors:
+            self.assertEqual(
+                derive_key(word, salt, iterations, digest, key, dklen),
+                derive_key(word, salt, iterations, digest, key, dklen,
+                           native=False)
+            )
+
+    def test_native_crypt_compatibility(self):
+        stored = crypt('test', iterations=100, secret_key='123',
+                       native=False)
+        self.assertEqual(stored, crypt('test', stored, secret_key='123'))
+        self.assertTrue(verify(stored, 'test', '123'))
+        self.assertTrue(verify(stored, 'test', '123', native=False))
+        self.assertFalse(verify(stored, 'test', '111'))
+        stored = encrypt('test', '123', iterations=100)
+        self.assertTrue(verify(stored, 'test', '123', native=False))
@@ -1,11 +1,13 @@
+import json
 from urllib.parse import urlsplit
 
 from pulsar.api import ImproperlyConfigured
 
+from lux.core import User
 from lux.utils import test
 from lux.models.memory import Model
 
-from tests.odm.utils import OdmUtils
+from tests.odm.utils import OdmUtils, SqliteMixin
 
 
 class TestModels(OdmUtils, test.AppTestCase):
@@ -25,3 +27,94 @@ class TestModels(OdmUtils, test.AppTestCase):
         request = self.app.wsgi_request()
         url = users.api_url(request)
         self.assertTrue(urlsplit(url).path, '/users')
+
+    @test.green
+    def test_batches(self):
+        users = self.app.models['users']
+        progress = []
+        with users.begin_session() as session:
+            expected = sorted((user.id for user in users.get_list(session)))
+            batches = list(users.batches(
+                session, 1, expunge=True,
+                callback=lambda *args: progress.append(args)
+            ))
+        ids = [user.id for batch in batches for user in batch]
+        self.assertEqual(ids, expected)
+        self.assertEqual(progress[-1], (len(expected), len(expected)))
+
+    def test_stream_format(self):
+        users = self.app.models['users']
+        request = self.app.wsgi_request()
+        self.assertEqual(users.stream_format(request, {}), None)
+        params = {'stream': '1', 'username': 'bla'}
+        self.assertEqual(users.stream_format(request, params), 'json')
+        self.assertEqual(params, {'username': 'bla'})
+        params = {'stream': 'ndjson'}
+        self.assertEqual(users.stream_format(request, params), 'ndjson')
+        self.assertEqual(users.stream_format(request, {'stream': '0'}), None)
+
+    def test_stream_limit(self):
+        users = self.app.models['users']
+        request = self.app.wsgi_request()
+        params = {'limit': '1000', 'offset': '5', 'username': 'bla'}
+        self.assertEqual(users.stream_limit(request, params), (30, 5))
+        self.assertEqual(params, {'username': 'bla'})
+        self.assertEqual(users.stream_limit(request, {}), (30, 0))
+        self.assertEqual(users.stream_limit(request, {'limit': '2'}), (2, 0))
+        request.cache.user = User(username='pippo')
+        self.assertEqual(users.stream_limit(request, {'limit': '100000'}),
+                         (10000, 0))
+
+    @test.green
+    def test_list_chunks(self):
+        users = self.app.models['users']
+        with users.begin_session() as session:
+            expected = len(users.get_list(session))
+        chunks = list(users.list_chunks('json', chunk_size=1))
+        self.assertEqual(len(chunks), expected + 1)
+        data = json.loads(b''.join(chunks).decode('utf-8'))
+        self.assertEqual(len(data), expected)
+        data = b''.join(users.list_chunks('ndjson', chunk_size=2))
+        lines = data.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), expected)
+        for line in lines:
+            self.assertIsInstance(json.loads(line), dict)
+        data = b''.join(users.list_chunks('json', params={'id': -1}))
+        self.assertEqual(data, b'[]')
+        data = b''.join(users.list_chunks('json', limit=1))
+        self.assertEqual(len(json.loads(data.decode('utf-8'))), 1)
+
+
+class TestCountStrategy(OdmUtils, test.AppTestCase):
+    config_params = dict(SqliteMixin.config_params,
+                         CACHE_SERVER='memory://')
+
+    def count(self, model, strategy):
+        model.metadata['count_strategy'] = strategy
+        try:
+            with model.begin_session() as session:
+                return model.query(session).total()
+        finally:
+            model.metadata.pop('count_strategy')
+
+    @test.green
+    def test_exact(self):
+        users = self.app.models['users']
+        with users.begin_session() as session:
+            total = users.query(session).count()
+        self.assertTrue(total)
+        self.assertEqual(self.count(users, 'exact'), (total, False))
+
+    @test.green
+    def test_cached(self):
+        users = self.app.models['users']
+        total, approximate = self.count(users, 'cached')
+        self.assertFalse(approximate)
+        self.assertEqual(self.count(users, 'cached'), (total, True))
+
+    @test.green
+    def test_estimated_fallback(self):
+        users = self.app.models['users']
+        total, approximate = self.count(users, 'estimated')
+        self.assertTrue(total)
+        self.assertFalse(approximate)
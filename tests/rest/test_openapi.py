@@ -36,3 +36,28 @@ class TestOpenApi(test.AppTestCase):
     def test_api_spec_paths(self):
         api = self.app.apis[0]
         self.assertTrue(api.spec.doc['paths'])
+
+    async def test_api_spec_etag(self):
+        request = await self.client.get('/v1/spec')
+        response = request.response
+        doc = self.json(response, 200)
+        self.assertEqual(doc['info']['title'], 'test api')
+        self.assertEqual(doc['servers'][0]['description'], 'default server')
+        etag = response.headers['ETag']
+        self.assertTrue(etag)
+        request = await self.client.get(
+            '/v1/spec', headers=[('If-None-Match', etag)])
+        response = request.response
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_api_spec_document(self):
+        api = self.app.apis[0]
+        etag, body = api.spec_document('http://a.com')
+        self.assertEqual(api.spec_document('http://a.com'), (etag, body))
+        etag2, body2 = api.spec_document('http://b.com')
+        self.assertNotEqual(etag, etag2)
+        self.assertNotEqual(body, body2)
+        api.spec_changed()
+        self.assertEqual(api.spec_document('http://a.com'), (etag, body))
@@ -1,9 +1,13 @@
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
 from urllib.parse import urlparse
 
+from pulsar.api import BadRequest
 from pulsar.apps.wsgi.utils import query_dict
 
 from lux.utils import test
-from lux.ext.rest import Pagination
+from lux.ext.rest import Pagination, GithubPagination, CursorPagination
 
 
 class TestUtils(test.TestCase):
@@ -60,3 +64,89 @@ class TestUtils(test.TestCase):
         query = query_dict(urlparse(pag['prev']).query)
         self.assertEqual(query['offset'], '17')
         self.assertEqual(query['limit'], '5')
+
+    def test_approximate_total(self):
+        app = self.application()
+        request = app.wsgi_request()
+        pagination = Pagination()
+        pag = pagination(request, [], 120, 25, 0)
+        self.assertFalse('approximate' in pag)
+        pag = pagination(request, [], 120, 25, 0, approximate=True)
+        self.assertEqual(pag['total'], 120)
+        self.assertTrue(pag['approximate'])
+
+    def test_github_approximate_total(self):
+        app = self.application()
+        request = app.wsgi_request()
+        pagination = GithubPagination()
+        self.assertEqual(pagination(request, [], 120, 25, 0), [])
+        self.assertFalse('X-Total-Approximate' in request.response.headers)
+        request = app.wsgi_request()
+        pagination(request, [], 120, 25, 0, approximate=True)
+        self.assertEqual(request.response.headers['X-Total-Approximate'],
+                         'true')
+
+    def test_cursor(self):
+        app = self.application()
+        request = app.wsgi_request()
+        pagination = CursorPagination()
+        row = SimpleNamespace(id=5, created=datetime(2016, 5, 17, 10, 30))
+        cursor = pagination.encode(request, ('created', 'id'), row)
+        keys, values, reverse = pagination.decode(request, cursor)
+        self.assertEqual(keys, ['created', 'id'])
+        self.assertEqual(values, [row.created, 5])
+        self.assertFalse(reverse)
+        cursor = pagination.encode(request, ('id',), row, True)
+        self.assertEqual(pagination.decode(request, cursor),
+                         (['id'], [5], True))
+        payload, signature = cursor.split('.')
+        self.assertRaises(BadRequest, pagination.decode, request,
+                          '%s.%s' % (payload, signature[::-1]))
+        self.assertRaises(BadRequest, pagination.decode, request, 'foo')
+
+    def test_cursor_sort_keys(self):
+        pagination = CursorPagination()
+        query = SimpleNamespace(sorting=[])
+        self.assertEqual(pagination.sort_keys(query), ('id',))
+        query.sorting = [('created', 'desc'), ('name', None)]
+        self.assertEqual(pagination.sort_keys(query),
+                         ('created:desc', 'name', 'id'))
+        query.sorting = [('id', 'desc')]
+        self.assertEqual(pagination.sort_keys(query), ('id:desc',))
+
+    def test_cursor_sort_mismatch(self):
+        app = self.application()
+        pagination = CursorPagination()
+        row = SimpleNamespace(id=5, created=datetime(2016, 5, 17, 10, 30))
+        request = app.wsgi_request()
+        cursor = pagination.encode(request, ('created:desc', 'id'), row)
+        keys, values, reverse = pagination.decode(request, cursor)
+        self.assertEqual(keys, ['created:desc', 'id'])
+        self.assertEqual(values, [row.created, 5])
+        request = app.wsgi_request(url='/?cursor=%s' % cursor)
+        query = SimpleNamespace(sorting=[])
+        self.assertRaises(BadRequest, pagination.page, request, query)
+
+    def test_cursor_decimal(self):
+        app = self.application()
+        request = app.wsgi_request()
+        pagination = CursorPagination()
+        row = SimpleNamespace(id=5, price=Decimal('10.25'))
+        cursor = pagination.encode(request, ('price', 'id'), row)
+        keys, values, reverse = pagination.decode(request, cursor)
+        self.assertEqual(values, [Decimal('10.25'), 5])
+        self.assertIsInstance(values[0], Decimal)
+
+    def test_cursor_links(self):
+        app = self.application()
+        request = app.wsgi_request()
+        pagination = CursorPagination()
+        pag = pagination(request, [], limit=25)
+        self.assertEqual(pag, {'result': []})
+        pag = pagination(request, [], limit=25, next='abc', prev='xyz')
+        self.assertFalse('total' in pag)
+        query = query_dict(urlparse(pag['next']).query)
+        self.assertEqual(query['cursor'], 'abc')
+        self.assertEqual(query['limit'], '25')
+        query = query_dict(urlparse(pag['prev']).query)
+        self.assertEqual(query['cursor'], 'xyz')
@@ -0,0 +1,5 @@
+'''Config file for testing the session store'''
+EXTENSIONS = ['lux.ext.base',
+              'lux.ext.sessions']
+
+SESSION_STORE = 'memory://'
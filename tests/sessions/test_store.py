@@ -0,0 +1,74 @@
+import time
+
+from lux.utils import test
+from lux.ext.sessions.store import session_store
+
+
+class TestSessionStore(test.TestCase):
+    config_file = 'tests.sessions.config'
+
+    def store(self, **params):
+        return session_store(self.application(**params))
+
+    def test_lazy_create(self):
+        store = self.store()
+        session = store.create()
+        self.assertTrue(session.new)
+        self.assertFalse(session.modified)
+        self.assertFalse(store.save(session))
+        self.assertEqual(store.get(session.id), None)
+        session.message = 'hello'
+        self.assertTrue(session.modified)
+        self.assertTrue(store.save(session))
+        self.assertFalse(session.new)
+        self.assertFalse(session.modified)
+        self.assertEqual(store.get(session.id).message, 'hello')
+
+    def test_create_with_token(self):
+        store = self.store()
+        session = store.create(token=dict(id='abc'))
+        self.assertTrue(session.new)
+        self.assertTrue(session.modified)
+        self.assertTrue(store.save(session))
+
+    def test_create_with_data(self):
+        store = self.store()
+        session = store.create(user='pippo')
+        self.assertTrue(session.new)
+        self.assertTrue(session.modified)
+        self.assertTrue(store.save(session))
+        self.assertEqual(store.get(session.id).user, 'pippo')
+
+    def test_unchanged(self):
+        store = self.store()
+        session = store.create(user='pippo')
+        store.save(session)
+        session = store.get(session.id)
+        self.assertFalse(session.modified)
+        session.user = 'pippo'
+        self.assertFalse(session.modified)
+        self.assertFalse(store.save(session))
+        session.pop('user')
+        self.assertTrue(session.modified)
+        self.assertFalse('modified' in session.todict())
+
+    def test_refresh(self):
+        store = self.store(SESSION_REFRESH_INTERVAL=60)
+        session = store.create(user='pippo')
+        store.save(session)
+        store.refresh(session)
+        self.assertFalse(session.modified)
+        expiry = session.expiry - 61
+        session.expiry = expiry
+        store.save(session)
+        store.refresh(session)
+        self.assertTrue(session.modified)
+        self.assertTrue(session.expiry > time.time() + 60)
+
+    def test_no_refresh(self):
+        store = self.store(SESSION_REFRESH_INTERVAL=0)
+        session = store.create(user='pippo')
+        session.expiry = session.expiry - 3600
+        store.save(session)
+        store.refresh(session)
+        self.assertFalse(session.modified)